@@ -0,0 +1,189 @@
+# The MIT License (MIT)
+# Copyright © 2024 VectorChat
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import threading
+import time
+from typing import Any, Callable, TypeVar
+
+import bittensor as bt
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# chain calls that block for longer than this (seconds) are logged as warnings
+SLOW_CHAIN_CALL_SECONDS = 5.0
+
+
+class ChainCallStats(BaseModel):
+    """
+    Timings of one kind of chain call.
+    """
+
+    count: int = 0
+    errors: int = 0
+    # time spent running the call on the chain thread
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seconds: float = 0.0
+    # time spent waiting for the chain thread to be free (other calls running)
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def record(self, wait_seconds: float, seconds: float, error: bool):
+        self.count += 1
+        self.errors += int(error)
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.last_seconds = seconds
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+
+class ChainClient:
+    """
+    Runs (blocking) subtensor calls on a single dedicated thread.
+
+    Using one thread serializes all access to the subtensor's websocket and keeps the calls off the event loop, so the
+    task API and in-flight axon queries are not frozen while e.g. the metagraph syncs. Calls made from the chain thread
+    itself (e.g. `block` inside `sync()`) run directly.
+
+    Every call is timed per name (see `stats`), and calls slower than `SLOW_CHAIN_CALL_SECONDS` are logged as warnings.
+
+    The current block is cached for `block_ttl` seconds.
+    """
+
+    def __init__(self, block_ttl: float = 12):
+        self.block_ttl = block_ttl
+        self.stats: dict[str, ChainCallStats] = {}
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="chain",
+            initializer=self._set_thread_ident,
+        )
+        self._thread_ident: int | None = None
+        self._stats_lock = threading.Lock()
+
+        self._block: int | None = None
+        self._block_time = 0.0
+
+    def _set_thread_ident(self):
+        self._thread_ident = threading.get_ident()
+
+    def _in_chain_thread(self) -> bool:
+        return threading.get_ident() == self._thread_ident
+
+    def _timed(self, name: str, submitted_at: float, fn: Callable[[], T]) -> T:
+        start = time.perf_counter()
+        error = False
+        try:
+            return fn()
+        except Exception:
+            error = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            wait_seconds = start - submitted_at
+            with self._stats_lock:
+                self.stats.setdefault(name, ChainCallStats()).record(
+                    wait_seconds, seconds, error
+                )
+
+            log = (
+                bt.logging.warning
+                if seconds > SLOW_CHAIN_CALL_SECONDS
+                else bt.logging.debug
+            )
+            log(
+                f"Chain call {name} took {seconds:.3f}s (waited {wait_seconds:.3f}s){' and failed' if error else ''}"
+            )
+
+    def call(self, name: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Runs `fn(*args, **kwargs)` on the chain thread and blocks until it returns.
+        """
+        func = partial(self._timed, name, time.perf_counter(), partial(fn, *args, **kwargs))
+        if self._in_chain_thread():
+            return func()
+        return self._executor.submit(func).result()
+
+    async def run(self, name: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Runs `fn(*args, **kwargs)` on the chain thread without blocking the event loop.
+        """
+        func = partial(self._timed, name, time.perf_counter(), partial(fn, *args, **kwargs))
+        if self._in_chain_thread():
+            return func()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func)
+
+    def _block_is_fresh(self) -> bool:
+        return (
+            self._block is not None
+            and time.monotonic() - self._block_time < self.block_ttl
+        )
+
+    def _set_block(self, block: int) -> int:
+        self._block = block
+        self._block_time = time.monotonic()
+        return block
+
+    def get_block(self, subtensor: "bt.subtensor") -> int:
+        """
+        Gets the current block, from the cache if it is younger than `block_ttl` (blocking otherwise).
+        """
+        if self._block_is_fresh():
+            return self._block
+        return self._set_block(
+            self.call("get_current_block", subtensor.get_current_block)
+        )
+
+    async def get_block_async(self, subtensor: "bt.subtensor") -> int:
+        """
+        Gets the current block, from the cache if it is younger than `block_ttl`.
+        """
+        if self._block_is_fresh():
+            return self._block
+        return self._set_block(
+            await self.run("get_current_block", subtensor.get_current_block)
+        )
+
+    @property
+    def cached_block(self) -> int | None:
+        """
+        The last fetched block (possibly stale), without making any chain call. None if no block was fetched yet.
+        """
+        return self._block
+
+    def summary(self) -> str:
+        """
+        One line per chain call name with its count and timings, for logging.
+        """
+        with self._stats_lock:
+            stats = {name: s.model_copy() for name, s in self.stats.items()}
+
+        return "\n".join(
+            f"{name}: {s.count} calls ({s.errors} errors), "
+            f"avg {s.total_seconds / s.count:.3f}s, max {s.max_seconds:.3f}s, last {s.last_seconds:.3f}s, "
+            f"avg wait {s.total_wait_seconds / s.count:.3f}s, max wait {s.max_wait_seconds:.3f}s"
+            for name, s in sorted(stats.items())
+        )
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
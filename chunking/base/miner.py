@@ -22,6 +22,10 @@ import traceback
 import bittensor as bt
 
 from chunking.base.neuron import BaseNeuron
+from chunking.utils.executor import PriorityExecutor
+from chunking.utils.hotkeys import HotkeyIndex
+from chunking.utils.loop_monitor import LoopMonitor
+from chunking.utils.transport.compression import CompressionMiddleware
 
 
 class BaseMinerNeuron(BaseNeuron):
@@ -34,6 +38,9 @@ class BaseMinerNeuron(BaseNeuron):
     def __init__(self):
         super().__init__(config=self.config())
 
+        # hotkey -> uid, stake and validator permit for `blacklist`, `priority` and `verify`, rebuilt on each sync
+        self.hotkey_index = HotkeyIndex(self.metagraph)
+
         # Attach functions to axon, the axon is responsible for handling incoming requests from validators with valid synapse objects.
         self.axon = bt.axon(wallet=self.wallet, config=self.config)
         bt.logging.info(f"Attaching forward function to miner axon.")
@@ -43,8 +50,32 @@ class BaseMinerNeuron(BaseNeuron):
             priority_fn=self.priority,
             verify_fn=(self.verify),
         )
+        if not self.config.neuron.disable_compression:
+            # added last so it wraps the axon's middleware, which verifies the (decompressed) body
+            self.axon.app.add_middleware(
+                CompressionMiddleware,
+                min_size=self.config.neuron.compression_min_bytes,
+            )
         bt.logging.info(f"Axon created: {self.axon}")
 
+        # the axon handlers run on the axon server's event loop, so the monitor is started on it
+        self.loop_monitor = None
+        if self.config.loop_monitor.enabled:
+            self.loop_monitor = LoopMonitor(
+                "miner",
+                threshold=self.config.loop_monitor.threshold,
+                report_interval=self.config.loop_monitor.report_interval,
+            )
+            self.axon.app.add_event_handler("startup", self.loop_monitor.start)
+            self.axon.app.add_event_handler("shutdown", self.loop_monitor.stop)
+
+        # runs `chunk_document` off the axon's event loop, with admission control by priority (stake) and deadlines
+        self.chunk_executor = PriorityExecutor(
+            kind=self.config.neuron.chunk_executor,
+            max_workers=self.config.neuron.chunk_workers,
+            max_queue=self.config.neuron.chunk_queue_size,
+        )
+
         self.loop = asyncio.get_event_loop()
 
     def reconnect(self):
@@ -59,8 +90,10 @@ class BaseMinerNeuron(BaseNeuron):
                 self.config.neuron.reconnect.min_seconds * 2**i,
             )
             try:
-                self.subtensor = bt.subtensor(config=self.config)
-                self.metagraph = self.subtensor.metagraph(self.config.netuid)
+                self.subtensor, self.metagraph = self.chain.call(
+                    "reconnect", self.reconnect_subtensor
+                )
+                self.hotkey_index.rebuild(self.metagraph)
                 bt.logging.success(
                     f"Reconnected to the network after {i + 1} attempts."
                 )
@@ -79,6 +112,12 @@ class BaseMinerNeuron(BaseNeuron):
         )
         exit(1)
 
+    def resync_metagraph(self) -> bool:
+        synced = super().resync_metagraph()
+        if synced:
+            self.hotkey_index.rebuild(self.metagraph)
+        return synced
+
     def run(self):
         """
         Initiates and manages the main loop for the miner on the Bittensor network. The main loop handles graceful shutdown on keyboard interrupts and logs unforeseen errors.
@@ -138,6 +177,7 @@ class BaseMinerNeuron(BaseNeuron):
             # If someone intentionally stops the miner, it'll safely terminate operations.
             except KeyboardInterrupt:
                 self.axon.stop()
+                self.chunk_executor.shutdown()
                 bt.logging.success("Miner killed by keyboard interrupt.")
                 exit()
 
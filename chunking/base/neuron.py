@@ -27,8 +27,8 @@ from abc import ABC, abstractmethod
 
 
 # Sync calls set weights and also resyncs the metagraph.
+from chunking.base.chain import ChainClient
 from chunking.utils.config import check_config, add_args, config
-from chunking.utils.misc import ttl_get_block
 from chunking import __spec_version__ as spec_version
 
 
@@ -59,8 +59,23 @@ class BaseNeuron(ABC):
     spec_version: int = spec_version
 
     @property
-    def block(self):
-        return ttl_get_block(self)
+    def block(self) -> int:
+        """
+        The current block, cached for 12 seconds. Blocks while the block is fetched, prefer `get_block_async` from async
+        code.
+        """
+        return self.chain.get_block(self.subtensor)
+
+    @property
+    def last_known_block(self) -> int:
+        """
+        The last fetched block without making a chain call, for places where a slightly stale block is fine (e.g.
+        logging). Falls back to `block` if no block was fetched yet.
+        """
+        return self.chain.cached_block or self.block
+
+    async def get_block_async(self) -> int:
+        return await self.chain.get_block_async(self.subtensor)
 
     def __init__(self, config=None):
         base_config = copy.deepcopy(config or BaseNeuron.config())
@@ -100,6 +115,9 @@ class BaseNeuron(ABC):
         # Setup bittensor objects for interacting with subtensor
         bt.logging.info("Setting up bittensor objects.")
 
+        # all (blocking) subtensor calls run on this client's dedicated thread, see `ChainClient`
+        self.chain = ChainClient(block_ttl=12)
+
         # The wallet holds the cryptographic key pairs for the miner.
         self.wallet = bt.wallet(config=self.config)
 
@@ -142,11 +160,53 @@ class BaseNeuron(ABC):
         if self.should_set_weights():
             self.set_weights()
 
+    async def async_sync(self):
+        """
+        Awaitable version of `sync`. The blocking chain calls run on the chain thread (see `ChainClient`), so the event
+        loop keeps serving the API and in-flight queries meanwhile.
+        """
+        await self.async_check_registered()
+        bt.logging.success("still registered")
+
+        # refresh the cached block so the checks below don't make chain calls on the event loop
+        await self.get_block_async()
+
+        if self.should_sync_metagraph():
+            await self.async_resync_metagraph()
+
+        if self.should_set_weights():
+            await self.async_set_weights()
+
+        bt.logging.debug(f"Chain call timings:\n{self.chain.summary()}")
+
     def check_registered(self):
-        is_registered = self.subtensor.is_hotkey_registered(
+        is_registered = self.chain.call(
+            "is_hotkey_registered",
+            self.subtensor.is_hotkey_registered,
+            netuid=self.config.netuid,
+            hotkey_ss58=self.wallet.hotkey.ss58_address,
+        )
+        self._exit_if_not_registered(is_registered)
+
+    async def async_check_registered(self):
+        """Awaitable version of `check_registered`, running the chain call on the chain thread."""
+        is_registered = await self.chain.run(
+            "is_hotkey_registered",
+            self.subtensor.is_hotkey_registered,
             netuid=self.config.netuid,
             hotkey_ss58=self.wallet.hotkey.ss58_address,
         )
+        self._exit_if_not_registered(is_registered)
+
+    def reconnect_subtensor(self) -> tuple["bt.subtensor", "bt.metagraph"]:
+        """
+        Makes a new subtensor connection and metagraph. Runs on the chain thread (see `ChainClient`), e.g.
+        `self.chain.call("reconnect", self.reconnect_subtensor)`.
+        """
+        subtensor = bt.subtensor(config=self.config)
+        return subtensor, subtensor.metagraph(self.config.netuid)
+
+    def _exit_if_not_registered(self, is_registered: bool):
         if not is_registered:
             bt.logging.error(
                 f"Wallet: {self.wallet} is not registered on netuid {self.config.netuid}."
@@ -165,7 +225,7 @@ class BaseNeuron(ABC):
 
         # Sync the metagraph.
         try:
-            self.metagraph.sync(subtensor=self.subtensor)
+            self.chain.call("metagraph_sync", self.metagraph.sync, subtensor=self.subtensor)
         except Exception as e:
             bt.logging.error(f"Failed to sync metagraph with error: {e}")
             return False
@@ -175,6 +235,34 @@ class BaseNeuron(ABC):
         bt.logging.info("metagraph synced!")
         return True
 
+    async def async_resync_metagraph(self) -> bool:
+        """
+        Awaitable version of `resync_metagraph`. Syncs a copy of the metagraph on the chain thread and swaps it in once
+        synced, so code on the event loop never sees a partially synced metagraph. Returns True if successful, False
+        otherwise.
+        """
+        bt.logging.info("async_resync_metagraph(), neuron: ", self.neuron_type)
+
+        def sync_metagraph_copy() -> "bt.metagraph":
+            metagraph = copy.deepcopy(self.metagraph)
+            metagraph.sync(subtensor=self.subtensor)
+            return metagraph
+
+        try:
+            self.metagraph = await self.chain.run("metagraph_sync", sync_metagraph_copy)
+        except Exception as e:
+            bt.logging.error(f"Failed to sync metagraph with error: {e}")
+            return False
+
+        self.last_sync_block = await self.get_block_async()
+
+        bt.logging.info("metagraph synced!")
+        return True
+
+    async def async_set_weights(self):
+        """Awaitable version of `set_weights`, running it on the chain thread."""
+        await self.chain.run("set_weights", self.set_weights)
+
     def should_sync_metagraph(self):
 
         diff = self.block - self.last_sync_block
@@ -46,16 +46,59 @@ from wandb.apis.public.runs import Runs, Run
 import sympy as sp
 
 from chunking.protocol import chunkSynapse
-from chunking.utils.synthetic.synthetic import generate_document
+from chunking.utils.articles import (
+    fetch_articles,
+    get_articles_path,
+    hash_articles,
+    load_articles,
+    load_articles_synced_at,
+    save_articles,
+    save_articles_synced_at,
+)
+from chunking.utils.loop_monitor import LoopMonitor
+from chunking.utils.metrics import (
+    AXON_QUERIES,
+    AXON_QUERY_SECONDS,
+    EVENT_LOOP_LAG_SECONDS,
+    QUEUE_SIZE,
+)
+from chunking.utils.profiler import RoundProfiler
+from chunking.utils.state import save_tournament_state
+from chunking.utils.synthetic.pool import SyntheticDocumentPool
+from chunking.utils.synthetic.scheduler import GenerationScheduler, new_generation_job
+from chunking.utils.synthetic.synthetic import generate_document, get_source_articles
+from chunking.utils.synthetic.wiki_cache import WikiPageCache
 from chunking.utils.synthetic.types import SyntheticGenType
+from chunking.utils.transport.broadcast import PreparedBroadcast
+from chunking.utils.transport.compression import (
+    ACCEPT_REQUEST_ENCODING_HEADER,
+    CompressionCapabilities,
+    choose_encoding,
+)
+from chunking.utils.transport.decode import (
+    ResponseTooLargeError,
+    decode_chunk_response,
+)
+from chunking.utils.transport.pool import AxonClientPool
 from chunking.utils.wandb.wandb import WandbLogger
 from chunking.validator.integrated_api import setup_routes
+from chunking.validator.pipeline import run_pipeline
+from chunking.validator.telemetry import MinerTelemetry
 from chunking.validator.types import EndTournamentRoundInfo
 from chunking.utils.score import get_new_scores
 
 
 load_dotenv()
 
+# timeout (seconds) for each request made while syncing the article catalog
+ARTICLES_SYNC_TIMEOUT = 30
+# time (seconds) to wait before retrying a failed article catalog refresh
+ARTICLES_RETRY_SECONDS = 300
+# time (seconds) between checks whether the wiki page cache needs prefetching or revalidating
+WIKI_CACHE_REFRESH_SECONDS = 5
+# max time (seconds) the step and the miner telemetry go unsaved when nothing else in the state changes
+STATE_FLUSH_SECONDS = 10 * 60
+
 
 class BaseValidatorNeuron(BaseNeuron):
     """
@@ -79,6 +122,17 @@ class BaseValidatorNeuron(BaseNeuron):
         self.dendrite = bt.dendrite(wallet=self.wallet)
         bt.logging.info(f"Dendrite: {self.dendrite}")
 
+        # long-lived pooled client used to query axons (`query_axon`), closed when `run()` exits.
+        self.axon_pool = AxonClientPool(
+            max_connections=self.config.axon_pool.max_connections,
+            max_connections_per_host=self.config.axon_pool.max_connections_per_host,
+            connect_timeout=self.config.axon_pool.connect_timeout,
+            keepalive_expiry=self.config.axon_pool.keepalive_expiry,
+            http2=self.config.axon_pool.http2,
+        )
+        # request encodings advertised by each miner, used to compress queries (see `query_axon`)
+        self.compression_capabilities = CompressionCapabilities()
+
         # Set up initial scoring weights for validation, scores serve as the moving average of each miner's rank. A lower score is better.
         bt.logging.info("Building validation weights.")
         self.scores = np.full(
@@ -87,10 +141,33 @@ class BaseValidatorNeuron(BaseNeuron):
 
         bt.logging.debug(f"Initial scores: {self.scores}")
 
+        # latency/reliability telemetry per miner, updated by `query_axon` and persisted with the state
+        self.telemetry = MinerTelemetry(self.metagraph.n)
+
+        # profiles tournament rounds on demand or every N rounds (see `run_tournament_round`)
+        self.round_profiler = RoundProfiler(
+            output_dir=os.path.join(self.config.neuron.full_path, "profiles"),
+            mode=self.config.profiling.mode,
+            every_n=self.config.profiling.every_n_rounds,
+            max_files=self.config.profiling.max_files,
+            sample_interval=self.config.profiling.sample_interval,
+        )
+
         # initial rankings is the index of the miner in the metagraph.
         # rankings array represents rank of each miner for this validator's tournament. The index is the rank and the value is the uid of the miner.
         self.rankings = np.array(range(self.metagraph.n))
 
+        # article catalog (wikipedia page ids) used for synthetic document generation, persisted separately from tournament state.
+        self.articles: list[int] | np.ndarray = []
+        self.articles_hash: str | None = None
+        # unix time at which the article catalog was last fetched from wikipedia, None if never.
+        self.articles_synced_at: float | None = None
+
+        # whether the tournament state (scores, rankings, hotkeys) has changed since it was last saved to disk. the
+        # step and the telemetry change all the time, they are saved with those changes or every `STATE_FLUSH_SECONDS`.
+        self.state_dirty: bool = True
+        self.state_saved_at: float = 0.0
+
         # load tournament state from disk, if it exists.
         self.load_state()
 
@@ -122,15 +199,34 @@ class BaseValidatorNeuron(BaseNeuron):
                 bt.logging.enable_third_party_loggers()
             bt.logging.info("Debug mode enabled")
 
-        # synthetic document queue
-        self.synthetic_document_queue = asyncio.Queue[Tuple[str, int]](
-            self.config.doc_gen.queue_size
+        # synthetic documents, persisted on disk so generated documents survive restarts
+        self.synthetic_document_pool = SyntheticDocumentPool(
+            os.path.join(self.config.neuron.full_path, "synthetic_documents"),
+            max_fresh=self.config.doc_gen.queue_size,
+            max_uses=self.config.doc_gen.max_uses,
+            max_bytes=int(self.config.doc_gen.pool_max_mb * 1024 * 1024),
         )
         self.synthetic_document_semaphore = asyncio.Semaphore(
             value=self.config.doc_gen.concurrent_n
         )
         self.synthetic_doc_gen_timeout = self.config.doc_gen.timeout
 
+        # on-disk cache of wikipedia page extracts used to generate synthetic documents (see `wiki_cache_refresher`)
+        self.wiki_cache: WikiPageCache | None = None
+        if not self.config.wiki_cache.off:
+            self.wiki_cache = WikiPageCache(
+                os.path.join(self.config.neuron.full_path, "wiki_pages"),
+                max_bytes=int(self.config.wiki_cache.max_mb * 1024 * 1024),
+                revalidate_seconds=self.config.wiki_cache.revalidate_hours * 3600,
+                prefetch_count=self.config.wiki_cache.prefetch_count,
+                prefetch_concurrency=self.config.wiki_cache.prefetch_concurrency,
+            )
+
+        QUEUE_SIZE.set_function(self.score_update_queue.qsize, queue="score_update")
+        QUEUE_SIZE.set_function(
+            lambda: self.synthetic_document_pool.num_fresh, queue="synthetic_document"
+        )
+
         self.wandb_logger = WandbLogger(self)
 
     def serve_axon(self):
@@ -184,6 +280,28 @@ class BaseValidatorNeuron(BaseNeuron):
         """
         bt.logging.info("Starting synthetic document producer")
 
+        if not self.config.neuron.use_wiki_gen:
+            # llm documents are generated section by section, interleaved under a shared rate limit
+            scheduler = GenerationScheduler(
+                self.aclient,
+                os.path.join(self.config.neuron.full_path, "generation_checkpoints"),
+                new_job=lambda: new_generation_job(self),
+                on_document=self.add_synthetic_document_to_queue,
+                get_sources=lambda pageids: get_source_articles(pageids, self.wiki_cache),
+                rpm=self.config.doc_gen.rpm,
+                tpm=self.config.doc_gen.tpm,
+                concurrency=self.config.doc_gen.concurrent_n,
+                max_active=self.config.doc_gen.max_active,
+                step_timeout=self.config.doc_gen.step_timeout,
+                stream=self.config.doc_gen.stream,
+                # early handoff is part of streaming, without it documents get all their sections
+                handoff=(
+                    self.should_hand_off_document if self.config.doc_gen.stream else None
+                ),
+            )
+            await scheduler.run()
+            return
+
         async def generate_and_add_to_queue():
             start_time = time.time()
             doc, pageid = await generate_document(self)
@@ -217,30 +335,40 @@ class BaseValidatorNeuron(BaseNeuron):
 
             task.add_done_callback(task_done_callback)
 
+    def should_hand_off_document(self, length: int) -> bool:
+        """
+        Whether a (streamed) synthetic document of `length` characters should be used right away instead of being
+        generated to full length: it's long enough and no unused document is ready for the next round.
+        """
+        return (
+            length >= self.config.doc_gen.handoff_min_chars
+            and self.synthetic_document_pool.num_fresh == 0
+        )
+
     async def add_synthetic_document_to_queue(
         self, synthetic_document: str, pageid: int
     ):
         """
-        Add a synthetic document to the queue.
+        Add a synthetic document to the (disk-backed) pool, waiting while the pool has enough unused documents.
         """
         bt.logging.debug(
-            f"Adding synth doc to queue of length {self.synthetic_document_queue.qsize()}, pageid: {pageid}"
+            f"Adding synth doc to pool with {self.synthetic_document_pool.num_fresh} unused documents, pageid: {pageid}"
         )
-        await self.synthetic_document_queue.put((synthetic_document, pageid))
+        await self.synthetic_document_pool.put(synthetic_document, pageid)
         bt.logging.debug(
-            f"Added synth doc to queue of length {self.synthetic_document_queue.qsize()}, pageid: {pageid}"
+            f"Added synth doc to pool with {self.synthetic_document_pool.num_fresh} unused documents, pageid: {pageid}"
         )
 
     async def get_synthetic_document_from_queue(self) -> Tuple[str, int]:
         """
-        Get a synthetic document from the queue.
+        Get a synthetic document from the (disk-backed) pool, reusing documents as allowed by `--doc_gen.max_uses`.
         """
         bt.logging.debug(
-            f"Getting synth doc from queue of length {self.synthetic_document_queue.qsize()}"
+            f"Getting synth doc from pool with {len(self.synthetic_document_pool)} documents"
         )
-        doc, pageid = await self.synthetic_document_queue.get()
+        doc, pageid = await self.synthetic_document_pool.get()
         bt.logging.debug(
-            f"Got synth doc ({len(doc)} chars) with pageid: {pageid} from queue. New queue size: {self.synthetic_document_queue.qsize()}"
+            f"Got synth doc ({len(doc)} chars) with pageid: {pageid} from pool. {self.synthetic_document_pool.num_fresh} unused documents left"
         )
         return doc, pageid
 
@@ -259,6 +387,8 @@ class BaseValidatorNeuron(BaseNeuron):
             2.2 Sync the metagraph and set weights if necessary.
             2.3 Save the current tournament state to disk.
             2.4 Sleep for a specified interval, repeat.
+
+        With `--neuron.pipeline`, these steps run as overlapping stages instead, see `run_pipeline`.
         """
 
         if self.config.enable_task_api:
@@ -268,54 +398,39 @@ class BaseValidatorNeuron(BaseNeuron):
         # Check that validator is registered on the network.
         # self.sync()
         # self.sync_articles()
-        bt.logging.info(f"Validator starting at block: {self.block}")
+        bt.logging.info(f"Validator starting at block: {await self.get_block_async()}")
 
-        await self.sync_articles()
+        # the catalog is needed before any synthetic document can be generated, so only wait for it if
+        # there is no cached catalog. otherwise it is refreshed in the background.
+        if len(self.articles) == 0:
+            await self.sync_articles()
+        articles_task = asyncio.create_task(self.articles_refresher())
         synth_gen_task = asyncio.create_task(self.synthetic_document_producer())
+        wiki_cache_task = asyncio.create_task(self.wiki_cache_refresher())
+
+        loop_monitor = None
+        if self.config.loop_monitor.enabled:
+            loop_monitor = LoopMonitor(
+                "validator",
+                threshold=self.config.loop_monitor.threshold,
+                report_interval=self.config.loop_monitor.report_interval,
+                lag_histogram=EVENT_LOOP_LAG_SECONDS,
+            )
+            loop_monitor.start()
 
         # This loop maintains the validator's operations until intentionally stopped.
         try:
-            while True:
-                bt.logging.info(f"step({self.step})")
-
-                # TODO: consider using to_thread()
-
-                # if not self.config.wandb.wandb_off:
-                #     self.wandb_logger.restart_if_past_time_delta(
-                #         timedelta(hours=self.config.wandb.restart_interval_hours)
-                #     )
-
-                # Sync metagraph and potentially set weights.
-                await self.sync_articles()
-                self.sync()
-
-                if not self.config.no_forward:  # useful for debugging
-                    # Run multiple forwards concurrently.
-                    await self.concurrent_forward()
-
-                # Process any queued score updates.
-                await self.process_score_updates()
-
-                # Check if we should exit.
-                if self.should_exit:
-                    break
-
-                # Save the current tournament state to disk.
-                await self.save_state()
-
-                interval_seconds = self.config.neuron.synthetic_query_interval_seconds
-
-                bt.logging.success(
-                    f"step({self.step}) completed!, sleeping for {interval_seconds} seconds"
-                )
-                self.step += 1
-
-                await asyncio.sleep(interval_seconds)
+            if self.config.neuron.pipeline:
+                # query, scoring and commit (score updates, state saving, chain syncs) overlap, see `run_pipeline`
+                await run_pipeline(self)
+            else:
+                await self.run_sequential()
 
         # If someone intentionally stops the validator, it'll safely terminate operations.
         except KeyboardInterrupt:
             bt.logging.info("Canceling synthetic data generation task")
             synth_gen_task.cancel()
+            articles_task.cancel()
             bt.logging.success("Cancelled synthetic data generation task")
             self.axon.stop()
             bt.logging.success("Validator killed by keyboard interrupt.")
@@ -326,15 +441,65 @@ class BaseValidatorNeuron(BaseNeuron):
             bt.logging.error("Error during validation", str(err))
             traceback.print_exc()
 
-            # reinitialize subtensor just in case
-            self.subtensor = bt.subtensor(config=self.config)
-            # remake metagraph in case
-            self.metagraph = self.subtensor.metagraph(self.config.netuid)
+            # reinitialize subtensor and remake metagraph just in case, on the chain thread
+            self.subtensor, self.metagraph = await self.chain.run(
+                "reconnect", self.reconnect_subtensor
+            )
 
         finally:
             bt.logging.info("Canceling synthetic data generation task")
             synth_gen_task.cancel()
+            articles_task.cancel()
+            wiki_cache_task.cancel()
+            if self.wiki_cache is not None:
+                await self.wiki_cache.close()
+            if loop_monitor is not None:
+                loop_monitor.stop()
+                loop_monitor.log_report()
             bt.logging.success("Cancelled synthetic data generation task")
+            await self.axon_pool.aclose()
+
+    async def run_sequential(self):
+        """
+        Runs the validator's steps one after another: sync, forward(s), score updates, state saving, sleep.
+        """
+        while True:
+            bt.logging.info(f"step({self.step})")
+
+            # TODO: consider using to_thread()
+
+            # if not self.config.wandb.wandb_off:
+            #     self.wandb_logger.restart_if_past_time_delta(
+            #         timedelta(hours=self.config.wandb.restart_interval_hours)
+            #     )
+
+            # Sync metagraph and potentially set weights.
+            await self.async_sync()
+
+            if not self.config.no_forward:  # useful for debugging
+                # Run multiple forwards concurrently.
+                await self.concurrent_forward()
+
+            # Process any queued score updates.
+            await self.process_score_updates()
+
+            # Check if we should exit.
+            if self.should_exit:
+                break
+
+            # Save the current tournament state to disk.
+            await self.save_state()
+
+            interval_seconds = self.config.neuron.synthetic_query_interval_seconds
+
+            bt.logging.debug(f"Axon pool stats: {self.axon_pool.stats()}")
+
+            bt.logging.success(
+                f"step({self.step}) completed!, sleeping for {interval_seconds} seconds"
+            )
+            self.step += 1
+
+            await asyncio.sleep(interval_seconds)
 
     def run_in_background_thread(self):
         """
@@ -499,7 +664,9 @@ class BaseValidatorNeuron(BaseNeuron):
     def set_weights_on_chain(
         self, uint_uids: List[int], uint_weights: List[int]
     ) -> Tuple[bool, str]:
-        result, msg = self.subtensor.set_weights(
+        result, msg = self.chain.call(
+            "set_weights_extrinsic",
+            self.subtensor.set_weights,
             wallet=self.wallet,
             netuid=self.config.netuid,
             uids=uint_uids,
@@ -514,7 +681,24 @@ class BaseValidatorNeuron(BaseNeuron):
         """
         Sets the validator weights to the metagraph hotkeys based on the scores it has received from the miners. The weights determine the trust and incentive level the validator assigns to miner nodes on the network.
         """
+        raw_weights = self._get_weights_to_set()
+        uint_uids, uint_weights = self._process_weights(raw_weights, self.metagraph)
+        self._log_weights(uint_uids, uint_weights)
+        self._submit_weights(uint_uids, uint_weights)
+
+    async def async_set_weights(self):
+        """
+        Awaitable version of `set_weights`. Only the chain calls (processing the weights with the subnet's limits and
+        submitting the extrinsic) run on the chain thread, the rankings and wandb are only touched on the event loop.
+        """
+        raw_weights = self._get_weights_to_set()
+        uint_uids, uint_weights = await self.chain.run(
+            "process_weights", self._process_weights, raw_weights, self.metagraph
+        )
+        self._log_weights(uint_uids, uint_weights)
+        await self.chain.run("set_weights", self._submit_weights, uint_uids, uint_weights)
 
+    def _get_weights_to_set(self) -> np.ndarray:
         bt.logging.debug("setting weights")
 
         if np.isnan(self.scores).any():
@@ -530,20 +714,23 @@ class BaseValidatorNeuron(BaseNeuron):
             )
             self.rankings = np.argsort(self.scores)
 
-        raw_weights = self._get_raw_weights(self.scores, self.rankings)
+        return self._get_raw_weights(self.scores, self.rankings)
 
+    def _process_weights(
+        self, raw_weights: np.ndarray, metagraph: "bt.metagraph"
+    ) -> Tuple[List[int], List[int]]:
         # bt.logging.debug("raw_weights", raw_weights)
-        # bt.logging.debug("raw_weight_uids", str(self.metagraph.uids.tolist()))
+        # bt.logging.debug("raw_weight_uids", str(metagraph.uids.tolist()))
         # Process the raw weights to final_weights via subtensor limitations.
         (
             processed_weight_uids,
             processed_weights,
         ) = chunking.base.utils.process_weights_for_netuid(
-            uids=self.metagraph.uids,
+            uids=metagraph.uids,
             weights=raw_weights,
             netuid=self.config.netuid,
             subtensor=self.subtensor,
-            metagraph=self.metagraph,
+            metagraph=metagraph,
             skip_exclude=True,
         )
         # bt.logging.debug("processed_weights", processed_weights)
@@ -558,7 +745,9 @@ class BaseValidatorNeuron(BaseNeuron):
         )
         bt.logging.trace("uint_weights", uint_weights)
         bt.logging.trace("uint_uids", uint_uids)
+        return uint_uids, uint_weights
 
+    def _log_weights(self, uint_uids: List[int], uint_weights: List[int]):
         # log the weights that would be set on chain
         wandb_data = {"weights": {}}
         for uid, weight in zip(uint_uids, uint_weights):
@@ -566,6 +755,7 @@ class BaseValidatorNeuron(BaseNeuron):
         if not self.config.wandb.wandb_off:
             wandb.log(wandb_data)
 
+    def _submit_weights(self, uint_uids: List[int], uint_weights: List[int]):
         if self.config.neuron.skip_set_weights_extrinsic:
             bt.logging.warning("Skipping set_weights extrinsic call.")
             return
@@ -596,6 +786,20 @@ class BaseValidatorNeuron(BaseNeuron):
             bt.logging.error("Metagraph sync failed, skipping this step.")
             return
 
+        self.reconcile_hotkeys()
+
+    async def async_resync_metagraph(self):
+        """Awaitable version of `resync_metagraph`, the hotkeys and scores are updated on the event loop."""
+        success = await super().async_resync_metagraph()
+
+        if not success:
+            bt.logging.error("Metagraph sync failed, skipping this step.")
+            return
+
+        self.reconcile_hotkeys()
+
+    def reconcile_hotkeys(self):
+        """Updates the hotkeys and scores (resetting replaced and adding new miners) to match the synced metagraph."""
         # Check if the metagraph axon info has changed.
         # if previous_metagraph.axons == self.metagraph.axons:
         #     bt.logging.debug("metagraph axons are the same, nothing to update")
@@ -607,6 +811,8 @@ class BaseValidatorNeuron(BaseNeuron):
         for uid, hotkey in enumerate(self.hotkeys):
             if hotkey != self.metagraph.hotkeys[uid]:
                 self.scores[uid] = np.inf
+                self.telemetry.reset(uid)
+                self.state_dirty = True
 
         # Check to see if the metagraph has changed size.
         # If so, we need to add new hotkeys and scores
@@ -617,9 +823,12 @@ class BaseValidatorNeuron(BaseNeuron):
             placeholder_scores[: len(cur_scores)] = cur_scores
 
             self.scores = placeholder_scores
+            self.telemetry.resize(self.metagraph.n)
             bt.logging.debug(f"Added new hotkeys, new scores: {self.scores}")
 
         # Update the hotkeys.
+        if list(self.hotkeys) != list(self.metagraph.hotkeys):
+            self.state_dirty = True
         self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
         bt.logging.debug(f"Updated hotkeys")
 
@@ -684,6 +893,7 @@ class BaseValidatorNeuron(BaseNeuron):
 
         old_rankings = copy.deepcopy(self.rankings)
         self.rankings = np.argsort(self.scores)
+        self.state_dirty = True
 
         # print old/new rankings
         for uid in uids_array:
@@ -711,33 +921,68 @@ class BaseValidatorNeuron(BaseNeuron):
         self.wandb_logger.log(wandb_data)
 
     async def save_state(self):
-        """Saves the state of the validator to a file."""
+        """
+        Saves the tournament state of the validator to a file.
+
+        The state is only written if it changed since the last save (`state_dirty`), or if the step and telemetry
+        weren't saved for `STATE_FLUSH_SECONDS`. It is written atomically (temp file + rename). The article catalog
+        is persisted separately by `sync_articles`.
+        """
+        if (
+            not self.state_dirty
+            and time.time() - self.state_saved_at < STATE_FLUSH_SECONDS
+        ):
+            bt.logging.debug("Validator state unchanged, skipping save.")
+            return
+
         bt.logging.info("Saving validator state.")
 
+        path = self.config.neuron.full_path + "/state.npz"
+
+        # clear the flag before writing, so changes made while saving mark the state dirty again
+        self.state_dirty = False
+        self.state_saved_at = time.time()
+
         func = partial(
-            np.savez,
-            file=self.config.neuron.full_path + "/state.npz",
+            save_tournament_state,
+            path=path,
             step=self.step,
-            scores=self.scores,
-            rankings=self.rankings,
-            articles=self.articles,
-            hotkeys=self.hotkeys,
+            scores=self.scores.copy(),
+            rankings=self.rankings.copy(),
+            hotkeys=list(self.hotkeys),
+            telemetry=self.telemetry.to_state(),
         )
 
-        bt.logging.debug(
-            f"Async saving state to {self.config.neuron.full_path}/state.npz"
-        )
+        bt.logging.debug(f"Async saving state to {path}")
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, func)
+        try:
+            await loop.run_in_executor(None, func)
+        except Exception as e:
+            self.state_dirty = True
+            bt.logging.error(f"Error saving validator state: {e}")
+            traceback.print_exc()
+            return
 
         bt.logging.info(f"Saved validator state.")
-        bt.logging.debug(
-            f"Saved state for {len(self.hotkeys)} hotkeys, saved {len(self.articles)} articles"
-        )
+        bt.logging.debug(f"Saved state for {len(self.hotkeys)} hotkeys")
+
+    async def save_articles(self, articles: list[int], articles_hash: str):
+        """Saves the article catalog to its own file."""
+        path = get_articles_path(self.config.neuron.full_path)
+        bt.logging.debug(f"Saving {len(articles)} articles to {path}")
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(save_articles, path, articles))
+
+        self.articles_hash = articles_hash
+        bt.logging.debug(f"Saved {len(articles)} articles to {path}")
 
     def load_state(self):
-        """Loads the state of the validator from a file."""
+        """Loads the state of the validator (tournament state and article catalog) from files."""
         bt.logging.info("Loading validator state.")
+
+        self.load_articles()
+
         if not os.path.exists(self.config.neuron.full_path + "/state.npz"):
             return
 
@@ -747,7 +992,15 @@ class BaseValidatorNeuron(BaseNeuron):
         self.scores = state["scores"]
         self.hotkeys = state["hotkeys"]
         self.rankings = state["rankings"]
-        self.articles = state["articles"]
+        self.telemetry = MinerTelemetry.from_state(state, len(self.scores))
+
+        # older state files also contain the article catalog
+        if len(self.articles) == 0 and "articles" in state:
+            self.articles = state["articles"].tolist()
+            bt.logging.info(f"Loaded {len(self.articles)} articles from legacy state")
+
+        self.state_dirty = False
+        self.state_saved_at = time.time()
 
         bt.logging.info(
             f"Loaded validator state from {self.config.neuron.full_path}/state.npz"
@@ -759,6 +1012,18 @@ class BaseValidatorNeuron(BaseNeuron):
             f"Loaded state: Step: {self.step}, {len(self.hotkeys)} hotkeys, {len(self.articles)} articles, {len(self.rankings)} rankings ({str(self.rankings.tolist())[:40]}...), {len(self.scores)} scores ({str(self.scores.tolist())[:40]}...)"
         )
 
+    def load_articles(self):
+        """Loads the article catalog (memory-mapped) from its own file, if it exists."""
+        path = get_articles_path(self.config.neuron.full_path)
+        articles = load_articles(path)
+        if articles is None:
+            return
+
+        self.articles = articles
+        self.articles_hash = hash_articles(articles)
+        self.articles_synced_at = load_articles_synced_at(self.config.neuron.full_path)
+        bt.logging.info(f"Loaded {len(self.articles)} articles from {path}")
+
     def preprocess_synapse_for_request(
         self,
         target_axon_info: "bt.AxonInfo",
@@ -800,76 +1065,109 @@ class BaseValidatorNeuron(BaseNeuron):
         return synapse
 
     async def query_axon(
-        self, axon: bt.axon, synapse: bt.Synapse, timeout: float
+        self,
+        axon: bt.axon,
+        synapse: bt.Synapse,
+        timeout: float,
+        broadcast: PreparedBroadcast | None = None,
+        uid: int | None = None,
     ) -> bt.Synapse:
+        """
+        Queries a single axon with the synapse.
+
+        Args:
+            axon (bt.axon): The axon (or axon info) to query.
+            synapse (bt.Synapse): The synapse to send, not modified.
+            timeout (float): The timeout in seconds.
+            broadcast (PreparedBroadcast | None): The synapse prepared for sending to many axons (see `query_axons`).
+                If None, the synapse is prepared for this query only.
+            uid (int | None): The uid of the miner, to record the result in the miner telemetry.
+
+        The request is compressed if the miner advertised a supported encoding (`--axon_pool.compression`). If the miner
+        rejects the compressed request (415), it is sent again uncompressed.
+
+        Returns:
+            bt.Synapse: A copy of the synapse, filled with the axon's response.
+        """
 
         start_time = time.time()
         target_axon = axon.info() if isinstance(axon, bt.Axon) else axon
 
         url = self.dendrite._get_endpoint_url(target_axon, synapse.__class__.__name__)
 
-        synapse = self.preprocess_synapse_for_request(
-            target_axon_info=target_axon,
-            synapse=synapse,
-            timeout=timeout,
+        if broadcast is None:
+            broadcast = PreparedBroadcast(
+                synapse,
+                timeout,
+                compression_min_bytes=self.config.axon_pool.compression_min_bytes,
+            )
+
+        encoding = choose_encoding(
+            self.compression_capabilities.get(target_axon.hotkey),
+            self.config.axon_pool.compression,
+        )
+
+        synapse, headers, body = broadcast.prepare(
+            self.dendrite, target_axon, encoding
         )
+        response_size = 0
+        bytes_received = 0
 
         try:
-            async with httpx.AsyncClient() as client:
-                bt.logging.trace(
-                    f"dendrite | --> | {synapse.get_total_size()} B | {synapse.name} | {synapse.axon.hotkey} | {synapse.axon.ip}:{str(synapse.axon.port)} | 0 | Success"
-                )
+            bt.logging.trace(
+                f"dendrite | --> | {len(body)} B | {synapse.name} | {synapse.axon.hotkey} | {synapse.axon.ip}:{str(synapse.axon.port)} | 0 | Success"
+            )
 
-                bt.legacy_encrypt_keyfile_data
-                response = await client.post(
+            response, content = await self.axon_pool.post(
+                url,
+                host=f"{target_axon.ip}:{target_axon.port}",
+                timeout=timeout,
+                max_response_bytes=self.config.axon_pool.max_response_bytes,
+                headers={**headers, "Content-Type": "application/json"},
+                content=body,
+            )
+
+            if response.status_code == 415 and "Content-Encoding" in headers:
+                bt.logging.debug(
+                    f"Miner {target_axon.hotkey} rejected {headers['Content-Encoding']} request, retrying uncompressed"
+                )
+                self.compression_capabilities.update(target_axon.hotkey, None)
+                synapse, headers, body = broadcast.prepare(self.dendrite, target_axon)
+                response, content = await self.axon_pool.post(
                     url,
-                    headers=synapse.to_headers(),
-                    json=synapse.model_dump(),
-                    timeout=timeout,
+                    host=f"{target_axon.ip}:{target_axon.port}",
+                    timeout=max(timeout - (time.time() - start_time), 0.0),
+                    max_response_bytes=self.config.axon_pool.max_response_bytes,
+                    headers={**headers, "Content-Type": "application/json"},
+                    content=body,
                 )
-
-                json_response = response.json()
-
-                # process the response
-
-                if response.status_code == 200:
-                    new_synapse = synapse.__class__(**json_response)
-                    for key in synapse.model_dump().keys():
-                        try:
-                            setattr(synapse, key, getattr(new_synapse, key))
-                        except Exception as e:
-                            # bt.logging.error(f"Error setting attribute {key}: {e}")
-                            # traceback.print_exc()
-                            pass
-                else:
-                    if synapse.axon is None:
-                        synapse.axon = bt.TerminalInfo()
-                    synapse.axon.status_code = response.status_code
-                    synapse.axon.status_message = json_response.get("message")
-
-                server_headers = bt.Synapse.from_headers(response.headers)
-
-                # Merge dendrite headers
-                synapse.dendrite.__dict__.update(
-                    {
-                        **synapse.dendrite.model_dump(exclude_none=True),
-                        **server_headers.dendrite.model_dump(exclude_none=True),
-                    }
+            else:
+                self.compression_capabilities.update(
+                    target_axon.hotkey,
+                    response.headers.get(ACCEPT_REQUEST_ENCODING_HEADER),
                 )
 
-                # Merge axon headers
-                synapse.axon.__dict__.update(
-                    {
-                        **synapse.axon.model_dump(exclude_none=True),
-                        **server_headers.axon.model_dump(exclude_none=True),
-                    }
-                )
+            response_size = len(content)
+            bytes_received = response.num_bytes_downloaded
+            broadcast.byte_counts.responses_raw += response_size
+            broadcast.byte_counts.responses_received += bytes_received
 
-                # Update the status code and status message of the dendrite to match the axon
-                synapse.dendrite.status_code = synapse.axon.status_code  # type: ignore
-                synapse.dendrite.status_message = synapse.axon.status_message  # type: ignore
+            # process the response
+            decode_chunk_response(
+                synapse, response.status_code, response.headers, content
+            )
+
+            # from sending the (last) request until the response was read: neither the wait for a per-host slot nor
+            # a compressed attempt the miner rejected count as the miner's latency
+            synapse.dendrite.process_time = response.elapsed.total_seconds()
 
-                synapse.dendrite.process_time = str(time.time() - start_time)  # type: ignore
+        except (httpx.TimeoutException, asyncio.TimeoutError) as e:
+            synapse.dendrite.status_code = 408
+            synapse.dendrite.status_message = f"Timedout after {timeout} seconds"
+
+        except ResponseTooLargeError as e:
+            synapse.dendrite.status_code = 413
+            synapse.dendrite.status_message = str(e)
 
         except Exception as e:
             # bt.logging.error(f"Error querying axon: {e}")
@@ -879,83 +1177,170 @@ class BaseValidatorNeuron(BaseNeuron):
             synapse.dendrite.status_message = str(e)
 
         finally:
+            AXON_QUERY_SECONDS.observe(time.time() - start_time)
+            AXON_QUERIES.inc(status_code=synapse.dendrite.status_code)
+
+            if uid is not None:
+                self.telemetry.record(
+                    uid,
+                    status_code=synapse.dendrite.status_code,
+                    latency=synapse.dendrite.process_time,
+                    time_soft_max=getattr(synapse, "time_soft_max", None),
+                    bytes_sent=len(body),
+                    bytes_received=bytes_received,
+                )
+
             if synapse.axon is not None and synapse.dendrite is not None:
                 bt.logging.trace(
-                    f"dendrite | <-- | {synapse.get_total_size()} B | {synapse.name} | {synapse.axon.hotkey} | {synapse.axon.ip}:{str(synapse.axon.port)} | {synapse.dendrite.status_code} | {synapse.dendrite.status_message} | {synapse.dendrite.process_time} seconds"
+                    f"dendrite | <-- | {response_size} B | {synapse.name} | {synapse.axon.hotkey} | {synapse.axon.ip}:{str(synapse.axon.port)} | {synapse.dendrite.status_code} | {synapse.dendrite.status_message} | {synapse.dendrite.process_time} seconds"
                 )
 
             return synapse
 
     async def query_axons(
-        self, axons: list[bt.axon], synapse: bt.Synapse, timeout: float
+        self,
+        axons: list[bt.axon],
+        synapse: bt.Synapse,
+        timeout: float,
+        uids: list[int] | None = None,
     ) -> list[bt.Synapse]:
+        """
+        Queries the axons with the synapse. If the uids of the axons are given, the results are recorded in the miner
+        telemetry.
+        """
+        if uids is None:
+            uids = [None] * len(axons)
+
         if self.config.query_axons_type == "custom":
+            # the body is the same for every axon, serialize (and compress) it once
+            broadcast = PreparedBroadcast(
+                synapse,
+                timeout,
+                compression_min_bytes=self.config.axon_pool.compression_min_bytes,
+            )
             coros = [
-                self.query_axon(axon, synapse.model_copy(), timeout) for axon in axons
+                self.query_axon(axon, synapse, timeout, broadcast, uid)
+                for axon, uid in zip(axons, uids)
             ]
             responses = await asyncio.gather(*coros)
+
+            byte_counts = broadcast.byte_counts
+            bt.logging.debug(
+                f"Round bytes: requests {byte_counts.requests_sent}/{byte_counts.requests_raw} B sent/raw, "
+                f"responses {byte_counts.responses_received}/{byte_counts.responses_raw} B received/raw"
+            )
+            self.axon_pool.record_bytes(byte_counts)
             return responses
         elif (
             self.config.query_axons_type == "bt"
             or self.config.query_axons_type == "bittensor"
         ):
-            return await self.dendrite.forward(
+            responses = await self.dendrite.forward(
                 axons=axons,
                 deserialize=False,
                 synapse=synapse,
                 timeout=timeout,
             )
+            for uid, response in zip(uids, responses):
+                if uid is not None:
+                    self.telemetry.record(
+                        uid,
+                        status_code=response.dendrite.status_code,
+                        latency=response.dendrite.process_time,
+                        time_soft_max=getattr(response, "time_soft_max", None),
+                    )
+            return responses
         else:
             raise ValueError(
                 f"Invalid query_axons_type: {self.config.query_axons_type}. Must be 'custom', 'bt', or 'bittensor'."
             )
 
-    async def sync_articles(self):
+    async def sync_articles(self, client: httpx.AsyncClient | None = None) -> bool:
+        """
+        Fetches the article catalog from wikipedia and swaps it in, saving it to disk if it changed.
+
+        On failure (or an empty listing) the current catalog is kept.
+
+        Args:
+            client (httpx.AsyncClient | None): Client to fetch with, so connections can be reused across refreshes.
+                If None, a client is created for this sync only.
+
+        Returns:
+            bool: Whether the catalog was synced.
+        """
         try:
             bt.logging.debug(f"syncing articles")
-            articles = []
-
-            async with httpx.AsyncClient() as client:
-                res = await client.get(
-                    "https://en.wikipedia.org/w/api.php",
-                    params={
-                        "action": "query",
-                        "format": "json",
-                        "list": "categorymembers",
-                        "cmpageid": "8966941",
-                        "cmprop": "ids",
-                        "cmlimit": "max",
-                    },
-                )
-                response = res.json()
+            start_time = time.time()
+
+            if client is None:
+                async with httpx.AsyncClient(timeout=ARTICLES_SYNC_TIMEOUT) as client:
+                    articles = await fetch_articles(client)
+            else:
+                articles = await fetch_articles(client)
+
+            if len(articles) == 0:
+                bt.logging.warning("Got empty article catalog, keeping current catalog")
+                return False
 
-                articles.extend(
-                    [page["pageid"] for page in response["query"]["categorymembers"]]
+            articles_hash = hash_articles(articles)
+            if articles_hash != self.articles_hash:
+                bt.logging.info(
+                    f"Article catalog changed ({len(articles)} articles), saving to disk"
                 )
-                continuation = response.get("continue")
-                while continuation is not None:
-                    res = await client.get(
-                        "https://en.wikipedia.org/w/api.php",
-                        params={
-                            "action": "query",
-                            "format": "json",
-                            "list": "categorymembers",
-                            "cmpageid": "8966941",
-                            "cmprop": "ids",
-                            "cmlimit": "max",
-                            "cmcontinue": continuation.get("cmcontinue"),
-                        },
-                    )
-                    response = res.json()
-                    continuation = response.get("continue")
-                    articles.extend(
-                        [
-                            page["pageid"]
-                            for page in response["query"]["categorymembers"]
-                        ]
-                    )
-            self.articles = articles
-            bt.logging.debug(f"synced articles!")
+                self.articles = articles
+                await self.save_articles(articles, articles_hash)
+
+            self.articles_synced_at = time.time()
+            await asyncio.to_thread(
+                save_articles_synced_at,
+                self.config.neuron.full_path,
+                self.articles_synced_at,
+            )
+            bt.logging.debug(
+                f"synced {len(articles)} articles in {self.articles_synced_at - start_time:.2f} seconds"
+            )
+            return True
         except Exception as e:
-            bt.logging.error(f"Error syncing articles: {e}")
+            bt.logging.error(f"Error syncing articles, keeping current catalog: {e}")
             traceback.print_exc()
+            return False
+
+    async def articles_refresher(self):
+        """
+        Refreshes the article catalog in the background whenever it is older than `--articles.refresh_interval_hours`.
+
+        Uses a single client for its lifetime so connections are pooled across pages and refreshes. Failed refreshes
+        are retried after `ARTICLES_RETRY_SECONDS` (or the refresh interval, if shorter).
+        """
+        refresh_interval = self.config.articles.refresh_interval_hours * 3600
+        bt.logging.info(
+            f"Starting article catalog refresher, refreshing every {refresh_interval} seconds"
+        )
+
+        async with httpx.AsyncClient(timeout=ARTICLES_SYNC_TIMEOUT) as client:
+            while True:
+                if self.articles_synced_at is not None:
+                    age = time.time() - self.articles_synced_at
+                    if age < refresh_interval:
+                        await asyncio.sleep(refresh_interval - age)
+                        continue
+
+                if not await self.sync_articles(client):
+                    await asyncio.sleep(min(ARTICLES_RETRY_SECONDS, refresh_interval))
+
+    async def wiki_cache_refresher(self):
+        """
+        Keeps the wiki page cache ready in the background: prefetches pages sampled from the article catalog for
+        upcoming synthetic documents and revalidates the revisions of cached pages.
+        """
+        if self.wiki_cache is None:
+            return
+
+        bt.logging.info("Starting wiki page cache refresher")
+        while True:
+            try:
+                await self.wiki_cache.prefetch_random(self.articles)
+                await self.wiki_cache.revalidate()
+            except Exception as e:
+                bt.logging.error(f"Error refreshing wiki page cache: {e}")
+            await asyncio.sleep(WIKI_CACHE_REFRESH_SECONDS)
@@ -0,0 +1,7 @@
+from .population import MinerPopulation
+from .simulator import (
+    SimulationConfig,
+    SimulationResult,
+    run_simulation,
+    run_sweep,
+)
@@ -0,0 +1,3 @@
+from chunking.simulator.simulator import main
+
+main()
@@ -0,0 +1,79 @@
+import numpy as np
+
+
+class MinerPopulation:
+    """
+    A population of synthetic miners, stored as arrays indexed by uid.
+
+    Each miner has:
+    - a latent quality: the expected (log) reward of its responses, higher is better.
+    - a noise level: the standard deviation of its (log) reward from round to round.
+    - a dropout probability: the chance that it does not respond (or responds with invalid chunks) in a round.
+
+    Random draws are made in blocks so that per-round sampling is a handful of array lookups.
+    """
+
+    def __init__(
+        self,
+        n: int,
+        rng: np.random.Generator,
+        quality_std: float = 0.05,
+        noise_std: float = 0.02,
+        dropout: float = 0.05,
+        block_size: int = 4096,
+    ):
+        self.n = n
+        self.rng = rng
+        self.quality_std = quality_std
+        self.noise_std = noise_std
+        self.dropout = dropout
+        self.block_size = block_size
+
+        self.quality = rng.normal(0, quality_std, size=n)
+        self.noise = np.full(n, noise_std, dtype=np.float64)
+        self.dropout_p = np.full(n, dropout, dtype=np.float64)
+
+        self._normal_block = np.empty((0, n))
+        self._uniform_block = np.empty((0, n))
+        self._block_index = 0
+
+    def _refill(self):
+        self._normal_block = self.rng.standard_normal((self.block_size, self.n))
+        self._uniform_block = self.rng.random((self.block_size, self.n))
+        self._block_index = 0
+
+    def sample_rewards(self, uids: np.ndarray) -> np.ndarray:
+        """
+        Samples the rewards of the given miners for one tournament round.
+
+        Rewards are strictly positive, like the validator's `e ** reward`. Miners that drop out get a reward of 0.
+        """
+        if self._block_index >= len(self._normal_block):
+            self._refill()
+
+        normal = self._normal_block[self._block_index, uids]
+        uniform = self._uniform_block[self._block_index, uids]
+        self._block_index += 1
+
+        rewards = np.exp(self.quality[uids] + self.noise[uids] * normal)
+        rewards[uniform < self.dropout_p[uids]] = 0
+        return rewards
+
+    def replace(self, uid: int, quality: float | None = None):
+        """
+        Replaces the miner at `uid` with a new one (deregistration + registration).
+        """
+        self.quality[uid] = (
+            quality
+            if quality is not None
+            else self.rng.normal(0, self.quality_std)
+        )
+
+    def true_rankings(self) -> np.ndarray:
+        """
+        Gets the uids sorted by latent quality, best first.
+        """
+        return np.argsort(-self.quality, kind="stable")
+
+    def best_uid(self) -> int:
+        return int(np.argmax(self.quality))
@@ -0,0 +1,270 @@
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from chunking.base.validator import BaseValidatorNeuron
+from chunking.simulator.population import MinerPopulation
+from chunking.utils.score import get_alpha, get_new_scores
+from chunking.validator.reward import rank_responses, rank_responses_global
+from chunking.validator.tournament import create_groups
+
+# number of top miners that receive exponentially decaying weights, see `BaseValidatorNeuron._get_raw_weights`
+NUM_WEIGHTS_CAP = 7
+
+
+class SimulationConfig(BaseModel):
+    """
+    Parameters of an offline tournament simulation.
+    """
+
+    num_miners: int = Field(default=256, gt=1)
+    rounds: int = Field(default=10_000, gt=0)
+    # minimum group size, `--neuron.sample_size` on the validator
+    sample_size: int = Field(default=2, gt=1)
+    # `--neuron.min_moving_average_alpha` on the validator
+    min_moving_average_alpha: float = 0.025
+    # spread of latent miner quality (log reward)
+    quality_std: float = 0.05
+    # round-to-round noise of a miner's (log) reward
+    noise_std: float = 0.02
+    # probability that a miner does not respond in a round
+    dropout: float = 0.05
+    # probability per round that a random uid is replaced by a new miner
+    churn_rate: float = 0.0
+    # round at which a new miner, better than every other miner, replaces a random uid (None to disable)
+    inject_top_miner_at: int | None = None
+    # how much better (in log reward) the injected miner is than the current best miner
+    inject_margin: float = 0.05
+    # interval (in rounds) between convergence measurements
+    eval_interval: int = Field(default=1000, gt=0)
+    seed: int = 0
+
+
+class SimulationResult(BaseModel):
+    """
+    Results of an offline tournament simulation.
+    """
+
+    config: SimulationConfig
+    # rounds at which convergence was measured
+    eval_rounds: list[int]
+    # spearman correlation between the validator's ranking and the true ranking of active miners
+    spearman: list[float]
+    # whether the validator's top miner is the true best miner
+    top_1_correct: list[bool]
+    # share of the raw weights given to the true top `NUM_WEIGHTS_CAP` miners
+    top_weight_share: list[float]
+    # rounds it took for each new best miner to reach rank 0 (only for promotions that completed)
+    rounds_to_promote: list[int]
+    # new best miners that had not reached rank 0 by the end of the simulation
+    pending_promotions: int
+    cpu_seconds_per_round_mean: float
+    cpu_seconds_per_round_p95: float
+    wall_seconds: float
+
+
+def spearman_correlation(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Spearman rank correlation between two arrays (no tie correction).
+    """
+    if len(a) < 2:
+        return float("nan")
+    rank_a = np.argsort(np.argsort(a))
+    rank_b = np.argsort(np.argsort(b))
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+def _evaluate(
+    scores: np.ndarray, rankings: np.ndarray, population: MinerPopulation
+) -> tuple[float, bool, float]:
+    active = np.isfinite(scores)
+
+    # lower score is better, higher quality is better
+    spearman = spearman_correlation(-scores[active], population.quality[active])
+
+    top_1_correct = bool(rankings[0] == population.best_uid())
+
+    raw_weights = BaseValidatorNeuron._get_raw_weights(scores, rankings)
+    total = float(np.sum(raw_weights))
+    true_top = population.true_rankings()[:NUM_WEIGHTS_CAP]
+    top_weight_share = float(np.sum(raw_weights[true_top]) / total) if total else 0.0
+
+    return spearman, top_1_correct, top_weight_share
+
+
+def run_simulation(config: SimulationConfig) -> SimulationResult:
+    """
+    Runs the validator's tournament scoring (`create_groups`, `rank_responses`, `rank_responses_global`,
+    `get_alpha`, `get_new_scores` and `_get_raw_weights`) against a synthetic miner population, one group per round
+    like a validator with `--neuron.num_concurrent_forwards 1`.
+    """
+    rng = np.random.default_rng(config.seed)
+    population = MinerPopulation(
+        config.num_miners,
+        rng,
+        quality_std=config.quality_std,
+        noise_std=config.noise_std,
+        dropout=config.dropout,
+    )
+
+    n = config.num_miners
+    scores = np.full(n, np.inf, dtype=np.float64)
+    rankings = np.arange(n)
+    group_size = min(n, config.sample_size)
+
+    groups_rankings = None
+    miner_groups, group_rank_values = None, None
+
+    eval_rounds, spearman, top_1_correct, top_weight_share = [], [], [], []
+    rounds_to_promote: list[int] = []
+    # uid -> round at which the uid became the (new) best miner
+    pending: dict[int, int] = {}
+
+    cpu_times = np.empty(config.rounds)
+    wall_start = time.perf_counter()
+
+    def replace_miner(uid: int, quality: float | None, round_i: int):
+        nonlocal rankings
+        previous_best = population.best_uid()
+        pending.pop(uid, None)
+        population.replace(uid, quality)
+        # new hotkeys start unranked, see `BaseValidatorNeuron.resync_metagraph`
+        scores[uid] = np.inf
+        rankings = np.argsort(scores)
+        if population.best_uid() == uid and uid != previous_best:
+            pending[uid] = round_i
+
+    for round_i in range(config.rounds):
+        cpu_start = time.process_time()
+
+        if config.churn_rate > 0 and rng.random() < config.churn_rate:
+            replace_miner(int(rng.integers(n)), None, round_i)
+
+        if config.inject_top_miner_at == round_i:
+            quality = population.quality.max() + config.inject_margin
+            replace_miner(int(rng.integers(n)), quality, round_i)
+
+        # groups only depend on the rankings, so reuse them while the rankings are unchanged
+        if groups_rankings is None or not np.array_equal(groups_rankings, rankings):
+            miner_groups, _, group_rank_values = create_groups(rankings, group_size)
+            groups_rankings = rankings
+
+        miner_group_index = int(rng.integers(len(miner_groups)))
+        uids = miner_groups[miner_group_index]
+        rank_values = group_rank_values[miner_group_index]
+
+        rewards = population.sample_rewards(uids)
+        ranked_responses = rank_responses(rewards)
+        ranked_responses_global = rank_responses_global(
+            None, rank_values, ranked_responses, uids, override_scores=scores
+        )
+        # mirrors `score_miner_group_responses`
+        alpha = get_alpha(
+            None,
+            len(uids),
+            miner_group_index,
+            override_min_moving_average_alpha=config.min_moving_average_alpha,
+        )
+
+        scores = get_new_scores(
+            scores=scores,
+            uids=uids,
+            alpha=alpha,
+            group_best_possible_rank_value=rank_values[0],
+            rank_values=ranked_responses_global,
+            miner_group_index=miner_group_index,
+        )
+        rankings = np.argsort(scores)
+
+        if pending:
+            top_uid = int(rankings[0])
+            if top_uid in pending:
+                rounds_to_promote.append(round_i - pending.pop(top_uid))
+
+        cpu_times[round_i] = time.process_time() - cpu_start
+
+        if (round_i + 1) % config.eval_interval == 0 or round_i + 1 == config.rounds:
+            s, t, w = _evaluate(scores, rankings, population)
+            eval_rounds.append(round_i + 1)
+            spearman.append(s)
+            top_1_correct.append(t)
+            top_weight_share.append(w)
+
+    return SimulationResult(
+        config=config,
+        eval_rounds=eval_rounds,
+        spearman=spearman,
+        top_1_correct=top_1_correct,
+        top_weight_share=top_weight_share,
+        rounds_to_promote=rounds_to_promote,
+        pending_promotions=len(pending),
+        cpu_seconds_per_round_mean=float(np.mean(cpu_times)),
+        cpu_seconds_per_round_p95=float(np.percentile(cpu_times, 95)),
+        wall_seconds=time.perf_counter() - wall_start,
+    )
+
+
+def run_sweep(
+    configs: list[SimulationConfig], max_workers: int | None = None
+) -> list[SimulationResult]:
+    """
+    Runs several simulations in parallel, one process per simulation.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_simulation, configs))
+
+
+def main():
+    argparser = argparse.ArgumentParser(
+        description="Offline simulation of the validator's tournament scoring"
+    )
+    argparser.add_argument("--num_miners", type=int, default=256)
+    argparser.add_argument("--rounds", type=int, default=10_000)
+    argparser.add_argument("--sample_size", type=int, default=2)
+    argparser.add_argument("--min_moving_average_alpha", type=float, default=0.025)
+    argparser.add_argument("--quality_std", type=float, default=0.05)
+    argparser.add_argument("--noise_std", type=float, default=0.02)
+    argparser.add_argument("--dropout", type=float, default=0.05)
+    argparser.add_argument("--churn_rate", type=float, default=0.0)
+    argparser.add_argument("--inject_top_miner_at", type=int, default=None)
+    argparser.add_argument("--inject_margin", type=float, default=0.05)
+    argparser.add_argument("--eval_interval", type=int, default=1000)
+    argparser.add_argument("--seed", type=int, default=0)
+    argparser.add_argument(
+        "--num_seeds",
+        type=int,
+        default=1,
+        help="Number of seeds to sweep over (starting at --seed), run in parallel.",
+    )
+    argparser.add_argument("--workers", type=int, default=None)
+    argparser.add_argument("--out_file", type=str, default=None)
+
+    args = vars(argparser.parse_args())
+    num_seeds = args.pop("num_seeds")
+    workers = args.pop("workers")
+    out_file = args.pop("out_file")
+
+    configs = [
+        SimulationConfig(**{**args, "seed": args["seed"] + i}) for i in range(num_seeds)
+    ]
+    results = run_sweep(configs, workers) if num_seeds > 1 else [run_simulation(configs[0])]
+
+    for result in results:
+        print(
+            f"seed {result.config.seed}: spearman {result.spearman[-1]:.3f}, top-1 correct {result.top_1_correct[-1]}, "
+            f"top weight share {result.top_weight_share[-1]:.3f}, rounds to promote {result.rounds_to_promote}, "
+            f"pending promotions {result.pending_promotions}, cpu/round {result.cpu_seconds_per_round_mean * 1e6:.1f}us "
+            f"(p95 {result.cpu_seconds_per_round_p95 * 1e6:.1f}us), wall {result.wall_seconds:.1f}s"
+        )
+
+    if out_file:
+        with open(out_file, "w") as f:
+            json.dump([result.model_dump() for result in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import random
+from typing import Sequence
+
+import httpx
+import numpy as np
+
+from chunking.utils.state import atomic_write
+
+# bump when the on-disk layout of the article catalog changes
+ARTICLES_FORMAT_VERSION = 1
+
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+# pageid of the category whose members make up the article catalog
+ARTICLES_CATEGORY_PAGEID = "8966941"
+
+
+def get_articles_path(dir_path: str) -> str:
+    """
+    Gets the path of the (versioned) article catalog file in the given directory.
+    """
+    return os.path.join(dir_path, f"articles.v{ARTICLES_FORMAT_VERSION}.npy")
+
+
+def hash_articles(articles: Sequence[int] | np.ndarray) -> str:
+    """
+    Gets a hash of the article catalog, used to detect whether the catalog changed since it was last saved.
+    """
+    return hashlib.sha256(np.asarray(articles, dtype=np.int64).tobytes()).hexdigest()
+
+
+def save_articles(path: str, articles: Sequence[int] | np.ndarray):
+    """
+    Atomically saves the article catalog (list of Wikipedia page ids) as a `.npy` file.
+    """
+    atomic_write(path, lambda f: np.save(f, np.asarray(articles, dtype=np.int64)))
+
+
+def load_articles(path: str) -> np.ndarray | None:
+    """
+    Loads the article catalog as a read-only memory-mapped array, or None if there is no saved catalog.
+    """
+    if not os.path.exists(path):
+        return None
+    return np.load(path, mmap_mode="r")
+
+
+def get_articles_synced_at_path(dir_path: str) -> str:
+    """
+    Gets the path of the file holding when the article catalog was last fetched.
+    """
+    return os.path.join(dir_path, "articles_synced_at.json")
+
+
+def save_articles_synced_at(dir_path: str, synced_at: float):
+    """
+    Atomically saves the unix time the article catalog was last fetched. The catalog itself is only rewritten when it
+    changes, so its mtime isn't the time of the last fetch.
+    """
+    data = json.dumps({"synced_at": synced_at}).encode()
+    atomic_write(get_articles_synced_at_path(dir_path), lambda f: f.write(data))
+
+
+def load_articles_synced_at(dir_path: str) -> float | None:
+    """
+    Loads the unix time the article catalog was last fetched, or None if it isn't known.
+    """
+    try:
+        with open(get_articles_synced_at_path(dir_path)) as f:
+            return float(json.load(f)["synced_at"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def sample_articles(articles: Sequence[int] | np.ndarray, k: int) -> list[int]:
+    """
+    Samples `k` unique page ids from the article catalog.
+
+    Works for both lists and (memory-mapped) numpy arrays without materializing the whole catalog.
+    """
+    return [int(articles[i]) for i in random.sample(range(len(articles)), k)]
+
+
+async def fetch_articles(client: httpx.AsyncClient) -> list[int]:
+    """
+    Fetches the article catalog (page ids of the category members) from Wikipedia, following `cmcontinue`
+    continuation until the listing is exhausted.
+
+    Reuses the connections of the given client across pages. Raises on any failed page, so that a partial
+    catalog is never returned.
+    """
+    params = {
+        "action": "query",
+        "format": "json",
+        "list": "categorymembers",
+        "cmpageid": ARTICLES_CATEGORY_PAGEID,
+        "cmprop": "ids",
+        "cmlimit": "max",
+    }
+
+    articles: list[int] = []
+    continuation = {}
+    while True:
+        res = await client.get(WIKIPEDIA_API_URL, params={**params, **continuation})
+        res.raise_for_status()
+        response = res.json()
+
+        articles.extend(
+            [page["pageid"] for page in response["query"]["categorymembers"]]
+        )
+
+        continuation = response.get("continue")
+        if continuation is None:
+            return articles
+        continuation = {"cmcontinue": continuation["cmcontinue"]}
@@ -1,4 +1,42 @@
 from math import ceil
+from typing import Iterable, Iterator, List
+
+from nltk.tokenize import sent_tokenize
 
 def calculate_chunk_qty(document: str, chunk_size: int, multiplier: float = 2.0) -> int:
     return ceil(ceil(len(document) / chunk_size) * multiplier)
+
+
+def iter_chunks(sentences: Iterable[str], chunk_size: int) -> Iterator[str]:
+    """
+    Greedily packs consecutive sentences, joined by single spaces, into chunks of at most `chunk_size` characters. A
+    sentence longer than `chunk_size` becomes a chunk of its own.
+
+    Runs in linear time: the length of the current chunk is tracked as sentences are added, and each chunk is joined
+    once, when it's yielded.
+    """
+    parts: list[str] = []
+    length = 0
+    for sentence in sentences:
+        if parts and length + 1 + len(sentence) > chunk_size:
+            yield " ".join(parts)
+            parts = []
+
+        if parts:
+            length += 1 + len(sentence)
+        else:
+            length = len(sentence)
+        parts.append(sentence)
+
+    if parts:
+        yield " ".join(parts)
+
+
+def sentence_chunker(document: str, chunk_size: int, max_num_chunks: int) -> List[str]:
+    """
+    Chunks the document by packing its sentences into chunks of at most `chunk_size` characters (the default miner
+    chunker). Does not factor in the maximum number of chunks.
+
+    A module-level function, so it can run in a process pool.
+    """
+    return list(iter_chunks(sent_tokenize(document), chunk_size))
@@ -79,6 +79,27 @@ def add_args(cls, parser):
         default=50,
     )
 
+    parser.add_argument(
+        "--loop_monitor.enabled",
+        action="store_true",
+        help="If set, monitors how long the event loop is blocked and logs the blocking call sites.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--loop_monitor.threshold",
+        type=float,
+        help="The min time in seconds the event loop must be blocked to record the blocking call site.",
+        default=0.1,
+    )
+
+    parser.add_argument(
+        "--loop_monitor.report_interval",
+        type=float,
+        help="The interval in seconds between event loop monitor reports.",
+        default=300.0,
+    )
+
     if neuron_type == "validator":
 
         parser.add_argument(
@@ -95,6 +116,20 @@ def add_args(cls, parser):
             default=1,
         )
 
+        parser.add_argument(
+            "--neuron.pipeline",
+            action="store_true",
+            help="If set, runs querying, scoring and committing (score updates, state saving, chain syncs) as overlapping pipeline stages.",
+            default=False,
+        )
+
+        parser.add_argument(
+            "--neuron.pipeline_queue_size",
+            type=int,
+            help="The max number of items waiting between two pipeline stages.",
+            default=2,
+        )
+
         parser.add_argument(
             "--neuron.sample_size",
             type=int,
@@ -223,17 +258,73 @@ def add_args(cls, parser):
         parser.add_argument(
             "--doc_gen.queue_size",
             type=int,
-            help="The size of the synthetic document queue.",
+            help="The number of unused synthetic documents to keep ready in the document pool.",
             default=10,
         )
 
+        parser.add_argument(
+            "--doc_gen.max_uses",
+            type=int,
+            help="The max number of rounds a synthetic document is used in. Above 1, documents are reused when no unused document is ready.",
+            default=1,
+        )
+
+        parser.add_argument(
+            "--doc_gen.pool_max_mb",
+            type=float,
+            help="The max size in MB of the (compressed) synthetic document pool on disk, the oldest documents are evicted.",
+            default=200,
+        )
+
         parser.add_argument(
             "--doc_gen.concurrent_n",
             type=int,
-            help="The number of concurrent document generation tasks to run.",
+            help="The number of concurrent LLM requests (document sections) or wikipedia document generation tasks to run.",
             default=6,
         )
 
+        parser.add_argument(
+            "--doc_gen.max_active",
+            type=int,
+            help="The number of LLM generated documents in progress at once, their sections are generated interleaved.",
+            default=12,
+        )
+
+        parser.add_argument(
+            "--doc_gen.rpm",
+            type=float,
+            help="The max number of LLM requests per minute for document generation (0 for no limit).",
+            default=500,
+        )
+
+        parser.add_argument(
+            "--doc_gen.tpm",
+            type=float,
+            help="The max number of LLM tokens per minute for document generation (0 for no limit).",
+            default=2_000_000,
+        )
+
+        parser.add_argument(
+            "--doc_gen.step_timeout",
+            type=float,
+            help="Time to wait for a section of an LLM generated document before retrying it.",
+            default=60,
+        )
+
+        parser.add_argument(
+            "--doc_gen.stream",
+            action="store_true",
+            help="If set, streams LLM completions so documents can be handed off early (see --doc_gen.handoff_min_chars).",
+            default=False,
+        )
+
+        parser.add_argument(
+            "--doc_gen.handoff_min_chars",
+            type=int,
+            help="The min length in characters of an LLM generated document to use it before it's fully generated, when no unused document is ready.",
+            default=20000,
+        )
+
         parser.add_argument(
             "--doc_gen.timeout",
             type=float,
@@ -241,6 +332,134 @@ def add_args(cls, parser):
             default=160,
         )
 
+        parser.add_argument(
+            "--wiki_cache.off",
+            action="store_true",
+            help="If set, fetches wikipedia pages for synthetic documents on every use instead of caching them on disk.",
+            default=False,
+        )
+
+        parser.add_argument(
+            "--wiki_cache.max_mb",
+            type=float,
+            help="The max size in MB of the (compressed) wikipedia page cache, least recently used pages are evicted.",
+            default=500,
+        )
+
+        parser.add_argument(
+            "--wiki_cache.revalidate_hours",
+            type=float,
+            help="The interval in hours after which the revisions of cached wikipedia pages are checked.",
+            default=24,
+        )
+
+        parser.add_argument(
+            "--wiki_cache.prefetch_count",
+            type=int,
+            help="The number of wikipedia pages to fetch ahead of time for upcoming synthetic documents.",
+            default=30,
+        )
+
+        parser.add_argument(
+            "--wiki_cache.prefetch_concurrency",
+            type=int,
+            help="The max number of concurrent wikipedia page downloads when prefetching.",
+            default=4,
+        )
+
+        parser.add_argument(
+            "--articles.refresh_interval_hours",
+            type=float,
+            help="The interval between background refreshes of the cached Wikipedia article catalog in hours.",
+            default=24,
+        )
+
+        parser.add_argument(
+            "--axon_pool.max_connections",
+            type=int,
+            help="The max number of open connections to miner axons.",
+            default=256,
+        )
+
+        parser.add_argument(
+            "--axon_pool.max_connections_per_host",
+            type=int,
+            help="The max number of concurrent requests to a single miner axon (ip:port).",
+            default=4,
+        )
+
+        parser.add_argument(
+            "--axon_pool.connect_timeout",
+            type=float,
+            help="The max time in seconds to connect to a miner axon (capped at the query timeout).",
+            default=5.0,
+        )
+
+        parser.add_argument(
+            "--axon_pool.keepalive_expiry",
+            type=float,
+            help="The time in seconds idle connections to miner axons are kept open.",
+            default=60.0,
+        )
+
+        parser.add_argument(
+            "--axon_pool.max_response_bytes",
+            type=int,
+            help="The max size in bytes of a miner's response, larger responses are dropped.",
+            default=32 * 1024 * 1024,
+        )
+
+        parser.add_argument(
+            "--axon_pool.http2",
+            action="store_true",
+            help="If set, uses HTTP/2 to query miner axons that support it (requires the `h2` package).",
+            default=False,
+        )
+
+        parser.add_argument(
+            "--axon_pool.compression",
+            type=str,
+            choices=["auto", "gzip", "zstd", "none"],
+            help="The encoding to compress queries to miners that support it with (`auto` picks the best one both sides support, `zstd` requires the `zstandard` package).",
+            default="auto",
+        )
+
+        parser.add_argument(
+            "--axon_pool.compression_min_bytes",
+            type=int,
+            help="The min size in bytes of a query body to compress it.",
+            default=16 * 1024,
+        )
+
+        parser.add_argument(
+            "--profiling.mode",
+            type=str,
+            choices=["cprofile", "sampling"],
+            help="How to profile tournament rounds: `cprofile` (deterministic, pstats files) or `sampling` (collapsed stack files).",
+            default="sampling",
+        )
+
+        parser.add_argument(
+            "--profiling.every_n_rounds",
+            type=int,
+            help="Profiles every Nth tournament round, 0 to only profile rounds requested through the task API.",
+            default=0,
+        )
+
+        parser.add_argument(
+            "--profiling.max_files",
+            type=int,
+            help="The max number of round profiles to keep, older ones are deleted.",
+            default=20,
+        )
+
+        parser.add_argument(
+            "--profiling.sample_interval",
+            type=float,
+            help="The interval in seconds between stack samples in `sampling` mode.",
+            default=0.005,
+        )
+
         parser.add_argument(
             "--no_forward",
             action="store_true",
@@ -313,6 +532,86 @@ def add_args(cls, parser):
             default=False,
         )
 
+        parser.add_argument(
+            "--neuron.relay_pin_refresh_interval",
+            type=float,
+            help="Seconds between refreshes of the cache of recent relay pins the duplicate checks use. If 0, the pins are fetched from IPFS for each request instead.",
+            default=10,
+        )
+
+        parser.add_argument(
+            "--neuron.embedding_cache_mb",
+            type=float,
+            help="Max size in MB of the cache of request document embeddings (by document hash) the duplicate checks use. If 0, documents are embedded for each request.",
+            default=64,
+        )
+
+        parser.add_argument(
+            "--neuron.disable_compression",
+            action="store_true",
+            help="If set, the axon neither accepts compressed requests nor compresses responses.",
+            default=False,
+        )
+
+        parser.add_argument(
+            "--neuron.compression_min_bytes",
+            type=int,
+            help="The min size in bytes of a response to compress it.",
+            default=16 * 1024,
+        )
+
+        parser.add_argument(
+            "--neuron.chunker",
+            type=str,
+            choices=["greedy", "semantic"],
+            help="The built-in chunker: greedy sentence packing, or semantic (splits where adjacent sentences are least similar).",
+            default="greedy",
+        )
+
+        parser.add_argument(
+            "--neuron.embedding_provider",
+            type=str,
+            choices=["openai", "local"],
+            help="The sentence embeddings of the semantic chunker: the OpenAI API, or local (offline, hashed bags of words).",
+            default="openai",
+        )
+
+        parser.add_argument(
+            "--neuron.semantic_window",
+            type=int,
+            help="The number of sentences on each side of a boundary the semantic chunker compares.",
+            default=3,
+        )
+
+        parser.add_argument(
+            "--neuron.chunk_executor",
+            type=str,
+            choices=["thread", "process"],
+            help="The pool chunk_document runs in. A process pool only runs the greedy chunker (not --neuron.chunker semantic), see Miner.chunk_fn.",
+            default="thread",
+        )
+
+        parser.add_argument(
+            "--neuron.chunk_workers",
+            type=int,
+            help="The number of documents chunked at once.",
+            default=2,
+        )
+
+        parser.add_argument(
+            "--neuron.chunk_queue_size",
+            type=int,
+            help="The max number of requests waiting to be chunked. When full, the lowest priority (stake) request is shed.",
+            default=8,
+        )
+
+        parser.add_argument(
+            "--neuron.chunk_deadline_margin",
+            type=float,
+            help="Seconds before the request's timeout a document must be chunked by, requests still waiting then are dropped.",
+            default=0.5,
+        )
+
         parser.add_argument(
             "--neuron.no_serve",
             action="store_true",
@@ -0,0 +1,230 @@
+import asyncio
+import heapq
+import itertools
+import time
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Callable
+
+import bittensor as bt
+
+EXECUTOR_KINDS = ["thread", "process"]
+
+
+class Overloaded(Exception):
+    """The request was shed: the queue is full of requests with a higher priority."""
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before it was done."""
+
+
+class ExecutorUnavailable(Exception):
+    """The request couldn't run: the executor was shut down, or its pool broke (e.g. a worker process died)."""
+
+
+class _Request:
+    def __init__(self, fn: Callable, args: tuple, priority: float, deadline: float):
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.deadline = deadline
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class PriorityExecutor:
+    """
+    Runs CPU bound work (e.g. chunking documents) in a thread or process pool, off the event loop, with admission
+    control.
+
+    - At most `max_workers` requests run at once, waiting requests are started highest priority first.
+    - At most `max_queue` requests wait. When the queue is full, a new request either sheds the lowest priority waiting
+      request (if its priority is higher) or is rejected itself, raising `Overloaded`.
+    - Each request has a deadline (`time.monotonic()` based). A request still waiting at its deadline is dropped
+      without running, and `DeadlineExceeded` is raised. Work that already started can't be interrupted, its result is
+      discarded.
+    - If the pool breaks (e.g. a worker process is killed), the requests running in it fail with
+      `ExecutorUnavailable` and a new pool is started for the next ones.
+
+    With a process pool, `fn` and its arguments must be picklable (e.g. a module-level function).
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 2, max_queue: int = 8):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Invalid executor kind: {kind}, must be one of {EXECUTOR_KINDS}")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = self._make_executor()
+        self._shut_down = False
+        # the event loop requests are submitted from (e.g. the axon server's), set on the first `submit`
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        # max-heap of waiting requests by priority, then arrival order
+        self._pending: list[tuple[float, int, _Request]] = []
+        self._counter = itertools.count()
+        self.running = 0
+
+        self.completed = 0
+        self.shed = 0
+        self.expired = 0
+        self.restarts = 0
+
+    def _make_executor(self) -> Executor:
+        if self.kind == "thread":
+            return ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="chunking"
+            )
+        return ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def _restart(self, broken: Executor, error: BaseException):
+        # every request running in the broken pool fails, only the first one restarts it
+        if broken is not self._executor or self._shut_down:
+            return
+        self.restarts += 1
+        bt.logging.error(f"Chunking executor pool broke ({error}), starting a new one")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._make_executor()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, request in self._pending if not request.future.done())
+
+    def _prune(self):
+        self._pending = [entry for entry in self._pending if not entry[2].future.done()]
+        heapq.heapify(self._pending)
+
+    def _admit(self, request: _Request):
+        if len(self._pending) >= self.max_queue:
+            self._prune()
+
+        if len(self._pending) >= self.max_queue:
+            lowest = max(self._pending, key=lambda entry: (entry[0], entry[1]))
+            if lowest[2].priority >= request.priority:
+                self.shed += 1
+                raise Overloaded(
+                    f"{len(self._pending)} requests waiting, all with priority >= {request.priority}"
+                )
+            self._pending.remove(lowest)
+            heapq.heapify(self._pending)
+            self.shed += 1
+            lowest[2].future.set_exception(
+                Overloaded(f"Shed for a request with priority {request.priority}")
+            )
+
+        heapq.heappush(self._pending, (-request.priority, next(self._counter), request))
+
+    def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while self.running < self.max_workers and self._pending:
+            _, _, request = heapq.heappop(self._pending)
+            if request.future.done():
+                # timed out (cancelled) while waiting
+                continue
+
+            executor = self._executor
+            try:
+                work = loop.run_in_executor(executor, request.fn, *request.args)
+            except (BrokenExecutor, RuntimeError) as e:
+                # broken, or shut down (RuntimeError: cannot schedule new futures after shutdown)
+                request.future.set_exception(ExecutorUnavailable(str(e)))
+                if isinstance(e, BrokenExecutor):
+                    self._restart(executor, e)
+                continue
+
+            self.running += 1
+            work.add_done_callback(
+                lambda work, request=request, executor=executor: self._done(
+                    work, request, executor
+                )
+            )
+
+    def _done(self, work: asyncio.Future, request: _Request, executor: Executor):
+        self.running -= 1
+        if work.cancelled():
+            # cancelled by `shutdown` before it started
+            error = ExecutorUnavailable("Chunking executor shut down")
+        else:
+            error = work.exception()
+            if isinstance(error, BrokenExecutor):
+                self._restart(executor, error)
+                error = ExecutorUnavailable(str(error) or "Chunking executor pool broke")
+
+        if not request.future.done():
+            if error is not None:
+                request.future.set_exception(error)
+            else:
+                self.completed += 1
+                request.future.set_result(work.result())
+        if not self._shut_down:
+            self._dispatch()
+
+    async def submit(self, fn: Callable, *args, priority: float = 0.0, deadline: float) -> Any:
+        """
+        Runs `fn(*args)` in the pool, returning its result.
+
+        Raises:
+            Overloaded: The request was rejected or shed to make room for a higher priority request.
+            DeadlineExceeded: The request wasn't done by `deadline`.
+            ExecutorUnavailable: The executor was shut down, or its pool broke while running the request.
+        """
+        if self._shut_down:
+            raise ExecutorUnavailable("Chunking executor shut down")
+        self._loop = asyncio.get_running_loop()
+        if deadline <= time.monotonic():
+            self.expired += 1
+            raise DeadlineExceeded("Deadline passed before the request was queued")
+
+        request = _Request(fn, args, priority, deadline)
+        self._admit(request)
+        self._dispatch()
+
+        try:
+            return await asyncio.wait_for(
+                request.future, timeout=deadline - time.monotonic()
+            )
+        except asyncio.TimeoutError:
+            self.expired += 1
+            raise DeadlineExceeded(
+                f"Request (priority {priority}) not done by its deadline"
+            ) from None
+
+    def shutdown(self):
+        """
+        Shuts the pool down, failing the requests still waiting. Can be called from any thread (e.g. the main thread
+        while the axon's loop runs the requests): the requests are failed on the loop they were submitted from.
+        """
+        self._shut_down = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+        loop = self._loop
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if loop is None or loop is running_loop or loop.is_closed():
+            self._fail_pending()
+        else:
+            try:
+                loop.call_soon_threadsafe(self._fail_pending)
+            except RuntimeError:
+                # the loop closed in the meantime, nothing is waiting on it anymore
+                pass
+
+        bt.logging.info(
+            f"Chunking executor shut down: {self.completed} completed, {self.shed} shed, {self.expired} expired, {self.restarts} restarts"
+        )
+
+    def _fail_pending(self):
+        # requests still waiting won't run
+        for _, _, request in self._pending:
+            if not request.future.done():
+                request.future.set_exception(
+                    ExecutorUnavailable("Chunking executor shut down")
+                )
+        self._pending = []
@@ -0,0 +1,46 @@
+from typing import Dict, NamedTuple
+
+import numpy as np
+
+
+class NeuronInfo(NamedTuple):
+    uid: int
+    stake: float
+    validator_permit: bool
+
+
+class HotkeyIndex:
+    """
+    Lookup table from hotkey to the uid, stake and validator permit of the neuron, built from a metagraph.
+
+    Rebuild it after each metagraph sync. `rebuild` swaps in a complete new table, so the axon's handlers (running on
+    another thread) never see a partially built one, nor a metagraph that is being synced in place.
+    """
+
+    def __init__(self, metagraph=None):
+        self._table: Dict[str, NeuronInfo] = {}
+        if metagraph is not None:
+            self.rebuild(metagraph)
+
+    def rebuild(self, metagraph):
+        hotkeys = list(metagraph.hotkeys)
+        stakes = np.asarray(metagraph.S, dtype=np.float64).tolist()
+        permits = np.asarray(metagraph.validator_permit, dtype=bool).tolist()
+
+        table = {}
+        # reversed so the first uid of a hotkey wins, like `hotkeys.index`
+        for uid in reversed(range(len(hotkeys))):
+            table[hotkeys[uid]] = NeuronInfo(uid, stakes[uid], permits[uid])
+        self._table = table
+
+    def get(self, hotkey: str | None) -> NeuronInfo | None:
+        """The neuron of the hotkey, or None if it isn't registered."""
+        if hotkey is None:
+            return None
+        return self._table.get(hotkey)
+
+    def __contains__(self, hotkey: str | None) -> bool:
+        return hotkey is not None and hotkey in self._table
+
+    def __len__(self) -> int:
+        return len(self._table)
@@ -70,6 +70,7 @@ async def chunk_handler(self, request: ChunkRequest) -> ChunkResponse:
         reward_options=request.reward_options,
         benchmark_id=request.benchmark_id,
         doc_name=request.doc_name,
+        profile=request.profile,
     )
 
     usable_results = [result for result in results if result is not None]
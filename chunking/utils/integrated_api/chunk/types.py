@@ -68,6 +68,10 @@ class ChunkRequest(BaseModel):
         default=None,
         description="The name of the document",
     )
+    profile: bool = Body(
+        default=False,
+        description="Whether to profile the tournament round (written to the validator's `profiles` directory)",
+    )
 
 
 class ChunkResult(BaseModel):
@@ -114,23 +114,20 @@ async def add_to_ipfs_and_pin_to_cluster(
         return None
 
 
-async def get_pinned_cids(
+async def list_recent_pins(
     cluster_api_url="http://localhost:9094",
-    ipfs_api_url="http://localhost:5001",
     delta=timedelta(minutes=20),
-    batch_size=50,
     verbose=False,
-):
+) -> List[IPFSPin]:
     """
-    Get CIDs that are pinned and have been pinned within the last delta. Order by most recent first.
+    List the pins of the IPFS Cluster pinned within the last delta, without their content. Order by most recent first.
 
     Args:
         cluster_api_url (str): URL of the IPFS Cluster API (default: http://localhost:9094)
-        ipfs_api_url (str): URL of the IPFS API (default: http://localhost:5001)
         delta (timedelta): Time delta to filter pins by (default: 20 minutes)
 
     Returns:
-        dict: A dictionary with CIDs as keys and the raw content as values
+        List[IPFSPin]: The recent pins
     """
     endpoint = f"{cluster_api_url}/pins"
 
@@ -140,50 +137,74 @@ async def get_pinned_cids(
 
     _verbose(f"Getting all CIDs from IPFS Cluster at {cluster_api_url}")
 
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(endpoint)
-            _verbose(f"Response: {response}")
-            response.raise_for_status()
+    async with httpx.AsyncClient() as client:
+        response = await client.get(endpoint)
+        _verbose(f"Response: {response}")
+        response.raise_for_status()
 
-        res_text_as_json_array = f"[{','.join(response.text.splitlines())}]"
-        pins = json.loads(res_text_as_json_array)
+    res_text_as_json_array = f"[{','.join(response.text.splitlines())}]"
+    pins = json.loads(res_text_as_json_array)
 
-        _verbose(f"{endpoint} response:\n\n{response}\n\n")
+    _verbose(f"{endpoint} response:\n\n{response}\n\n")
 
-        def parse_pin(pin):
-            try:
-                return IPFSPin(
-                    cid=pin.get("cid"),
-                    created_at=datetime.fromisoformat(pin.get("created")),
-                    status=pin.get("status"),
-                )
-            except ValidationError as e:
-                bt.logging.error(f"Error parsing pin: {e}")
-                return None
+    def parse_pin(pin):
+        try:
+            return IPFSPin(
+                cid=pin.get("cid"),
+                created_at=datetime.fromisoformat(pin.get("created")),
+                status=pin.get("status"),
+            )
+        except ValidationError as e:
+            bt.logging.error(f"Error parsing pin: {e}")
+            return None
+
+    pins = list(map(parse_pin, pins))
+    pins = list(filter(lambda x: x is not None, pins))
+
+    cur_datetime = datetime.now()
+
+    cur_datetime_utc = cur_datetime.astimezone(pytz.utc)
+
+    def prefilter_pin(pin):
+        if pin.cid is None:
+            return False
+        if pin.created_at < cur_datetime_utc - delta:
+            return False
+
+        return True
 
-        pins = list(map(parse_pin, pins))
-        pins = list(filter(lambda x: x is not None, pins))
+    # filter out pins that are not pinned and are older than delta
+    prefiltered_pins = filter(prefilter_pin, pins)
 
-        cur_datetime = datetime.now()
+    # sort by created_at descending
+    return sorted(prefiltered_pins, key=lambda x: x.created_at, reverse=True)
 
-        cur_datetime_utc = cur_datetime.astimezone(pytz.utc)
 
-        def prefilter_pin(pin):
-            if pin.cid is None:
-                return False
-            if pin.created_at < cur_datetime_utc - delta:
-                return False
+async def get_pinned_cids(
+    cluster_api_url="http://localhost:9094",
+    ipfs_api_url="http://localhost:5001",
+    delta=timedelta(minutes=20),
+    batch_size=50,
+    verbose=False,
+):
+    """
+    Get CIDs that are pinned and have been pinned within the last delta. Order by most recent first.
 
-            return True
+    Args:
+        cluster_api_url (str): URL of the IPFS Cluster API (default: http://localhost:9094)
+        ipfs_api_url (str): URL of the IPFS API (default: http://localhost:5001)
+        delta (timedelta): Time delta to filter pins by (default: 20 minutes)
+
+    Returns:
+        dict: A dictionary with CIDs as keys and the raw content as values
+    """
 
-        # filter out pins that are not pinned and are older than delta
-        prefiltered_pins = filter(prefilter_pin, pins)
+    def _verbose(msg):
+        if verbose:
+            bt.logging.debug(msg)
 
-        # sort by created_at descending
-        prefiltered_pins = sorted(
-            prefiltered_pins, key=lambda x: x.created_at, reverse=True
-        )
+    try:
+        prefiltered_pins = await list_recent_pins(cluster_api_url, delta, verbose)
 
         async def handle_pin(pin: IPFSPin):
             try:
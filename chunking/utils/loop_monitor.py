@@ -0,0 +1,181 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+import bittensor as bt
+from pydantic import BaseModel
+
+from chunking.utils.metrics import Histogram
+
+# number of innermost frames that identify a blocking call site
+STACK_DEPTH = 12
+
+
+class BlockingSite(BaseModel):
+    """
+    A call site (stack of the event loop thread) that blocked the event loop for longer than the threshold.
+    """
+
+    stack: str
+    # number of times the loop was blocked here
+    count: int = 0
+    # total / longest time in seconds the loop was blocked here
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class LoopMonitorReport(BaseModel):
+    """
+    Event loop lag statistics of a `LoopMonitor`, with the blocking call sites ranked by total blocked time.
+    """
+
+    # number of lag samples (heartbeats) and their mean/max lag in seconds
+    samples: int
+    mean_lag: float
+    max_lag: float
+    # number of times the loop was blocked for longer than the threshold
+    stalls: int
+    sites: list[BlockingSite]
+
+
+class LoopMonitor:
+    """
+    Measures how long an asyncio event loop is blocked, and where.
+
+    A heartbeat task on the loop wakes up every `interval` seconds, recording how late it woke up (the loop lag). A
+    watchdog thread checks the heartbeat: when the loop has not run it for longer than `threshold` seconds, the stack of
+    the loop's thread is captured (once per stall), and the stall's duration is attributed to that stack when the loop
+    runs again. Every `report_interval` seconds, the blocking sites are logged ranked by total blocked time.
+
+    Stacks are only captured while the loop is stalled, so the overhead is one heartbeat per `interval` and one
+    (cheap) check per `interval` in the watchdog thread.
+
+    If `lag_histogram` is given, every lag sample is also observed in it (e.g. the validator's
+    `EVENT_LOOP_LAG_SECONDS` metric).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        threshold: float = 0.1,
+        interval: float = 0.05,
+        report_interval: float = 300.0,
+        top_k: int = 5,
+        lag_histogram: Histogram | None = None,
+    ):
+        self.name = name
+        self.threshold = threshold
+        self.interval = interval
+        self.report_interval = report_interval
+        self.top_k = top_k
+        self.lag_histogram = lag_histogram
+
+        self._sites: dict[str, BlockingSite] = {}
+        self._samples = 0
+        self._total_lag = 0.0
+        self._max_lag = 0.0
+        self._stalls = 0
+
+        self._last_beat = time.perf_counter()
+        # stack captured during the current stall, if any
+        self._stall_stack: str | None = None
+        self._lock = threading.Lock()
+
+        self._loop_thread_id: int | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Starts monitoring the running event loop. Must be called from a coroutine or callback on that loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._heartbeat_task = asyncio.get_running_loop().create_task(
+            self._heartbeat()
+        )
+        self._watchdog = threading.Thread(
+            target=self._watch, name=f"{self.name}-loop-monitor", daemon=True
+        )
+        self._watchdog.start()
+        bt.logging.info(
+            f"Started {self.name} event loop monitor (threshold: {self.threshold}s)"
+        )
+
+    def stop(self):
+        self._stop.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            with self._lock:
+                lag = max(0.0, now - self._last_beat - self.interval)
+                self._samples += 1
+                self._total_lag += lag
+                self._max_lag = max(self._max_lag, lag)
+
+                if lag > self.threshold:
+                    self._stalls += 1
+                    stack = self._stall_stack or "<stack not captured>"
+                    site = self._sites.setdefault(stack, BlockingSite(stack=stack))
+                    site.count += 1
+                    site.total_seconds += lag
+                    site.max_seconds = max(site.max_seconds, lag)
+
+                self._stall_stack = None
+                self._last_beat = now
+
+            if self.lag_histogram is not None:
+                self.lag_histogram.observe(lag)
+
+    def _capture_stack(self) -> str | None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        return "".join(traceback.format_stack(frame, limit=STACK_DEPTH))
+
+    def _watch(self):
+        next_report = time.perf_counter() + self.report_interval
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            with self._lock:
+                stalled = (
+                    self._stall_stack is None
+                    and now - self._last_beat > self.interval + self.threshold
+                )
+            if stalled:
+                stack = self._capture_stack()
+                with self._lock:
+                    self._stall_stack = stack
+
+            if now >= next_report:
+                next_report = now + self.report_interval
+                self.log_report()
+
+    def report(self) -> LoopMonitorReport:
+        with self._lock:
+            sites = sorted(
+                self._sites.values(), key=lambda site: site.total_seconds, reverse=True
+            )
+            return LoopMonitorReport(
+                samples=self._samples,
+                mean_lag=self._total_lag / self._samples if self._samples else 0.0,
+                max_lag=self._max_lag,
+                stalls=self._stalls,
+                sites=[site.model_copy() for site in sites[: self.top_k]],
+            )
+
+    def log_report(self):
+        report = self.report()
+        bt.logging.info(
+            f"{self.name} event loop: {report.samples} samples, mean lag {report.mean_lag * 1000:.1f}ms, max lag {report.max_lag * 1000:.1f}ms, {report.stalls} stalls > {self.threshold}s"
+        )
+        for rank, site in enumerate(report.sites):
+            bt.logging.warning(
+                f"{self.name} event loop blocking site #{rank + 1}: {site.count} stalls, {site.total_seconds:.2f}s total, {site.max_seconds:.2f}s max\n{site.stack}"
+            )
@@ -0,0 +1,250 @@
+import math
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+# same as the Prometheus client's default buckets, extended for slow rounds and embedding calls
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+# content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{k}="{_escape_label_value(str(v))}"' for k, v in labels.items())
+        + "}"
+    )
+
+
+class Metric:
+    """
+    Base class of in-process metrics, rendered in the Prometheus text format by a `MetricsRegistry`.
+
+    Values are kept per combination of label values, passed as keyword arguments (e.g. `inc(status_code=200)`).
+    """
+
+    type_name: str
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        registry: "MetricsRegistry | None" = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...], **extra) -> dict[str, str]:
+        return {**dict(zip(self.labelnames, key)), **extra}
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """A value that only goes up (e.g. number of queries)."""
+
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        for key, value in self._values.items():
+            yield f"{self.name}_total", self._labels(key), value
+
+
+class Gauge(Metric):
+    """A value that can go up and down, either set directly or read from a function when rendered."""
+
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._functions: dict[tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float], **labels):
+        """Reads the value from `function` whenever the gauge is rendered (e.g. a queue size)."""
+        self._functions[self._key(labels)] = function
+
+    def get(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._functions:
+            return self._functions[key]()
+        return self._values.get(key, 0)
+
+    def samples(self):
+        for key in {**self._values, **self._functions}:
+            yield self.name, self._labels(key), self.get(**self._labels(key))
+
+
+class Histogram(Metric):
+    """Counts observed values (e.g. durations in seconds) in cumulative buckets, plus their count and sum."""
+
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        counts = self._counts.setdefault(key, [0] * len(self.buckets))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        self._sums[key] = self._sums.get(key, 0) + value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the time in seconds the block takes."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, **labels)
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), []))
+
+    def samples(self):
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", self._labels(
+                    key, le=_format_value(bound)
+                ), cumulative
+            yield f"{self.name}_count", self._labels(key), cumulative
+            yield f"{self.name}_sum", self._labels(key), self._sums[key]
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them for the `/metrics` endpoint."""
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+ROUNDS = Counter(
+    "chunking_rounds",
+    "Tournament rounds by result (scored or failed).",
+    ("result",),
+)
+ROUND_SECONDS = Histogram(
+    "chunking_round_seconds",
+    "Duration of whole tournament rounds, from querying the miner group until the responses are scored (including time queued between pipeline stages).",
+)
+ROUND_PHASE_SECONDS = Histogram(
+    "chunking_round_phase_seconds",
+    "Duration of the phases (query, score) of tournament rounds.",
+    ("phase",),
+)
+REWARD_STAGE_SECONDS = Histogram(
+    "chunking_reward_stage_seconds",
+    "Duration of the stages (checks, embeddings, similarity) of rewarding a single response.",
+    ("stage",),
+)
+EMBEDDING_REQUEST_SECONDS = Histogram(
+    "chunking_embedding_request_seconds",
+    "Latency of embedding API requests.",
+)
+EMBEDDING_TOKENS = Counter(
+    "chunking_embedding_tokens",
+    "Tokens sent to the embedding API.",
+)
+AXON_QUERY_SECONDS = Histogram(
+    "chunking_axon_query_seconds",
+    "Latency of miner axon queries (successful or not).",
+)
+AXON_QUERIES = Counter(
+    "chunking_axon_queries",
+    "Miner axon queries by status code.",
+    ("status_code",),
+)
+QUEUE_SIZE = Gauge(
+    "chunking_queue_size",
+    "Number of items in the validator's queues.",
+    ("queue",),
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "chunking_event_loop_lag_seconds",
+    "How late the event loop wakes up the loop monitor's heartbeat (only with --loop_monitor.enabled).",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
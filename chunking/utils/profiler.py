@@ -0,0 +1,165 @@
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import bittensor as bt
+
+PROFILE_MODES = ["cprofile", "sampling"]
+
+
+class StackSampler:
+    """
+    Samples the stack of a thread every `interval` seconds from a background thread, counting each distinct stack.
+
+    The counts are written in the collapsed-stack format (`frame;frame;frame count`, outermost frame first) used by
+    flame graph tools such as `flamegraph.pl` and speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+                )
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def write(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RoundProfiler:
+    """
+    Profiles tournament rounds: every `every_n`th round, rounds explicitly requested (e.g. a `/chunk` request with
+    `profile` set) and the next round after `request_next()` (e.g. from the task API).
+
+    Profiles are written to `output_dir`, as pstats files (`cprofile` mode, deterministic) or collapsed stacks
+    (`sampling` mode, lower overhead). Only the newest `max_files` profiles are kept.
+
+    Both modes profile the thread running the round, so concurrent tasks on the same event loop show up as well. With
+    `--neuron.pipeline`, the query and the scoring of a round are profiled to separate files.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        mode: str = "sampling",
+        every_n: int = 0,
+        max_files: int = 20,
+        sample_interval: float = 0.005,
+    ):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Invalid profile mode: {mode}, must be one of {PROFILE_MODES}")
+
+        self.output_dir = output_dir
+        self.mode = mode
+        self.every_n = every_n
+        self.max_files = max_files
+        self.sample_interval = sample_interval
+
+        self._rounds = 0
+        self._next_requested = False
+        self._active = False
+
+    def request_next(self):
+        """Profiles the next round."""
+        self._next_requested = True
+
+    def _should_profile(self, force: bool, count: bool) -> bool:
+        if count:
+            self._rounds += 1
+        if self._active:
+            # profilers can't be nested (cProfile only allows one active profiler per thread)
+            return False
+        if force or self._next_requested:
+            return True
+        return self.every_n > 0 and self._rounds % self.every_n == 0
+
+    @asynccontextmanager
+    async def profile(
+        self, name: str, force: bool = False, count: bool = True
+    ) -> AsyncIterator[str | None]:
+        """
+        Profiles the block if this round should be profiled. Yields the path the profile is written to, or None.
+
+        `count` is False for the later stages of a round that is profiled in parts (the validator pipeline), so the
+        round is only counted once towards `every_n`.
+        """
+        if not self._should_profile(force, count):
+            yield None
+            return
+
+        self._next_requested = False
+        self._active = True
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        extension = "pstats" if self.mode == "cprofile" else "collapsed"
+        path = os.path.join(
+            self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{self._rounds}-{name}.{extension}"
+        )
+
+        start_time = time.time()
+        if self.mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = StackSampler(threading.get_ident(), self.sample_interval)
+            profiler.start()
+
+        try:
+            yield path
+        finally:
+            if self.mode == "cprofile":
+                profiler.disable()
+                profiler.dump_stats(path)
+            else:
+                profiler.stop()
+                profiler.write(path)
+
+            self._active = False
+            bt.logging.info(
+                f"Profiled {name} ({time.time() - start_time:.2f}s) to {path}"
+            )
+            self._remove_old_profiles()
+
+    def profiles(self) -> list[str]:
+        """The profile files, oldest first."""
+        if not os.path.exists(self.output_dir):
+            return []
+        paths = [
+            os.path.join(self.output_dir, file) for file in os.listdir(self.output_dir)
+        ]
+        return sorted(paths, key=os.path.getmtime)
+
+    def _remove_old_profiles(self):
+        profiles = self.profiles()
+        for path in profiles[: max(0, len(profiles) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError as e:
+                bt.logging.warning(f"Failed to remove old profile {path}: {e}")
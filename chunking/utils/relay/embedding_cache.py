@@ -0,0 +1,87 @@
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    In-memory LRU cache of document embeddings, keyed by document hash and bounded to `max_bytes` of embeddings.
+
+    `get_or_make` makes the embeddings of a document at most once at a time: concurrent requests for the same document
+    (e.g. the same organic document from several validators) wait for the same call.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        # least recently used first
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached embeddings in bytes."""
+        return self._size
+
+    def get(self, key: str) -> np.ndarray | None:
+        embeddings = self._entries.get(key)
+        if embeddings is not None:
+            self._entries.move_to_end(key)
+        return embeddings
+
+    def put(self, key: str, embeddings: List[List[float]] | np.ndarray):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.nbytes > self.max_bytes:
+            return
+        if key in self._entries:
+            self._size -= self._entries.pop(key).nbytes
+        self._entries[key] = embeddings
+        self._size += embeddings.nbytes
+
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.nbytes
+
+    async def _make(
+        self, key: str, make: Callable[[], Awaitable[List[List[float]]]]
+    ) -> np.ndarray:
+        try:
+            embeddings = np.asarray(await make(), dtype=np.float32)
+            if len(embeddings) > 0:
+                self.put(key, embeddings)
+            return embeddings
+        finally:
+            del self._in_flight[key]
+
+    async def get_or_make(
+        self, key: str, make: Callable[[], Awaitable[List[List[float]]]]
+    ) -> np.ndarray:
+        """
+        The cached embeddings of `key`, or the embeddings `make()` returns, which are cached unless they are empty.
+        """
+        embeddings = self.get(key)
+        if embeddings is not None:
+            self.hits += 1
+            return embeddings
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            # a separate task, so a cancelled caller doesn't cancel it for the others waiting on it
+            task = asyncio.ensure_future(self._make(key, make))
+            task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._in_flight[key] = task
+        else:
+            self.hits += 1
+        return await asyncio.shield(task)
@@ -0,0 +1,153 @@
+from typing import Dict, List
+
+import numpy as np
+
+
+class RelayEmbeddingIndex:
+    """
+    In-memory index of the embeddings of relay pins, for fuzzy duplicate checks.
+
+    Each embedding of a pin is a row of one pre-normalized float32 matrix, with the pin's id and the embedding's
+    position in the pin. Embeddings are only compared at the same position: a query compares the i-th embedding of
+    the request to the i-th embedding of every pin (pin embeddings past the end of the request are skipped), with one
+    matrix multiply. A pin is similar if any of its positions is.
+
+    Removed rows are only marked dead, the matrix is compacted once more than half of it is dead.
+    """
+
+    def __init__(self, dim: int | None = None, capacity: int = 256):
+        self.dim = dim
+        self._capacity = capacity
+        self._matrix: np.ndarray | None = None
+        self._positions = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        # pin id of each row
+        self._ids: List[str | None] = [None] * capacity
+        self._size = 0
+        self._dead = 0
+        self._rows: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        """Number of pins in the index."""
+        return len(self._rows)
+
+    def __contains__(self, pin_id: str) -> bool:
+        return pin_id in self._rows
+
+    def _grow(self, rows: int):
+        capacity = max(self._capacity, 1)
+        while capacity < rows:
+            capacity *= 2
+        if capacity == self._capacity and self._matrix is not None:
+            return
+
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        if self._matrix is not None:
+            matrix[: self._size] = self._matrix[: self._size]
+        self._matrix = matrix
+        self._positions = np.resize(self._positions, capacity)
+        self._alive = np.concatenate(
+            [self._alive[: self._size], np.zeros(capacity - self._size, dtype=bool)]
+        )
+        self._ids.extend([None] * (capacity - len(self._ids)))
+        self._capacity = capacity
+
+    def add(self, pin_id: str, embeddings: List[List[float]] | np.ndarray):
+        """Adds (or replaces) the embeddings of a pin."""
+        if pin_id in self._rows:
+            self.remove(pin_id)
+
+        embeddings = normalize(embeddings)
+        if len(embeddings) == 0:
+            return
+        if self.dim is None:
+            self.dim = embeddings.shape[1]
+        elif embeddings.shape[1] != self.dim:
+            raise ValueError(
+                f"Embeddings of {pin_id} have dimension {embeddings.shape[1]}, expected {self.dim}"
+            )
+
+        start = self._size
+        self._grow(start + len(embeddings))
+        end = start + len(embeddings)
+        self._matrix[start:end] = embeddings
+        self._positions[start:end] = np.arange(len(embeddings))
+        self._alive[start:end] = True
+        self._ids[start:end] = [pin_id] * len(embeddings)
+        self._rows[pin_id] = list(range(start, end))
+        self._size = end
+
+    def remove(self, pin_id: str):
+        """Removes the embeddings of a pin (e.g. when it expires), if it's in the index."""
+        rows = self._rows.pop(pin_id, None)
+        if rows is None:
+            return
+        self._alive[rows] = False
+        for row in rows:
+            self._ids[row] = None
+        self._dead += len(rows)
+
+        if self._dead > self._size // 2:
+            self._compact()
+
+    def _compact(self):
+        alive = np.flatnonzero(self._alive[: self._size])
+        self._matrix[: len(alive)] = self._matrix[alive]
+        self._positions[: len(alive)] = self._positions[alive]
+        ids = [self._ids[row] for row in alive]
+        self._ids = ids + [None] * (self._capacity - len(ids))
+        self._alive[:] = False
+        self._alive[: len(alive)] = True
+        self._size = len(alive)
+        self._dead = 0
+
+        self._rows = {}
+        for row, pin_id in enumerate(ids):
+            self._rows.setdefault(pin_id, []).append(row)
+
+    def query(
+        self,
+        embeddings: List[List[float]] | np.ndarray,
+        threshold: float,
+        exclude_id: str | None = None,
+    ) -> tuple[str, float] | None:
+        """
+        Finds the pin most similar to the request above `threshold`: the cosine similarity of an embedding of the
+        request to the embedding of the pin at the same position.
+
+        Returns:
+            tuple[str, float] | None: The id of the pin and the similarity, or None if no pin is above the threshold.
+        """
+        embeddings = normalize(embeddings)
+        if len(embeddings) == 0 or self._size == 0:
+            return None
+        if embeddings.shape[1] != self.dim:
+            # embeddings of a different model can't be compared
+            return None
+
+        matrix = self._matrix[: self._size]
+        positions = self._positions[: self._size]
+        # (rows, request embeddings), then each row's similarity to the request embedding at its position
+        similarities = matrix @ embeddings.T
+        aligned = positions < len(embeddings)
+        row_similarities = np.full(self._size, -np.inf, dtype=np.float32)
+        row_similarities[aligned] = similarities[
+            np.flatnonzero(aligned), positions[aligned]
+        ]
+        row_similarities[~self._alive[: self._size]] = -np.inf
+        if exclude_id is not None:
+            row_similarities[self._rows.get(exclude_id, [])] = -np.inf
+
+        best = int(np.argmax(row_similarities))
+        if row_similarities[best] > threshold:
+            return self._ids[best], float(row_similarities[best])
+        return None
+
+
+def normalize(embeddings: List[List[float]] | np.ndarray) -> np.ndarray:
+    """The embeddings as float32 rows of unit length (zero rows stay zero)."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if embeddings.size == 0:
+        return embeddings.reshape(0, 0)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return np.divide(embeddings, norms, out=np.zeros_like(embeddings), where=norms > 0)
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+import bittensor as bt
+import numpy as np
+import pytz
+
+from chunking.utils.ipfs.ipfs import get_from_ipfs, list_recent_pins
+from chunking.utils.ipfs.types import IPFSPin
+from chunking.utils.relay.embedding_index import RelayEmbeddingIndex, normalize
+from chunking.utils.relay.types import RelayPayload
+
+
+class CachedRelayPin:
+    """A relay pin parsed once: its document hash and its embeddings."""
+
+    def __init__(self, cid: str, created_at: datetime, document_hash: str, embeddings: np.ndarray):
+        self.cid = cid
+        self.created_at = created_at
+        self.document_hash = document_hash
+        self.embeddings = embeddings
+
+
+class RelayPinCache:
+    """
+    In-memory cache of the recent relay pins of the IPFS cluster, for the miner's duplicate checks.
+
+    - `refresh` lists the cluster's pins from the last `delta`, fetches (`fetch_concurrency` at a time) and parses
+      only the pins it hasn't seen before, and expires pins older than `delta` by their `created_at`.
+    - `run` refreshes every `refresh_interval` seconds in the background, so checking a request for duplicates
+      (`find_exact_duplicate`, `find_fuzzy_duplicate`) doesn't wait on IPFS. Pins made since the last refresh are not
+      seen yet.
+    - The embeddings of the pins are kept in a `RelayEmbeddingIndex`, added and removed as pins come and go.
+    """
+
+    def __init__(
+        self,
+        delta: timedelta = timedelta(minutes=20),
+        refresh_interval: float = 10,
+        fetch_concurrency: int = 16,
+        list_pins: Callable[[timedelta], Awaitable[List[IPFSPin]]] | None = None,
+        fetch: Callable[[str], Awaitable[str]] = get_from_ipfs,
+    ):
+        self.delta = delta
+        self.refresh_interval = refresh_interval
+        self.fetch_concurrency = fetch_concurrency
+        self.list_pins = list_pins or (lambda delta: list_recent_pins(delta=delta))
+        self.fetch = fetch
+
+        self._pins: Dict[str, CachedRelayPin] = {}
+        # pins whose content couldn't be parsed, by CID, to their created_at, so they aren't fetched again
+        self._invalid: Dict[str, datetime] = {}
+        # document hash to the CIDs of the pins of that document
+        self._hashes: Dict[str, List[str]] = {}
+        self.index = RelayEmbeddingIndex()
+        self._task: asyncio.Task | None = None
+
+        self.refreshed_at: float | None = None
+        self.fetched = 0
+        self.fetch_failures = 0
+
+    def __len__(self) -> int:
+        return len(self._pins)
+
+    def __contains__(self, cid: str) -> bool:
+        return cid in self._pins
+
+    @property
+    def ready(self) -> bool:
+        """Whether the cache has been refreshed at least once."""
+        return self.refreshed_at is not None
+
+    def _parse(self, pin: IPFSPin, raw_content: str) -> CachedRelayPin:
+        payload = RelayPayload(**json.loads(raw_content))
+        return CachedRelayPin(
+            cid=pin.cid,
+            created_at=pin.created_at,
+            document_hash=payload.message.document_hash,
+            embeddings=normalize(payload.message.embeddings),
+        )
+
+    async def _fetch(self, pin: IPFSPin, semaphore: asyncio.Semaphore) -> CachedRelayPin | None:
+        async with semaphore:
+            try:
+                raw_content = await self.fetch(pin.cid)
+            except Exception as e:
+                # not marked invalid, the next refresh tries again
+                self.fetch_failures += 1
+                bt.logging.warning(f"Error getting content for relay pin {pin.cid}: {e}")
+                return None
+
+        self.fetched += 1
+        try:
+            return self._parse(pin, raw_content)
+        except Exception as e:
+            bt.logging.debug(f"Error parsing payload for {pin.cid}: {e}")
+            self._invalid[pin.cid] = pin.created_at
+            return None
+
+    def _add(self, pin: CachedRelayPin):
+        try:
+            self.index.add(pin.cid, pin.embeddings)
+        except ValueError as e:
+            bt.logging.debug(f"Error indexing payload for {pin.cid}: {e}")
+            self._invalid[pin.cid] = pin.created_at
+            return
+        self._pins[pin.cid] = pin
+        self._hashes.setdefault(pin.document_hash, []).append(pin.cid)
+
+    def _remove(self, cid: str):
+        pin = self._pins.pop(cid)
+        self.index.remove(cid)
+        cids = self._hashes[pin.document_hash]
+        cids.remove(cid)
+        if not cids:
+            del self._hashes[pin.document_hash]
+
+    async def refresh(self):
+        """Fetches new pins and expires old ones."""
+        start_time = time.time()
+        pins = await self.list_pins(self.delta)
+
+        new_pins = [
+            pin
+            for pin in pins
+            if pin.cid is not None
+            and pin.cid not in self._pins
+            and pin.cid not in self._invalid
+        ]
+        semaphore = asyncio.Semaphore(self.fetch_concurrency)
+        results = await asyncio.gather(*(self._fetch(pin, semaphore) for pin in new_pins))
+        for cached in results:
+            if cached is not None:
+                self._add(cached)
+
+        cutoff = datetime.now(pytz.utc) - self.delta
+        expired = [cid for cid, pin in self._pins.items() if pin.created_at < cutoff]
+        for cid in expired:
+            self._remove(cid)
+        self._invalid = {
+            cid: created_at for cid, created_at in self._invalid.items() if created_at >= cutoff
+        }
+
+        self.refreshed_at = time.time()
+
+        bt.logging.debug(
+            f"Refreshed relay pin cache in {time.time() - start_time:.2f} seconds: {len(new_pins)} new pins, {len(expired)} expired, {len(self._pins)} cached"
+        )
+
+    async def run(self):
+        """Refreshes the cache every `refresh_interval` seconds until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                bt.logging.error(f"Error refreshing relay pin cache: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        """Starts refreshing in the background. Must be called from a coroutine or callback on the running loop."""
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def find_exact_duplicate(
+        self, document_hash: str, exclude_cid: str | None = None
+    ) -> str | None:
+        """The CID of a cached pin of the same document (same hash), if any."""
+        for cid in self._hashes.get(document_hash, []):
+            if cid != exclude_cid:
+                return cid
+        return None
+
+    def find_fuzzy_duplicate(
+        self,
+        embeddings: List[List[float]],
+        threshold: float,
+        exclude_cid: str | None = None,
+    ) -> tuple[str, float] | None:
+        """
+        Finds a cached pin of a similar document: the cosine similarity of an embedding of the request to the
+        embedding of the pin at the same position is greater than `threshold`.
+
+        Returns:
+            tuple[str, float] | None: The CID of the pin and the similarity, or None if there is no similar pin.
+        """
+        return self.index.query(embeddings, threshold, exclude_id=exclude_cid)
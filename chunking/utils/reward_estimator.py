@@ -0,0 +1,180 @@
+import time
+from collections import OrderedDict
+from math import e
+from typing import Callable, List
+
+import numpy as np
+from nltk.tokenize import sent_tokenize
+from pydantic import BaseModel
+
+from chunking.utils.semantic_chunker import EmbeddingProvider
+from chunking.validator.reward import (
+    apply_size_and_qty_penalties,
+    calculate_embedding_reward,
+    get_qty_penalty,
+    get_similarities,
+    get_size_penalty,
+    group_segment_sentences,
+    run_checks,
+)
+
+
+class RewardEstimate(BaseModel):
+    """
+    Estimated reward of a chunking, as `reward` in `chunking/validator/reward.py` would compute it (before the time
+    penalty).
+    """
+
+    reward: float
+    embedding_reward: float = 0.0
+    size_penalty: float = 0.0
+    qty_penalty: float = 0.0
+    # why the chunking failed the validator's checks (reward 0), if it did
+    failure: str | None = None
+
+
+class RewardEstimator:
+    """
+    Scores candidate chunkings of a document locally with the validator's objective, so a miner can try several and
+    return the best.
+
+    - The checks, test segments (groups of adjacent sentences of a chunk), penalties and similarity objective are the
+      validator's own functions from `chunking/validator/reward.py`.
+    - Sentences are embedded once by the `provider` (`prepare`) and cached (LRU, `cache_size` sentences), then the
+      embedding of a test segment is the normalized sum of its sentences' embeddings, so estimating a chunking makes no
+      network calls and costs O(segments²) NumPy.
+
+    Segment embeddings approximate embedding the segment's text (what the validator does), and all segments are used
+    instead of a random sample, so estimates rank chunkings rather than predict the exact reward.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        cache_size: int = 100_000,
+        tokenize: Callable[[str], List[str]] = sent_tokenize,
+    ):
+        self.provider = provider
+        self.cache_size = cache_size
+        self.tokenize = tokenize
+        # normalized sentence embeddings, least recently used first
+        self._cache: OrderedDict[str, np.ndarray] = OrderedDict()
+
+    def _cached(self, sentence: str) -> np.ndarray:
+        embedding = self._cache[sentence]
+        self._cache.move_to_end(sentence)
+        return embedding
+
+    def prepare(self, sentences: List[str], deadline: float | None = None):
+        """
+        Embeds the sentences that aren't cached yet, in batches, before `deadline` (`time.monotonic()` based).
+
+        Raises:
+            TimeoutError: The deadline passed before all sentences were embedded.
+        """
+        missing = list(dict.fromkeys(s for s in sentences if s not in self._cache))
+        for i in range(0, len(missing), self.provider.batch_size):
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    raise TimeoutError(
+                        f"Embedded {i}/{len(missing)} sentences before the deadline"
+                    )
+            batch = missing[i : i + self.provider.batch_size]
+            embeddings = np.asarray(
+                self.provider.embed(batch, timeout=timeout), dtype=np.float64
+            )
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = np.divide(
+                embeddings, norms, out=np.zeros_like(embeddings), where=norms > 0
+            )
+            for sentence, embedding in zip(batch, embeddings):
+                self._cache[sentence] = embedding
+
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def segment_embeddings(self, chunks: List[str]) -> tuple[np.ndarray, List[int]]:
+        """The (approximate) embeddings of the chunks' test segments and the index of the chunk of each segment."""
+        chunk_sentences = [self.tokenize(chunk) for chunk in chunks]
+        self.prepare([s for sentences in chunk_sentences for s in sentences])
+
+        embeddings = []
+        source_chunks = []
+        for i, sentences in enumerate(chunk_sentences):
+            for segment in group_segment_sentences(sentences):
+                embedding = np.sum([self._cached(s) for s in segment], axis=0)
+                norm = np.linalg.norm(embedding)
+                embeddings.append(embedding / norm if norm > 0 else embedding)
+                source_chunks.append(i)
+        return np.array(embeddings), source_chunks
+
+    def estimate(
+        self,
+        document: str,
+        chunks: List[str],
+        chunk_size: int,
+        chunk_qty: int,
+        document_sentences: List[str] | None = None,
+        do_checks: bool = True,
+        do_penalties: bool = True,
+    ) -> RewardEstimate:
+        """Estimates the reward of the chunks."""
+        if not chunks:
+            return RewardEstimate(reward=0.0, failure="No chunks")
+
+        if do_checks:
+            if document_sentences is None:
+                document_sentences = self.tokenize(document)
+            failure = run_checks(document, chunks, chunk_size, document_sentences)
+            if failure is not None:
+                return RewardEstimate(reward=0.0, failure=failure)
+
+        embeddings, source_chunks = self.segment_embeddings(chunks)
+        embedding_reward = calculate_embedding_reward(
+            *get_similarities(embeddings, source_chunks)
+        )
+
+        reward = embedding_reward
+        size_penalty = 0.0
+        qty_penalty = 0.0
+        if do_penalties:
+            size_penalty = get_size_penalty(chunks, chunk_size)
+            qty_penalty = get_qty_penalty(len(chunks), chunk_qty)
+            reward = apply_size_and_qty_penalties(reward, size_penalty, qty_penalty)
+
+        return RewardEstimate(
+            reward=e**reward,
+            embedding_reward=embedding_reward,
+            size_penalty=size_penalty,
+            qty_penalty=qty_penalty,
+        )
+
+    def choose(
+        self,
+        document: str,
+        candidates: List[List[str]],
+        chunk_size: int,
+        chunk_qty: int,
+        deadline: float | None = None,
+    ) -> tuple[int, List[RewardEstimate]]:
+        """
+        Estimates the candidate chunkings in order until `deadline` (`time.monotonic()` based), returning the index of
+        the best one and the estimates made. The first candidate is always estimated.
+        """
+        document_sentences = self.tokenize(document)
+        self.prepare(document_sentences, deadline)
+
+        estimates = []
+        for candidate in candidates:
+            if estimates and deadline is not None and time.monotonic() >= deadline:
+                break
+            estimates.append(
+                self.estimate(
+                    document, candidate, chunk_size, chunk_qty, document_sentences
+                )
+            )
+
+        best = max(range(len(estimates)), key=lambda i: estimates[i].reward)
+        return best, estimates
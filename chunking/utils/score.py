@@ -1,3 +1,4 @@
+import logging
 from math import floor
 import numpy as np
 import bittensor as bt
@@ -78,6 +79,11 @@ def get_new_scores(
     # for use later by tieing mechanism
     rank_value_to_count = get_rank_value_to_count(rank_values)
 
+    bt.logging.debug(f"group alpha: {group_alpha}")
+
+    # building the per-uid debug messages dominates the cost of this function, skip it unless it will be logged
+    debug = bt.logging.get_level() <= logging.DEBUG
+
     for rank_value, uid in zip(rank_values, uids):
         # unranked
         if np.isinf(rank_value):
@@ -85,8 +91,6 @@ def get_new_scores(
 
         did_win = rank_value == group_best_possible_rank_value
 
-        bt.logging.debug(f"group alpha: {group_alpha}")
-
         alpha = group_alpha
 
         # adjust alpha if miner lost (did not get first place within group)
@@ -94,18 +98,17 @@ def get_new_scores(
             alpha = alpha * (
                 2 if miner_group_index == 0 else (1 + 0.25**miner_group_index)
             )
-        bt.logging.debug(f"loss alpha: {alpha}")
+        loss_alpha = alpha
 
         # adjust alpha based on how many other uids got the same score as this uid
         # if more people tie, affects score less
         alpha = alpha / min(MAX_TIE_DIVISION, max(rank_value_to_count[rank_value], 1))
 
-        bt.logging.debug(f"tie alpha: {alpha}")
-
-        bt.logging.debug(
-            f"uid: {uid}, cur score: {scores_copy[uid]}, rank value: {rank_value} group best possible rank value: {group_best_possible_rank_value}. did win: {did_win}"
-        )
-        score_str = f"score: {scores_copy[uid]} -> "
+        if debug:
+            score_str = (
+                f"uid: {uid}, rank value: {rank_value} group best possible rank value: {group_best_possible_rank_value}. "
+                f"did win: {did_win}, loss alpha: {loss_alpha}, tie alpha: {alpha}, score: {scores_copy[uid]} -> "
+            )
 
         if did_win and scores_copy[uid] < rank_value:
             # miner should not be penalized (score increases) if:
@@ -113,8 +116,8 @@ def get_new_scores(
             # 2. the miner's score is already lower than the group's best possible rank value
             #
             # this is possible if the miner is in 2 groups (all miners except the first place miner)
-            score_str += f"{scores_copy[uid]} (no change)"
-            bt.logging.debug(score_str)
+            if debug:
+                bt.logging.debug(f"{score_str}{scores_copy[uid]} (no change)")
             continue
 
         # initialize score if it is np.inf
@@ -127,7 +130,7 @@ def get_new_scores(
         else:
             scores_copy[uid] = alpha * rank_value + (1 - alpha) * scores_copy[uid]
 
-        score_str += f"{scores_copy[uid]}"
-        bt.logging.debug(score_str)
+        if debug:
+            bt.logging.debug(f"{score_str}{scores_copy[uid]}")
 
     return scores_copy
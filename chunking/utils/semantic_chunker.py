@@ -0,0 +1,224 @@
+import re
+import time
+import zlib
+from typing import List
+
+import bittensor as bt
+import numpy as np
+from nltk.tokenize import sent_tokenize
+from openai import OpenAI
+
+from chunking.utils.chunks import iter_chunks
+
+EMBEDDING_PROVIDERS = ["openai", "local"]
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class EmbeddingProvider:
+    """
+    Embeds batches of texts for the semantic chunker. Synchronous, as chunking runs in the miner's chunking executor.
+    """
+
+    # max number of texts per `embed` call
+    batch_size: int = 256
+
+    def embed(self, texts: List[str], timeout: float | None = None) -> np.ndarray:
+        """Returns one embedding (row) per text."""
+        raise NotImplementedError
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Embeds texts with the OpenAI embeddings API (the model the validator scores chunks with by default)."""
+
+    def __init__(
+        self,
+        model: str = "text-embedding-ada-002",
+        batch_size: int = 256,
+        client: OpenAI | None = None,
+    ):
+        self.model = model
+        self.batch_size = batch_size
+        self._client = client
+
+    def embed(self, texts: List[str], timeout: float | None = None) -> np.ndarray:
+        if self._client is None:
+            self._client = OpenAI()
+        response = self._client.embeddings.create(
+            model=self.model, input=texts, timeout=timeout
+        )
+        return np.array([data.embedding for data in response.data], dtype=np.float32)
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Embeds texts offline as feature hashed bags of words (`dim` buckets, signed). Only captures shared vocabulary, but
+    needs no network, model or API key.
+    """
+
+    def __init__(self, dim: int = 1024, batch_size: int = 4096):
+        self.dim = dim
+        self.batch_size = batch_size
+
+    def embed(self, texts: List[str], timeout: float | None = None) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in WORD_PATTERN.findall(text.lower()):
+                # crc32 instead of hash(), which is randomized per process
+                h = zlib.crc32(word.encode())
+                embeddings[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return embeddings
+
+
+def window_similarities(embeddings: np.ndarray, window: int) -> np.ndarray:
+    """
+    Cosine similarities at the n - 1 boundaries between n sentences: boundary i (before sentence i + 1) compares the
+    summed embeddings of the `window` sentences before it to those of the `window` sentences after it.
+    """
+    n = len(embeddings)
+    cumsum = np.concatenate(
+        [np.zeros((1, embeddings.shape[1]), dtype=np.float64), np.cumsum(embeddings, axis=0)]
+    )
+    boundaries = np.arange(1, n)
+    before = cumsum[boundaries] - cumsum[np.maximum(boundaries - window, 0)]
+    after = cumsum[np.minimum(boundaries + window, n)] - cumsum[boundaries]
+
+    norms = np.linalg.norm(before, axis=1) * np.linalg.norm(after, axis=1)
+    dots = np.einsum("ij,ij->i", before, after)
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+
+def optimal_splits(
+    lengths: np.ndarray, split_costs: np.ndarray, chunk_size: int, penalty: float = 0.0
+) -> List[int]:
+    """
+    Finds the split points (sentence indices chunks start at, excluding 0) minimizing the total cost of the splits,
+    where each chunk (its sentences joined by spaces) is at most `chunk_size` characters, unless it is a single
+    longer sentence.
+
+    Splitting at boundary i (before sentence i + 1) costs `split_costs[i] + penalty`.
+
+    Dynamic program over chunk end positions, in O(n * sentences per chunk).
+    """
+    n = len(lengths)
+    # total length of sentences [0, i)
+    prefix = np.concatenate([[0], np.cumsum(lengths)])
+    best = np.full(n + 1, np.inf)
+    best[0] = 0.0
+    previous = np.zeros(n + 1, dtype=np.int64)
+    # cost of the best split ending at i plus the cost of starting a chunk at i
+    start_cost = np.full(n + 1, np.inf)
+    start_cost[0] = 0.0
+
+    first = 0
+    for end in range(1, n + 1):
+        # the chunk [start, end) is joined with end - start - 1 spaces
+        while first < end - 1 and prefix[end] - prefix[first] + (end - first - 1) > chunk_size:
+            first += 1
+        start = first + int(np.argmin(start_cost[first:end]))
+        best[end] = start_cost[start]
+        previous[end] = start
+        if end < n:
+            start_cost[end] = best[end] + split_costs[end - 1] + penalty
+
+    splits = []
+    end = n
+    while end > 0:
+        end = int(previous[end])
+        if end > 0:
+            splits.append(end)
+    return splits[::-1]
+
+
+class SemanticChunker:
+    """
+    Chunks documents at the points where the topic changes most, within the chunk size and quantity limits.
+
+    - Sentences are embedded in batches by the `provider`.
+    - Each boundary between sentences is scored by the similarity of the `window` sentences on both sides
+      (`window_similarities`).
+    - `optimal_splits` picks the boundaries: splitting costs the boundary's similarity minus the `split_percentile`th
+      percentile of all similarities, so the chunker splits where it has to (chunk size) at the least similar
+      boundaries, and also splits at the most dissimilar boundaries. If that makes more than `max_num_chunks` chunks,
+      each split is penalized more until it doesn't.
+    - If the embeddings can't be made before the deadline (or fail), or no split satisfies the limits, the document is
+      chunked greedily (`iter_chunks`) instead.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        window: int = 3,
+        split_percentile: float = 10,
+        max_penalty_rounds: int = 12,
+    ):
+        self.provider = provider
+        self.window = window
+        self.split_percentile = split_percentile
+        self.max_penalty_rounds = max_penalty_rounds
+
+    def _embed(self, sentences: List[str], deadline: float | None) -> np.ndarray:
+        batches = []
+        for i in range(0, len(sentences), self.provider.batch_size):
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    raise TimeoutError(
+                        f"Embedded {i}/{len(sentences)} sentences before the deadline"
+                    )
+            batches.append(
+                self.provider.embed(
+                    sentences[i : i + self.provider.batch_size], timeout=timeout
+                )
+            )
+        return np.concatenate(batches)
+
+    def split(
+        self, sentences: List[str], embeddings: np.ndarray, chunk_size: int, max_num_chunks: int
+    ) -> List[int] | None:
+        """The split points for the sentences, or None if the chunks can't be within `max_num_chunks`."""
+        similarities = window_similarities(embeddings, self.window)
+        split_costs = similarities - np.percentile(similarities, self.split_percentile)
+        lengths = np.array([len(sentence) for sentence in sentences])
+
+        # the penalty only matters relative to the spread of the costs
+        penalty = 0.0
+        step = max(float(np.ptp(split_costs)), 1e-6)
+        for _ in range(self.max_penalty_rounds):
+            splits = optimal_splits(lengths, split_costs, chunk_size, penalty)
+            if len(splits) + 1 <= max_num_chunks:
+                return splits
+            penalty = step if penalty == 0 else penalty * 2
+        return None
+
+    def chunk(
+        self,
+        document: str,
+        chunk_size: int,
+        max_num_chunks: int,
+        deadline: float | None = None,
+    ) -> List[str]:
+        """
+        Chunks the document, falling back to greedy chunking if it can't be done semantically by `deadline`
+        (`time.monotonic()` based).
+        """
+        sentences = sent_tokenize(document)
+        if len(sentences) <= 1:
+            return list(iter_chunks(sentences, chunk_size))
+
+        try:
+            embeddings = self._embed(sentences, deadline)
+            splits = self.split(sentences, embeddings, chunk_size, max_num_chunks)
+        except Exception as e:
+            bt.logging.warning(f"Semantic chunking failed, chunking greedily: {e}")
+            return list(iter_chunks(sentences, chunk_size))
+
+        if splits is None:
+            bt.logging.warning(
+                f"No semantic split within {max_num_chunks} chunks, chunking greedily"
+            )
+            return list(iter_chunks(sentences, chunk_size))
+
+        bounds = [0, *splits, len(sentences)]
+        return [" ".join(sentences[start:end]) for start, end in zip(bounds, bounds[1:])]
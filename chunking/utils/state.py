@@ -0,0 +1,55 @@
+import os
+from typing import BinaryIO, Callable
+
+import numpy as np
+
+
+def atomic_write(path: str, write_fn: Callable[[BinaryIO], None]):
+    """
+    Writes a file atomically by writing to a temporary file in the same directory and renaming it over `path`.
+
+    A crash mid-write leaves the previous file intact instead of a truncated one.
+
+    Args:
+        path (str): The final path of the file.
+        write_fn (Callable[[BinaryIO], None]): Function that writes the contents to the given (binary) file object.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write_fn(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def save_tournament_state(
+    path: str,
+    step: int,
+    scores: np.ndarray,
+    rankings: np.ndarray,
+    hotkeys: list[str],
+    telemetry: dict[str, np.ndarray] | None = None,
+):
+    """
+    Atomically saves the tournament state (everything except the article catalog) to an `.npz` file.
+
+    Args:
+        path (str): The path to save the state to.
+        step (int): The current step of the validator.
+        scores (np.ndarray): The scores (moving average rank) of each miner.
+        rankings (np.ndarray): The global rankings of the miners.
+        hotkeys (list[str]): The hotkeys of the miners.
+        telemetry (dict[str, np.ndarray] | None): The arrays of the miner telemetry, saved prefixed with `telemetry_`.
+    """
+    telemetry_arrays = {f"telemetry_{k}": v for k, v in (telemetry or {}).items()}
+    atomic_write(
+        path,
+        lambda f: np.savez(
+            f,
+            step=step,
+            scores=scores,
+            rankings=rankings,
+            hotkeys=hotkeys,
+            **telemetry_arrays,
+        ),
+    )
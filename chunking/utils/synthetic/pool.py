@@ -0,0 +1,177 @@
+import asyncio
+import gzip
+import json
+import os
+import time
+import uuid
+
+import bittensor as bt
+from pydantic import BaseModel
+
+from chunking.utils.state import atomic_write
+
+# bump when the on-disk layout of the document pool changes
+POOL_FORMAT_VERSION = 1
+
+
+class PooledDocument(BaseModel):
+    """
+    Index entry of a synthetic document stored in a `SyntheticDocumentPool`.
+    """
+
+    id: str
+    pageid: int
+    # size of the compressed document file in bytes
+    size: int
+    created_at: float
+    # number of times the document was handed out
+    uses: int = 0
+
+
+class SyntheticDocumentPool:
+    """
+    A pool of generated synthetic documents persisted on disk, so documents survive validator restarts.
+
+    Each document is stored as a gzip file, and a small JSON index (written atomically) tracks the documents' page ids,
+    sizes and how often they were used.
+
+    - `put` blocks while `max_fresh` documents are waiting to be used (like a bounded queue).
+    - `get` hands out unused documents oldest first. Each document can be handed out up to `max_uses` times: when no
+      unused document is left, the least used document is reused instead of waiting for a new one.
+    - Documents are deleted when they reach `max_uses`, and the oldest documents are evicted when the pool exceeds
+      `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        dir_path: str,
+        max_fresh: int = 10,
+        max_uses: int = 1,
+        max_bytes: int = 200 * 1024 * 1024,
+    ):
+        self.dir_path = dir_path
+        self.max_fresh = max_fresh
+        self.max_uses = max(1, max_uses)
+        self.max_bytes = max_bytes
+
+        os.makedirs(dir_path, exist_ok=True)
+        self._index_path = os.path.join(dir_path, f"index.v{POOL_FORMAT_VERSION}.json")
+        self._documents: dict[str, PooledDocument] = self._load_index()
+        self._changed = asyncio.Condition()
+
+    def _document_path(self, document_id: str) -> str:
+        return os.path.join(self.dir_path, f"{document_id}.txt.gz")
+
+    def _load_index(self) -> dict[str, PooledDocument]:
+        documents: dict[str, PooledDocument] = {}
+        if os.path.exists(self._index_path):
+            try:
+                with open(self._index_path) as f:
+                    for entry in json.load(f):
+                        document = PooledDocument(**entry)
+                        if os.path.exists(self._document_path(document.id)):
+                            documents[document.id] = document
+            except Exception as e:
+                bt.logging.error(f"Failed to load synthetic document pool index: {e}")
+
+        # remove files of documents that are not in the index (e.g. written right before a crash)
+        for file in os.listdir(self.dir_path):
+            if file.endswith(".txt.gz") and file[: -len(".txt.gz")] not in documents:
+                os.remove(os.path.join(self.dir_path, file))
+
+        if documents:
+            bt.logging.info(
+                f"Loaded {len(documents)} synthetic documents from {self.dir_path}"
+            )
+        return documents
+
+    def _save_index(self):
+        entries = [document.model_dump() for document in self._documents.values()]
+        atomic_write(self._index_path, lambda f: f.write(json.dumps(entries).encode()))
+
+    def _remove(self, document_id: str):
+        self._documents.pop(document_id)
+        try:
+            os.remove(self._document_path(document_id))
+        except OSError as e:
+            bt.logging.warning(f"Failed to remove pooled document {document_id}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    @property
+    def num_fresh(self) -> int:
+        """Number of documents that were not handed out yet."""
+        return sum(1 for document in self._documents.values() if document.uses == 0)
+
+    @property
+    def size(self) -> int:
+        """Total size of the compressed documents in bytes."""
+        return sum(document.size for document in self._documents.values())
+
+    def _write(self, document_id: str, text: str) -> int:
+        data = gzip.compress(text.encode("utf-8"), compresslevel=6)
+        atomic_write(self._document_path(document_id), lambda f: f.write(data))
+        return len(data)
+
+    def _read(self, document_id: str) -> str:
+        with open(self._document_path(document_id), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def _evict(self):
+        # oldest first, documents are inserted in creation order
+        while self.size > self.max_bytes and len(self._documents) > 1:
+            document_id = next(iter(self._documents))
+            bt.logging.debug(f"Evicting pooled document {document_id}, pool too large")
+            self._remove(document_id)
+
+    async def put(self, text: str, pageid: int):
+        """Adds a document to the pool, waiting while `max_fresh` documents are waiting to be used."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.num_fresh < self.max_fresh)
+
+        document_id = uuid.uuid4().hex
+        size = await asyncio.to_thread(self._write, document_id, text)
+
+        async with self._changed:
+            self._documents[document_id] = PooledDocument(
+                id=document_id, pageid=pageid, size=size, created_at=time.time()
+            )
+            self._evict()
+            await asyncio.to_thread(self._save_index)
+            self._changed.notify_all()
+
+    def _next(self) -> PooledDocument | None:
+        fresh = [document for document in self._documents.values() if document.uses == 0]
+        if fresh:
+            return fresh[0]
+        if not self._documents:
+            return None
+        return min(self._documents.values(), key=lambda document: document.uses)
+
+    async def get(self) -> tuple[str, int]:
+        """
+        Gets a document (and its page id) from the pool, waiting until there is one.
+
+        Returns:
+            tuple[str, int]: The document and its page id (-1 for LLM generated documents).
+        """
+        async with self._changed:
+            while True:
+                await self._changed.wait_for(lambda: len(self._documents) > 0)
+
+                document = self._next()
+                try:
+                    text = await asyncio.to_thread(self._read, document.id)
+                    break
+                except Exception as e:
+                    bt.logging.error(f"Failed to read pooled document {document.id}: {e}")
+                    self._remove(document.id)
+
+            document.uses += 1
+            if document.uses >= self.max_uses:
+                self._remove(document.id)
+            await asyncio.to_thread(self._save_index)
+            self._changed.notify_all()
+
+        return text, document.pageid
@@ -0,0 +1,416 @@
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from contextlib import aclosing
+from typing import Awaitable, Callable, List
+
+import bittensor as bt
+import numpy as np
+from openai import AsyncOpenAI
+from pydantic import BaseModel, Field
+
+from chunking.utils.state import atomic_write
+from chunking.utils.synthetic.synthetic import (
+    GEN_MODEL,
+    gen_types,
+    get_continuation_gen_messages,
+    get_initial_gen_messages,
+    get_source_articles,
+    probabilities_gen_types,
+    sample_source_pages,
+    stream_completion,
+    truncate_to_sentence,
+)
+from chunking.utils.synthetic.types import SyntheticGenType
+
+# bump when the layout of generation checkpoints changes
+CHECKPOINT_FORMAT_VERSION = 1
+# rough number of tokens a section completion uses, reserved from the token budget until the actual usage is known
+EXPECTED_OUTPUT_TOKENS = 2000
+# prompt tokens are estimated from their length (corrected by the reported usage), tokenizing them would block the loop
+CHARS_PER_TOKEN = 4
+# time (seconds) to wait before trying to start new jobs again after creating one failed
+NEW_JOB_RETRY_SECONDS = 5
+
+
+class TokenBucket:
+    """
+    A token bucket refilled at `rate_per_minute`, holding at most one minute's worth of tokens. A rate of 0 means
+    unlimited.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = rate_per_minute
+        self._tokens = rate_per_minute
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._updated_at) * self.rate_per_minute / 60,
+        )
+        self._updated_at = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are)."""
+        if self.rate_per_minute <= 0:
+            return 0.0
+        self._refill()
+        # requests larger than the bucket only wait for a full bucket
+        missing = min(amount, self.capacity) - self._tokens
+        return max(0.0, missing * 60 / self.rate_per_minute)
+
+    def take(self, amount: float):
+        """Takes `amount` tokens, the bucket can go negative (e.g. when correcting an estimate)."""
+        if self.rate_per_minute <= 0:
+            return
+        self._refill()
+        self._tokens -= amount
+
+
+class RateLimiter:
+    """
+    Shares a request-per-minute and a token-per-minute budget between concurrent LLM requests, granted in FIFO order.
+
+    The tokens of a request are estimated up front, and `settle` corrects the budget with the actual usage.
+    """
+
+    def __init__(self, rpm: float = 0, tpm: float = 0):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int):
+        async with self._lock:
+            while True:
+                delay = max(self.requests.delay(1), self.tokens.delay(tokens))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        self.tokens.take(actual_tokens - estimated_tokens)
+
+
+class GenerationJob(BaseModel):
+    """
+    A synthetic document being generated section by section, checkpointed after each section.
+    """
+
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    gen_type: SyntheticGenType
+    temperature: float = 0.7
+    pageids: List[int]
+    # number of sections (first section + continuations) the document has when done
+    num_sections: int
+    created_at: float = Field(default_factory=time.time)
+    article_names: List[str] = []
+    sections: List[str] = []
+    # consecutive failed (or timed out) attempts at the next section
+    failures: int = 0
+    # set when the document is handed off before all its sections are generated
+    handed_off: bool = False
+    # set when the document is being emitted
+    finished: bool = False
+    # only needed for the first section, fetched again when resuming a checkpoint without sections
+    source_articles: List[str] = Field(default=[], exclude=True)
+
+    @property
+    def done(self) -> bool:
+        return self.finished or self.handed_off or len(self.sections) >= self.num_sections
+
+    @property
+    def document(self) -> str:
+        return " ".join(self.sections)
+
+
+def new_generation_job(validator, k=3, loop_range=range(3, 7)) -> GenerationJob:
+    """
+    Create a generation job for a synthetic document, sampled like `generate_document` does for LLM documents.
+    """
+    return GenerationJob(
+        gen_type=str(np.random.choice(gen_types, p=probabilities_gen_types)),
+        pageids=sample_source_pages(validator, k),
+        num_sections=1 + random.choice(list(loop_range)),
+    )
+
+
+class GenerationScheduler:
+    """
+    Generates many synthetic documents at once, interleaving their sections.
+
+    Up to `max_active` documents are in progress. `concurrency` workers take the next section of the document that
+    waited the longest, so sections of different documents run in between each other, each LLM request waiting for the
+    shared `rpm`/`tpm` budget. Documents are handed to `on_document` as soon as they are complete.
+
+    Each document is checkpointed to `checkpoint_dir` after every section and resumed from there after a restart.
+    A section whose completion fails or takes longer than `step_timeout` (not counting the wait for the rate budget)
+    is retried, and a document whose next section fails `max_step_failures` times in a row is emitted with the
+    sections generated so far. Any other failed step (e.g. `on_document` or a checkpoint write failing) is retried
+    as well, and the document is dropped after `max_step_failures` failures, so one document can't stop the workers.
+
+    With `stream`, completions are streamed, and `handoff` (called with the length of the document generated so far)
+    can end a document early, e.g. when rounds are waiting for documents: the document is emitted up to its last
+    complete sentence instead of waiting for the remaining sections.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        checkpoint_dir: str,
+        new_job: Callable[[], GenerationJob],
+        on_document: Callable[[str, int], Awaitable[None]],
+        get_sources: Callable[[List[int]], Awaitable[tuple[List[str], List[str]]]] = get_source_articles,
+        rpm: float = 0,
+        tpm: float = 0,
+        concurrency: int = 6,
+        max_active: int = 12,
+        step_timeout: float = 60,
+        max_step_failures: int = 3,
+        stream: bool = False,
+        handoff: Callable[[int], bool] | None = None,
+    ):
+        self.client = client
+        self.checkpoint_dir = checkpoint_dir
+        self.new_job = new_job
+        self.on_document = on_document
+        self.get_sources = get_sources
+        self.limiter = RateLimiter(rpm, tpm)
+        self.concurrency = concurrency
+        self.max_active = max_active
+        self.step_timeout = step_timeout
+        self.max_step_failures = max_step_failures
+        self.stream = stream
+        self.handoff = handoff
+
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        # jobs waiting for their next section, longest waiting first
+        self._ready: asyncio.Queue[GenerationJob] = asyncio.Queue()
+        self.active = 0
+
+        self.sections_generated = 0
+        self.tokens_used = 0
+        self.documents_completed = 0
+        self.documents_partial = 0
+        self.documents_handed_off = 0
+
+    def _checkpoint_path(self, job: GenerationJob) -> str:
+        return os.path.join(
+            self.checkpoint_dir, f"{job.id}.v{CHECKPOINT_FORMAT_VERSION}.json"
+        )
+
+    def _save_checkpoint(self, job: GenerationJob):
+        data = job.model_dump_json().encode()
+        atomic_write(self._checkpoint_path(job), lambda f: f.write(data))
+
+    def _remove_checkpoint(self, job: GenerationJob):
+        try:
+            os.remove(self._checkpoint_path(job))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            bt.logging.warning(f"Failed to remove generation checkpoint of {job.id}: {e}")
+
+    def load_checkpoints(self) -> List[GenerationJob]:
+        """Loads the jobs of documents that were in progress, oldest first."""
+        jobs = []
+        suffix = f".v{CHECKPOINT_FORMAT_VERSION}.json"
+        for file in os.listdir(self.checkpoint_dir):
+            if not file.endswith(suffix):
+                continue
+            path = os.path.join(self.checkpoint_dir, file)
+            try:
+                with open(path) as f:
+                    jobs.append(GenerationJob(**json.load(f)))
+            except Exception as e:
+                bt.logging.error(f"Failed to load generation checkpoint {path}: {e}")
+                os.remove(path)
+        return sorted(jobs, key=lambda job: job.created_at)
+
+    def _add(self, job: GenerationJob):
+        self.active += 1
+        self._ready.put_nowait(job)
+
+    def _fill(self):
+        while self.active < self.max_active:
+            try:
+                job = self.new_job()
+            except Exception as e:
+                bt.logging.error(
+                    f"Failed to create a generation job, retrying in {NEW_JOB_RETRY_SECONDS} seconds: {e!r}"
+                )
+                asyncio.get_running_loop().call_later(NEW_JOB_RETRY_SECONDS, self._fill)
+                return
+            self._add(job)
+
+    def _retire(self, job: GenerationJob):
+        self._remove_checkpoint(job)
+        self.active -= 1
+        self._fill()
+
+    async def _stream_section(
+        self, job: GenerationJob, messages: List[dict]
+    ) -> tuple[str, int | None]:
+        # length of the document before this section, including the separating space
+        length = len(job.document) + 1 if job.sections else 0
+        section = ""
+        total_tokens = None
+        async with aclosing(
+            stream_completion(self.client, messages, job.temperature)
+        ) as completion:
+            async for text, tokens in completion:
+                section += text
+                if tokens is not None:
+                    total_tokens = tokens
+                if (
+                    text
+                    and self.handoff is not None
+                    and self.handoff(length + len(section))
+                ):
+                    job.handed_off = True
+                    return truncate_to_sentence(" ".join(section.split())), None
+
+        return " ".join(section.split()), total_tokens
+
+    async def _complete(
+        self, job: GenerationJob, messages: List[dict]
+    ) -> tuple[str, int | None]:
+        if self.stream:
+            return await self._stream_section(job, messages)
+
+        response = await self.client.chat.completions.create(
+            model=GEN_MODEL, temperature=job.temperature, messages=messages
+        )
+        section = " ".join(response.choices[0].message.content.split())
+        return section, response.usage.total_tokens if response.usage else None
+
+    async def _generate_section(self, job: GenerationJob) -> str:
+        if not job.sections:
+            if not job.source_articles:
+                job.source_articles, job.article_names = await self.get_sources(
+                    job.pageids
+                )
+            messages = get_initial_gen_messages(job.gen_type, job.source_articles)
+        else:
+            messages = get_continuation_gen_messages(
+                job.gen_type, job.article_names, job.sections[-1]
+            )
+
+        estimated_tokens = (
+            sum(len(message["content"]) for message in messages) // CHARS_PER_TOKEN
+            + EXPECTED_OUTPUT_TOKENS
+        )
+        # waiting for the budget doesn't count towards `step_timeout`, only the completion does
+        await self.limiter.acquire(estimated_tokens)
+        section, total_tokens = await asyncio.wait_for(
+            self._complete(job, messages), timeout=self.step_timeout
+        )
+
+        # the usage of a completion that was stopped early isn't reported, the estimate stands
+        if total_tokens is not None:
+            self.limiter.settle(estimated_tokens, total_tokens)
+            self.tokens_used += total_tokens
+        return section
+
+    async def _finish(self, job: GenerationJob):
+        if job.sections:
+            # checkpointed as finished until `on_document` took it (which waits while the pool is full), so a restart
+            # emits the document instead of losing it
+            if not job.finished:
+                job.finished = True
+                # from here on failures count failed attempts at emitting the document
+                job.failures = 0
+            await asyncio.to_thread(self._save_checkpoint, job)
+            await self.on_document(job.document, -1)
+
+            if job.handed_off:
+                self.documents_handed_off += 1
+            elif len(job.sections) >= job.num_sections:
+                self.documents_completed += 1
+            else:
+                self.documents_partial += 1
+                bt.logging.warning(
+                    f"Emitting partial document {job.id} with {len(job.sections)}/{job.num_sections} sections"
+                )
+            bt.logging.info(
+                f"Generated document {job.id} with {len(job.sections)} sections in {time.time() - job.created_at:.1f} seconds, {len(job.document)} characters"
+            )
+        else:
+            bt.logging.warning(
+                f"Dropping generation job {job.id}, no section could be generated"
+            )
+
+        self._retire(job)
+
+    async def _step(self, job: GenerationJob):
+        if job.finished:
+            # resumed from a checkpoint of a document that wasn't emitted yet
+            await self._finish(job)
+            return
+
+        try:
+            section = await self._generate_section(job)
+        except Exception as e:
+            job.failures += 1
+            bt.logging.error(
+                f"Failed to generate section {len(job.sections) + 1} of document {job.id} ({job.failures}/{self.max_step_failures}): {e!r}"
+            )
+            if job.failures >= self.max_step_failures:
+                await self._finish(job)
+            else:
+                self._ready.put_nowait(job)
+            return
+
+        job.sections.append(section)
+        job.failures = 0
+        self.sections_generated += 1
+        if not job.done and self.handoff is not None and self.handoff(len(job.document)):
+            job.handed_off = True
+        bt.logging.debug(
+            f"Generated section {len(job.sections)}/{job.num_sections} of document {job.id}, {len(section)} characters"
+        )
+
+        if job.done:
+            await self._finish(job)
+        else:
+            await asyncio.to_thread(self._save_checkpoint, job)
+            self._ready.put_nowait(job)
+
+    async def _worker(self):
+        while True:
+            job = await self._ready.get()
+            try:
+                await self._step(job)
+            except Exception as e:
+                job.failures += 1
+                if job.failures >= self.max_step_failures:
+                    bt.logging.error(
+                        f"Dropping generation job {job.id} after {job.failures} failed steps: {e!r}"
+                    )
+                    self._retire(job)
+                else:
+                    bt.logging.error(
+                        f"Failed step of generation job {job.id} ({job.failures}/{self.max_step_failures}), retrying: {e!r}"
+                    )
+                    self._ready.put_nowait(job)
+
+    async def run(self):
+        """Generates documents until cancelled."""
+        checkpoints = self.load_checkpoints()
+        if checkpoints:
+            bt.logging.info(f"Resuming {len(checkpoints)} checkpointed documents")
+        for job in checkpoints:
+            self._add(job)
+        self._fill()
+
+        bt.logging.info(
+            f"Starting generation scheduler with {self.concurrency} workers, {self.max_active} active documents"
+        )
+        await asyncio.gather(*(self._worker() for _ in range(self.concurrency)))
@@ -3,27 +3,36 @@ import aiohttp
 import asyncio
 import numpy as np
 from openai import AsyncOpenAI
-from typing import Tuple, List, Literal
+from typing import AsyncIterator, Callable, Tuple, List, Literal
 import random
 import time
+from contextlib import aclosing
 from chunking.protocol import chunkSynapse
+from chunking.utils.articles import sample_articles
 from chunking.utils.chunks import calculate_chunk_qty
 from chunking.utils.synthetic.types import SyntheticGenType
+from chunking.utils.synthetic.wiki_cache import WikiPageCache
 from chunking.utils.tokens import num_tokens_from_string
 
 # SYSTEM_PROMPT = "You are a writer tasked with writing an article that combines multiple topics. You are known for your long-winded tangents and detailed exploration of all topics covered in your articles."
 
 
-async def get_wiki_content_for_page(pageid: int) -> Tuple[str, str]:
+async def get_wiki_content_for_page(
+    pageid: int, cache: WikiPageCache | None = None
+) -> Tuple[str, str]:
     """
     Get the content for a Wikipedia page by the page ID asynchronously.
 
     Args:
         pageid (int): The ID of the Wikipedia page to get the content for.
+        cache (WikiPageCache | None): The page cache to get the content from (and store it in), if any.
 
     Returns:
         Tuple[str, str]: The content and title of the Wikipedia page.
     """
+    if cache is not None:
+        return await cache.get(pageid)
+
     async with aiohttp.ClientSession() as session:
         async with session.get(
             "https://en.wikipedia.org/w/api.php",
@@ -47,64 +56,42 @@ NEW_SYSTEM_PROMPT = """
 You are a masterful writer known for your ability to seamlessly intertwine multiple topics into a single, cohesive, and original piece. You expertly change genres and styles as appropriate, using a variety of sentence structures and stylistic techniques to create engaging and unpredictable narratives. Your writing challenges readers' expectations by interweaving concepts from different subjects throughout the text without using common transitional phrases or indicators of topic shifts. You avoid any explicit or implicit segmentation based on the source material, ensuring that your work flows naturally and cannot be easily divided into distinct sections.
 """
 
+# model used to generate synthetic documents
+GEN_MODEL = "gpt-4o-mini"
 
-async def generate_doc_with_llm(
-    validator,
-    pageids=None,
-    temperature=0.7,
-    override_client: AsyncOpenAI | None = None,
-    k=3,
-    loop_range=range(3, 7),
-    gen_type: SyntheticGenType = "new",
-) -> Tuple[str, List[str]]:
-    """
-    Generate a synthetic document based on three articles from wikipedia.
 
-    Args:
-        validator (Validator): The validator instance.
-        pageids (list[int]): The list of (three) page IDs to use for the synthetic query (if no validator is provided, this is required).
-        temperature (float): The temperature to use for the LLM.
-        override_client (OpenAI): The OpenAI client to use for the LLM (if no validator is provided, this is required).
+async def get_source_articles(
+    pageids: List[int], cache: WikiPageCache | None = None
+) -> Tuple[List[str], List[str]]:
+    """
+    Get the contents and titles of the Wikipedia pages a synthetic document is generated from.
 
     Returns:
-        str: The synthetic document.
+        Tuple[List[str], List[str]]: The contents and titles of the pages.
     """
-    # pages = (
-    #     choices(pageids, k=k)
-    #     if pageids != None and len(pageids) == k
-    #     else choices(validator.articles, k=k)
-    # )
-    if validator is None and (pageids is None or len(pageids) != k):
-        raise ValueError("Either validator or pageids must be provided")
-
-    bt.logging.info(f"Generating document with {k} articles")
-
-    if pageids is None:
-        pages = random.sample(validator.articles, k=k)
-    else:
-        pages = pageids
-
-    bt.logging.debug(f"source pageids: {pages}")
+    results = await asyncio.gather(
+        *(get_wiki_content_for_page(int(pageid), cache) for pageid in pageids)
+    )
+    return [content for content, _ in results], [title for _, title in results]
 
-    source_articles = []
-    article_names = []
-    coros = []
-    for page in pages:
-        coros.append(get_wiki_content_for_page(int(page)))
-    results = await asyncio.gather(*coros)
-    for contents, name in results:
-        source_articles.append(contents)
-        article_names.append(name)
 
-    bt.logging.debug(f"source names: {article_names}")
-    bt.logging.debug(f"source doc lens: {[len(doc) for doc in source_articles]}")
-    bt.logging.debug(f"gen_type: {gen_type}")
-
-    bt.logging.info(f"Generating first section of synthetic query with {k} articles")
-    start = time.time()
+def sample_source_pages(validator, k: int) -> List[int]:
+    """
+    Sample `k` Wikipedia pages from the validator's article catalog to generate a synthetic document from.
+    """
+    wiki_cache = validator.wiki_cache
+    # pages prefetched (sampled the same way) ahead of time, so generation doesn't wait for wikipedia
+    return (
+        wiki_cache.take_prefetched(k) if wiki_cache is not None else None
+    ) or sample_articles(validator.articles, k=k)
 
-    aclient = override_client if override_client else validator.aclient
 
+def get_initial_gen_messages(
+    gen_type: SyntheticGenType, source_articles: List[str]
+) -> List[dict]:
+    """
+    Get the chat messages to generate the first section of a synthetic document from three source articles.
+    """
     system_prompt = OLD_SYSTEM_PROMPT if gen_type == "old" else NEW_SYSTEM_PROMPT
 
     old_initial_gen_message = {
@@ -142,15 +129,212 @@ Article 3:
         old_initial_gen_message if gen_type == "old" else new_initial_gen_message
     )
 
+    return [{"role": "system", "content": system_prompt}, initial_gen_message]
+
+
+def get_continuation_gen_messages(
+    gen_type: SyntheticGenType, article_names: List[str], previous_synthesis: str
+) -> List[dict]:
+    """
+    Get the chat messages to generate the next section of a synthetic document, continuing the previous section.
+    """
+    system_prompt = OLD_SYSTEM_PROMPT if gen_type == "old" else NEW_SYSTEM_PROMPT
+
+    old_continuation_gen_message = {
+        "role": "user",
+        "content": f"This is part of an article about {article_names[0]}, {article_names[1]}, and {article_names[2]}:\n{previous_synthesis}\nContinue the article. Do not include section titles. Write to your token limit.",
+    }
+
+    new_continuation_gen_message = {
+        "role": "user",
+        "content": f"""
+This is part of a cohesive and unpredictable article that seamlessly integrates concepts from {article_names[0]}, {article_names[1]}, and {article_names[2]}:
+
+{previous_synthesis}
+
+Continue the article, changing genres or styles as appropriate to enhance the narrative. Use a variety of sentence structures and stylistic techniques. Interweave concepts from all three topics unpredictably, challenging the reader's expectations. Integrate ideas without using common transitional phrases or indicators of topic shifts. Ensure the content flows naturally, blending concepts from all articles throughout. Avoid any explicit or implicit segmentation based on the source articles. Do not include section titles or headings. Write up to your token limit.
+            """,
+    }
+
+    continuation_gen_message = (
+        old_continuation_gen_message
+        if gen_type == "old"
+        else new_continuation_gen_message
+    )
+
+    return [{"role": "system", "content": system_prompt}, continuation_gen_message]
+
+
+def truncate_to_sentence(text: str) -> str:
+    """
+    Truncate text after its last complete sentence (the whole text if it has no sentence end).
+    """
+    end = max(text.rfind(". "), text.rfind("! "), text.rfind("? "))
+    if text.endswith((".", "!", "?")) or end < 0:
+        return text
+    return text[: end + 1]
+
+
+async def stream_completion(
+    aclient: AsyncOpenAI, messages: List[dict], temperature: float
+) -> AsyncIterator[Tuple[str, int | None]]:
+    """
+    Stream a chat completion.
+
+    Yields:
+        Tuple[str, int | None]: The next piece of the completion, and the total tokens used (only set on the last chunk).
+    """
+    stream = await aclient.chat.completions.create(
+        model=GEN_MODEL,
+        temperature=temperature,
+        messages=messages,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    try:
+        async for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            total_tokens = chunk.usage.total_tokens if chunk.usage else None
+            if text or total_tokens is not None:
+                yield text or "", total_tokens
+    finally:
+        # stop generating (and paying for) the rest of the completion when the consumer stops early
+        await stream.close()
+
+
+async def stream_doc_with_llm(
+    validator,
+    pageids=None,
+    temperature=0.7,
+    override_client: AsyncOpenAI | None = None,
+    k=3,
+    loop_range=range(3, 7),
+    gen_type: SyntheticGenType = "new",
+) -> AsyncIterator[Tuple[str, List[str]]]:
+    """
+    Generate a synthetic document like `generate_doc_with_llm`, streaming the completions.
+
+    Yields:
+        Tuple[str, List[str]]: The next streamed piece of the document and the source article names. The first piece
+            of each section after the first starts with a space, so joining the pieces gives the (unnormalized) document.
+    """
+    if validator is None and (pageids is None or len(pageids) != k):
+        raise ValueError("Either validator or pageids must be provided")
+
+    wiki_cache = validator.wiki_cache if validator is not None else None
+    pages = pageids if pageids is not None else sample_source_pages(validator, k)
+    source_articles, article_names = await get_source_articles(pages, wiki_cache)
+
+    aclient = override_client if override_client else validator.aclient
+    num_sections = 1 + random.choice(list(loop_range))
+
+    previous_synthesis = ""
+    for i in range(num_sections):
+        messages = (
+            get_initial_gen_messages(gen_type, source_articles)
+            if i == 0
+            else get_continuation_gen_messages(
+                gen_type, article_names, previous_synthesis
+            )
+        )
+        section = ""
+        separator = " " if i > 0 else ""
+        async with aclosing(
+            stream_completion(aclient, messages, temperature)
+        ) as completion:
+            async for text, _ in completion:
+                if not text:
+                    continue
+                section += text
+                yield separator + text, article_names
+                separator = ""
+
+        previous_synthesis = " ".join(section.split())
+
+
+async def generate_doc_with_llm(
+    validator,
+    pageids=None,
+    temperature=0.7,
+    override_client: AsyncOpenAI | None = None,
+    k=3,
+    loop_range=range(3, 7),
+    gen_type: SyntheticGenType = "new",
+    handoff: Callable[[int], bool] | None = None,
+) -> Tuple[str, List[str]]:
+    """
+    Generate a synthetic document based on three articles from wikipedia.
+
+    Args:
+        validator (Validator): The validator instance.
+        pageids (list[int]): The list of (three) page IDs to use for the synthetic query (if no validator is provided, this is required).
+        temperature (float): The temperature to use for the LLM.
+        override_client (OpenAI): The OpenAI client to use for the LLM (if no validator is provided, this is required).
+        handoff (Callable[[int], bool] | None): If set, the completions are streamed and the document is returned
+            (truncated to its last complete sentence) as soon as `handoff` returns True for the length of the document
+            generated so far.
+
+    Returns:
+        str: The synthetic document.
+    """
+    if handoff is not None:
+        start = time.time()
+        pieces, length, article_names = [], 0, []
+        handed_off = False
+        async with aclosing(
+            stream_doc_with_llm(
+                validator, pageids, temperature, override_client, k, loop_range, gen_type
+            )
+        ) as stream:
+            async for text, article_names in stream:
+                pieces.append(text)
+                length += len(text)
+                if handoff(length):
+                    handed_off = True
+                    break
+
+        # the document is only joined and normalized once, not on every piece
+        document = " ".join("".join(pieces).split())
+        if handed_off:
+            document = truncate_to_sentence(document)
+            bt.logging.info(
+                f"Handing off synthetic document early at {time.time() - start} seconds, length: {len(document)} characters"
+            )
+        return document, article_names
+
+    # pages = (
+    #     choices(pageids, k=k)
+    #     if pageids != None and len(pageids) == k
+    #     else choices(validator.articles, k=k)
+    # )
+    if validator is None and (pageids is None or len(pageids) != k):
+        raise ValueError("Either validator or pageids must be provided")
+
+    bt.logging.info(f"Generating document with {k} articles")
+
+    wiki_cache = validator.wiki_cache if validator is not None else None
+
+    pages = pageids if pageids is not None else sample_source_pages(validator, k)
+
+    bt.logging.debug(f"source pageids: {pages}")
+
+    source_articles, article_names = await get_source_articles(pages, wiki_cache)
+
+    bt.logging.debug(f"source names: {article_names}")
+    bt.logging.debug(f"source doc lens: {[len(doc) for doc in source_articles]}")
+    bt.logging.debug(f"gen_type: {gen_type}")
+
+    bt.logging.info(f"Generating first section of synthetic query with {k} articles")
+    start = time.time()
+
+    aclient = override_client if override_client else validator.aclient
+
     synthetic_document = (
         (
             await aclient.chat.completions.create(
-                model="gpt-4o-mini",
+                model=GEN_MODEL,
                 temperature=temperature,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    initial_gen_message,
-                ],
+                messages=get_initial_gen_messages(gen_type, source_articles),
             )
         )
         .choices[0]
@@ -174,38 +358,14 @@ Article 3:
     bt.logging.info(f"Generating {end_index} more sections of synthetic query")
 
     for j in range(end_index):
-
-        old_continuation_gen_message = {
-            "role": "user",
-            "content": f"This is part of an article about {article_names[0]}, {article_names[1]}, and {article_names[2]}:\n{previous_synthesis}\nContinue the article. Do not include section titles. Write to your token limit.",
-        }
-
-        new_continuation_gen_message = {
-            "role": "user",
-            "content": f"""
-This is part of a cohesive and unpredictable article that seamlessly integrates concepts from {article_names[0]}, {article_names[1]}, and {article_names[2]}:
-
-{previous_synthesis}
-
-Continue the article, changing genres or styles as appropriate to enhance the narrative. Use a variety of sentence structures and stylistic techniques. Interweave concepts from all three topics unpredictably, challenging the reader's expectations. Integrate ideas without using common transitional phrases or indicators of topic shifts. Ensure the content flows naturally, blending concepts from all articles throughout. Avoid any explicit or implicit segmentation based on the source articles. Do not include section titles or headings. Write up to your token limit.
-            """,
-        }
-
-        continuation_gen_message = (
-            old_continuation_gen_message
-            if gen_type == "old"
-            else new_continuation_gen_message
-        )
-
         next_synthesis = (
             (
                 await aclient.chat.completions.create(
-                    model="gpt-4o-mini",
+                    model=GEN_MODEL,
                     temperature=temperature,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        continuation_gen_message,
-                    ],
+                    messages=get_continuation_gen_messages(
+                        gen_type, article_names, previous_synthesis
+                    ),
                 )
             )
             .choices[0]
@@ -225,7 +385,7 @@ Continue the article, changing genres or styles as appropriate to enhance the na
 
     bt.logging.info(f"Generated synthetic query with {num_chars} characters")
 
-    num_tokens = num_tokens_from_string(synthetic_document, "gpt-4o-mini")
+    num_tokens = num_tokens_from_string(synthetic_document, GEN_MODEL)
 
     bt.logging.info(f"Generated synthetic query with {num_tokens} tokens")
 
@@ -248,9 +408,14 @@ async def generate_doc_normal(validator, pageid=None) -> Tuple[str, int]:
         Tuple[str, int]: A tuple containing the content of the Wikipedia page and the page ID.
     """
     content = ""
-    random_page_id = (
-        random.sample(validator.articles, 1)[0] if validator is not None else pageid
-    )
+    wiki_cache = validator.wiki_cache if validator is not None else None
+    if validator is None:
+        random_page_id = pageid
+    else:
+        random_page_id = (
+            (wiki_cache.take_prefetched(1) if wiki_cache is not None else None)
+            or sample_articles(validator.articles, 1)
+        )[0]
     # while len(content) < 10000 or len(content) > 100000:
     # page = requests.get(
     #     "https://en.wikipedia.org/w/api.php",
@@ -263,7 +428,7 @@ async def generate_doc_normal(validator, pageid=None) -> Tuple[str, int]:
     # ).json()["query"]["random"][0]["id"]
     bt.logging.debug(f"random_page_id: {random_page_id}")
 
-    content, title = await get_wiki_content_for_page(random_page_id)
+    content, title = await get_wiki_content_for_page(random_page_id, wiki_cache)
     bt.logging.info(f"Got document {title} with {len(content)} characters")
     return content, random_page_id
 
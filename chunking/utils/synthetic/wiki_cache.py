@@ -0,0 +1,288 @@
+import asyncio
+import gzip
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Sequence
+
+import aiohttp
+import bittensor as bt
+from pydantic import BaseModel
+
+from chunking.utils.articles import WIKIPEDIA_API_URL, sample_articles
+from chunking.utils.state import atomic_write
+
+# bump when the on-disk layout of the page cache changes
+WIKI_CACHE_FORMAT_VERSION = 1
+# max page ids per `prop=info` request
+WIKI_INFO_BATCH_SIZE = 50
+# timeout (seconds) of each request to Wikipedia
+WIKI_REQUEST_TIMEOUT = 30
+
+
+class CachedPage(BaseModel):
+    """
+    Index entry of a Wikipedia page extract stored in a `WikiPageCache`.
+    """
+
+    pageid: int
+    revid: int
+    title: str
+    # size of the compressed extract file in bytes
+    size: int
+    # unix time the extract was fetched or its revision was last confirmed
+    checked_at: float
+
+
+class WikiPageCache:
+    """
+    An on-disk, gzip compressed cache of Wikipedia page extracts, keyed by page id and revision.
+
+    - Extracts are fetched through one shared HTTP session and stored as gzip files, with a JSON index (written
+      atomically) of the pages' revisions, titles and sizes.
+    - The cache is bounded to `max_bytes`, least recently used pages are evicted first.
+    - A page is fetched at most once at a time: concurrent misses of the same page wait for the same fetch.
+    - `revalidate` checks the revisions of pages not checked for `revalidate_seconds` in bulk (`prop=info`), dropping
+      pages that were edited so they are fetched again.
+    - `prefetch_random` keeps `prefetch_count` uniformly sampled pages from the article catalog fetched ahead of time,
+      which document generation takes with `take_prefetched` so it doesn't wait for Wikipedia.
+    """
+
+    def __init__(
+        self,
+        dir_path: str,
+        max_bytes: int = 500 * 1024 * 1024,
+        revalidate_seconds: float = 24 * 60 * 60,
+        prefetch_count: int = 30,
+        prefetch_concurrency: int = 4,
+        api_url: str = WIKIPEDIA_API_URL,
+    ):
+        self.dir_path = dir_path
+        self.api_url = api_url
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self.prefetch_count = prefetch_count
+        self.prefetch_concurrency = prefetch_concurrency
+
+        os.makedirs(dir_path, exist_ok=True)
+        self._index_path = os.path.join(
+            dir_path, f"index.v{WIKI_CACHE_FORMAT_VERSION}.json"
+        )
+        # least recently used first
+        self._pages: OrderedDict[int, CachedPage] = self._load_index()
+        self._size = sum(page.size for page in self._pages.values())
+        self._prefetched: deque[int] = deque()
+        self._in_flight: dict[int, asyncio.Task] = {}
+        self._session: aiohttp.ClientSession | None = None
+        # index writes go through a temporary file, so concurrent saves must not overlap
+        self._index_lock = asyncio.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _page_path(self, pageid: int) -> str:
+        return os.path.join(self.dir_path, f"{pageid}.txt.gz")
+
+    def _load_index(self) -> OrderedDict[int, CachedPage]:
+        pages: OrderedDict[int, CachedPage] = OrderedDict()
+        if os.path.exists(self._index_path):
+            try:
+                with open(self._index_path) as f:
+                    for entry in json.load(f):
+                        page = CachedPage(**entry)
+                        if os.path.exists(self._page_path(page.pageid)):
+                            pages[page.pageid] = page
+            except Exception as e:
+                bt.logging.error(f"Failed to load wiki page cache index: {e}")
+
+        for file in os.listdir(self.dir_path):
+            if file.endswith(".txt.gz") and int(file[: -len(".txt.gz")]) not in pages:
+                os.remove(os.path.join(self.dir_path, file))
+
+        if pages:
+            bt.logging.info(f"Loaded {len(pages)} cached wiki pages from {self.dir_path}")
+        return pages
+
+    def _save_index(self):
+        entries = [page.model_dump() for page in self._pages.values()]
+        atomic_write(self._index_path, lambda f: f.write(json.dumps(entries).encode()))
+
+    async def _persist_index(self):
+        async with self._index_lock:
+            await asyncio.to_thread(self._save_index)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def __contains__(self, pageid: int) -> bool:
+        return pageid in self._pages
+
+    @property
+    def size(self) -> int:
+        """Total size of the compressed extracts in bytes."""
+        return self._size
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=WIKI_REQUEST_TIMEOUT)
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    async def _query(self, params: dict) -> dict:
+        async with self._get_session().get(
+            self.api_url, params={"action": "query", "format": "json", **params}
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def _fetch(self, pageid: int) -> tuple[str, str, int]:
+        data = await self._query(
+            {
+                "pageids": pageid,
+                "prop": "extracts|info",
+                "explaintext": "true",
+                "exsectionformat": "plain",
+            }
+        )
+        page = data["query"]["pages"][str(pageid)]
+        return page["extract"], page["title"], page["lastrevid"]
+
+    def _write(self, pageid: int, extract: str) -> int:
+        data = gzip.compress(extract.encode("utf-8"), compresslevel=6)
+        atomic_write(self._page_path(pageid), lambda f: f.write(data))
+        return len(data)
+
+    def _read(self, pageid: int) -> str:
+        with open(self._page_path(pageid), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def _remove(self, pageid: int):
+        page = self._pages.pop(pageid)
+        self._size -= page.size
+        try:
+            os.remove(self._page_path(pageid))
+        except OSError as e:
+            bt.logging.warning(f"Failed to remove cached wiki page {pageid}: {e}")
+
+    async def _store(self, pageid: int, extract: str, title: str, revid: int):
+        size = await asyncio.to_thread(self._write, pageid, extract)
+        if pageid in self._pages:
+            self._size -= self._pages.pop(pageid).size
+        self._pages[pageid] = CachedPage(
+            pageid=pageid, revid=revid, title=title, size=size, checked_at=time.time()
+        )
+        self._size += size
+
+        while self._size > self.max_bytes and len(self._pages) > 1:
+            self._remove(next(iter(self._pages)))
+
+        await self._persist_index()
+
+    async def get(self, pageid: int) -> tuple[str, str]:
+        """
+        Gets the extract and title of a Wikipedia page, from the cache if possible.
+
+        Returns:
+            tuple[str, str]: The content and title of the Wikipedia page.
+        """
+        page = self._pages.get(pageid)
+        if page is not None:
+            try:
+                extract = await asyncio.to_thread(self._read, pageid)
+                self._pages.move_to_end(pageid)
+                self.hits += 1
+                return extract, page.title
+            except Exception as e:
+                bt.logging.error(f"Failed to read cached wiki page {pageid}: {e}")
+                if pageid in self._pages:
+                    self._remove(pageid)
+
+        task = self._in_flight.get(pageid)
+        if task is None:
+            self.misses += 1
+            # a separate task, so a cancelled caller doesn't cancel it for the others waiting on it
+            task = asyncio.ensure_future(self._fetch_and_store(pageid))
+            task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._in_flight[pageid] = task
+        else:
+            self.hits += 1
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, pageid: int) -> tuple[str, str]:
+        try:
+            extract, title, revid = await self._fetch(pageid)
+            await self._store(pageid, extract, title, revid)
+            return extract, title
+        finally:
+            del self._in_flight[pageid]
+
+    async def revalidate(self):
+        """
+        Checks the revisions of pages not checked for `revalidate_seconds`, in batches, and drops pages that changed.
+        """
+        now = time.time()
+        stale = [
+            pageid
+            for pageid, page in self._pages.items()
+            if now - page.checked_at > self.revalidate_seconds
+        ]
+        dropped = 0
+        for i in range(0, len(stale), WIKI_INFO_BATCH_SIZE):
+            batch = stale[i : i + WIKI_INFO_BATCH_SIZE]
+            data = await self._query(
+                {"pageids": "|".join(str(pageid) for pageid in batch), "prop": "info"}
+            )
+            for pageid in batch:
+                page = self._pages.get(pageid)
+                info = data["query"]["pages"].get(str(pageid), {})
+                if page is None:
+                    continue
+                if info.get("lastrevid") == page.revid:
+                    page.checked_at = now
+                else:
+                    self._remove(pageid)
+                    dropped += 1
+
+        if stale:
+            await self._persist_index()
+            bt.logging.debug(
+                f"Revalidated {len(stale)} cached wiki pages, dropped {dropped} changed pages"
+            )
+
+    async def prefetch(self, pageids: Sequence[int]) -> list[int]:
+        """
+        Fetches the pages into the cache, `prefetch_concurrency` at a time. Returns the page ids that are now cached.
+        """
+        semaphore = asyncio.Semaphore(self.prefetch_concurrency)
+
+        async def fetch(pageid: int) -> int | None:
+            async with semaphore:
+                try:
+                    await self.get(pageid)
+                    return pageid
+                except Exception as e:
+                    bt.logging.warning(f"Failed to prefetch wiki page {pageid}: {e}")
+                    return None
+
+        results = await asyncio.gather(*(fetch(int(pageid)) for pageid in pageids))
+        return [pageid for pageid in results if pageid is not None]
+
+    async def prefetch_random(self, articles: Sequence[int]):
+        """Tops up the prefetched pages with pages sampled uniformly from the article catalog."""
+        missing = self.prefetch_count - len(self._prefetched)
+        if missing <= 0 or len(articles) == 0:
+            return
+        pageids = sample_articles(articles, min(missing, len(articles)))
+        self._prefetched.extend(await self.prefetch(pageids))
+
+    def take_prefetched(self, k: int) -> list[int] | None:
+        """Takes `k` prefetched page ids (each is only handed out once), or None if fewer are prefetched."""
+        if len(self._prefetched) < k:
+            return None
+        return [self._prefetched.popleft() for _ in range(k)]
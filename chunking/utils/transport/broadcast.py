@@ -0,0 +1,131 @@
+import json
+import time
+
+import bittensor as bt
+from bittensor.core.settings import version_as_int
+
+from chunking.utils.transport.compression import ByteCounts, compress
+
+
+def _json_bytes(value) -> bytes:
+    # same encoding httpx uses for `json=`
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _terminal_headers(prefix: str, terminal: bt.TerminalInfo) -> dict[str, str]:
+    # same as `bt.Synapse.to_headers`
+    return {
+        f"{prefix}{k}": str(v) for k, v in terminal.model_dump().items() if v is not None
+    }
+
+
+class PreparedBroadcast:
+    """
+    A synapse prepared to be sent to many axons.
+
+    The part of the request that is the same for every axon (the body without `dendrite`/`axon`, the synapse headers
+    and the body hash) is serialized once. Per axon, only the dendrite/axon terminal info, the nonce and the signature
+    are built and spliced into the body and headers (see `prepare`).
+
+    Bodies of at least `compression_min_bytes` can be compressed. The invariant part is then also compressed once per
+    encoding, and only the per-axon part is compressed per axon (compressed gzip members / zstd frames concatenate).
+
+    `byte_counts` tracks the raw vs. sent/received bytes of all queries of the broadcast.
+    """
+
+    def __init__(
+        self,
+        synapse: bt.Synapse,
+        timeout: float,
+        compression_min_bytes: int | None = None,
+    ):
+        self.synapse = synapse.model_copy(
+            update={"timeout": timeout, "dendrite": None, "axon": None}
+        )
+
+        # sets `total_size` on the synapse, so it is included in the body below (like `query_axon` used to send)
+        self.base_headers = self.synapse.to_headers()
+        self.body_hash = self.base_headers["computed_body_hash"]
+
+        body = _json_bytes(self.synapse.model_dump(exclude={"dendrite", "axon"}))
+        # without the closing brace, so the terminal info can be appended
+        self._body_prefix = body[:-1]
+        self._compressed_body_prefixes: dict[str, bytes] = {}
+        self.can_compress = (
+            compression_min_bytes is not None
+            and len(self._body_prefix) >= compression_min_bytes
+        )
+
+        self.byte_counts = ByteCounts()
+
+    def _compressed_body_prefix(self, encoding: str) -> bytes:
+        if encoding not in self._compressed_body_prefixes:
+            self._compressed_body_prefixes[encoding] = compress(
+                self._body_prefix, encoding
+            )
+        return self._compressed_body_prefixes[encoding]
+
+    def prepare(
+        self,
+        dendrite: bt.dendrite,
+        target_axon_info: bt.AxonInfo,
+        encoding: str | None = None,
+    ) -> tuple[bt.Synapse, dict[str, str], bytes]:
+        """
+        Prepares the request to one axon: builds and signs the dendrite/axon terminal info.
+
+        The body is compressed with `encoding` if given and `can_compress`.
+
+        Returns:
+            tuple: A tuple containing:
+                - synapse (bt.Synapse): A (shallow) copy of the synapse with the terminal info, to fill with the response.
+                - headers (dict[str, str]): The request headers.
+                - body (bytes): The JSON request body.
+        """
+        synapse = self.synapse.model_copy()
+
+        synapse.dendrite = bt.TerminalInfo(
+            ip=dendrite.external_ip,
+            version=version_as_int,
+            nonce=time.time_ns(),
+            uuid=dendrite.uuid,
+            hotkey=dendrite.keypair.ss58_address,
+        )
+        synapse.axon = bt.TerminalInfo(
+            ip=target_axon_info.ip,
+            port=target_axon_info.port,
+            hotkey=target_axon_info.hotkey,
+        )
+
+        # Sign the request using the dendrite, axon info, and the synapse body hash
+        message = f"{synapse.dendrite.nonce}.{synapse.dendrite.hotkey}.{synapse.axon.hotkey}.{synapse.dendrite.uuid}.{self.body_hash}"
+        synapse.dendrite.signature = f"0x{dendrite.keypair.sign(message).hex()}"
+
+        headers = {
+            **self.base_headers,
+            **_terminal_headers("bt_header_axon_", synapse.axon),
+            **_terminal_headers("bt_header_dendrite_", synapse.dendrite),
+        }
+
+        body_suffix = b"".join(
+            [
+                b',"dendrite":',
+                _json_bytes(synapse.dendrite.model_dump()),
+                b',"axon":',
+                _json_bytes(synapse.axon.model_dump()),
+                b"}",
+            ]
+        )
+
+        if encoding is not None and self.can_compress:
+            body = self._compressed_body_prefix(encoding) + compress(
+                body_suffix, encoding
+            )
+            headers["Content-Encoding"] = encoding
+        else:
+            body = self._body_prefix + body_suffix
+
+        self.byte_counts.requests_raw += len(self._body_prefix) + len(body_suffix)
+        self.byte_counts.requests_sent += len(body)
+
+        return synapse, headers, body
@@ -0,0 +1,289 @@
+import gzip
+import json
+import zlib
+
+import bittensor as bt
+from pydantic import BaseModel
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# response header with which a miner advertises the encodings it can decompress requests with
+ACCEPT_REQUEST_ENCODING_HEADER = "x-chunking-accept-request-encoding"
+
+# in order of preference
+SUPPORTED_ENCODINGS: list[str] = (["zstd"] if zstandard is not None else []) + ["gzip"]
+
+# upper bound on the size of a decompressed request body, so a small compressed body can't blow up miner memory
+MAX_DECOMPRESSED_BYTES = 64 * 1024 * 1024
+
+
+class RequestTooLargeError(ValueError):
+    """A (compressed or decompressed) request body is larger than allowed."""
+
+
+class ByteCounts(BaseModel):
+    """
+    Raw (uncompressed) vs. actually transferred byte counts of synapse requests and responses.
+    """
+
+    requests_raw: int = 0
+    requests_sent: int = 0
+    responses_raw: int = 0
+    responses_received: int = 0
+
+    def add(self, other: "ByteCounts"):
+        self.requests_raw += other.requests_raw
+        self.requests_sent += other.requests_sent
+        self.responses_raw += other.responses_raw
+        self.responses_received += other.responses_received
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compresses the data with the given encoding (`gzip` or `zstd`).
+
+    Compressed outputs can be concatenated: `decompress` decodes all gzip members / zstd frames of the data.
+    """
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=1, mtime=0)
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def decompress(
+    data: bytes, encoding: str, max_size: int = MAX_DECOMPRESSED_BYTES
+) -> bytes:
+    """
+    Decompresses (possibly concatenated) gzip members or zstd frames.
+
+    Raises:
+        RequestTooLargeError: If the decompressed data is larger than `max_size`.
+        ValueError: If the encoding is not supported or the data is invalid.
+    """
+    if encoding == "gzip":
+        parts, size = [], 0
+        while data:
+            decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+            part = decompressor.decompress(data, max_size - size + 1)
+            size += len(part)
+            if size > max_size or decompressor.unconsumed_tail:
+                raise RequestTooLargeError(f"Decompressed data larger than {max_size} bytes")
+            if not decompressor.eof:
+                raise ValueError("Truncated gzip data")
+            parts.append(part)
+            data = decompressor.unused_data
+        return b"".join(parts)
+
+    if encoding == "zstd" and zstandard is not None:
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            data, read_across_frames=True
+        )
+        result = reader.read(max_size + 1)
+        if len(result) > max_size:
+            raise RequestTooLargeError(f"Decompressed data larger than {max_size} bytes")
+        return result
+
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def parse_encodings(header_value: str | None) -> list[str]:
+    """
+    Parses an `Accept-Encoding`-like header value into the encodings it lists (ignoring quality values).
+    """
+    if not header_value:
+        return []
+    return [
+        part.split(";")[0].strip().lower()
+        for part in header_value.split(",")
+        if part.strip()
+    ]
+
+
+def choose_encoding(accepted: list[str], preferred: str = "auto") -> str | None:
+    """
+    Chooses the encoding to compress with, given the encodings the other side accepts.
+
+    Args:
+        accepted (list[str]): Encodings the other side accepts.
+        preferred (str): `auto` for the best encoding supported by both sides, a specific encoding, or `none`.
+
+    Returns:
+        str | None: The encoding, or None if the data should be sent uncompressed.
+    """
+    if preferred == "none":
+        return None
+    candidates = SUPPORTED_ENCODINGS if preferred == "auto" else [preferred]
+    for encoding in candidates:
+        if encoding in SUPPORTED_ENCODINGS and encoding in accepted:
+            return encoding
+    return None
+
+
+class CompressionCapabilities:
+    """
+    Tracks which encodings each miner (by hotkey) can decompress requests with, as advertised in its responses.
+
+    Miners that have not advertised anything (yet) are sent uncompressed requests. Any response without the
+    advertisement (e.g. after a miner downgrades) clears the miner's capabilities again.
+    """
+
+    def __init__(self):
+        self._accepted: dict[str, list[str]] = {}
+
+    def get(self, hotkey: str) -> list[str]:
+        return self._accepted.get(hotkey, [])
+
+    def update(self, hotkey: str, header_value: str | None):
+        accepted = parse_encodings(header_value)
+        if accepted:
+            self._accepted[hotkey] = accepted
+        else:
+            self._accepted.pop(hotkey, None)
+
+    def __len__(self) -> int:
+        return len(self._accepted)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware for the miner's axon app that:
+    - decompresses requests sent with a supported `Content-Encoding`, before the axon verifies the body hash,
+      rejecting (413) requests whose compressed or decompressed body is larger than `max_request_bytes`,
+    - compresses responses of at least `min_size` bytes with the best encoding in the request's `Accept-Encoding`,
+    - advertises the encodings it can decompress in the `ACCEPT_REQUEST_ENCODING_HEADER` response header.
+
+    Must be the outermost middleware, i.e. added after the axon's own middleware.
+    """
+
+    def __init__(
+        self,
+        app,
+        min_size: int = 16 * 1024,
+        max_request_bytes: int = MAX_DECOMPRESSED_BYTES,
+    ):
+        self.app = app
+        self.min_size = min_size
+        self.max_request_bytes = max_request_bytes
+        self.advertised = ", ".join(SUPPORTED_ENCODINGS).encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = {k.lower(): v for k, v in scope["headers"]}
+        response_encoding = choose_encoding(
+            parse_encodings(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        )
+
+        content_encoding = headers.get(b"content-encoding", b"").decode("latin-1")
+        if content_encoding and content_encoding.lower() != "identity":
+            try:
+                receive, scope = await self._decompress_request(
+                    scope, receive, content_encoding.lower()
+                )
+            except RequestTooLargeError as e:
+                bt.logging.warning(f"Rejected compressed request: {e}")
+                return await self._send_error(send, 413, str(e))
+            except ValueError as e:
+                bt.logging.warning(f"Failed to decompress request: {e}")
+                return await self._send_error(send, 415, str(e))
+
+        await self.app(scope, receive, self._wrap_send(send, response_encoding))
+
+    async def _decompress_request(self, scope, receive, encoding: str):
+        if encoding not in SUPPORTED_ENCODINGS:
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+
+        # this runs before the axon's blacklist and verification, so the body is bounded as it is read
+        parts, size = [], 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            part = message.get("body", b"")
+            size += len(part)
+            if size > self.max_request_bytes:
+                raise RequestTooLargeError(
+                    f"Compressed request body larger than {self.max_request_bytes} bytes"
+                )
+            parts.append(part)
+            more_body = message.get("more_body", False)
+
+        body = decompress(b"".join(parts), encoding, self.max_request_bytes)
+
+        scope = dict(scope)
+        scope["headers"] = [
+            (k, v)
+            for k, v in scope["headers"]
+            if k.lower() not in (b"content-encoding", b"content-length")
+        ] + [(b"content-length", str(len(body)).encode())]
+
+        sent = False
+
+        async def decompressed_receive():
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return decompressed_receive, scope
+
+    def _wrap_send(self, send, encoding: str | None):
+        start_message = None
+        body_parts: list[bytes] = []
+
+        async def wrapped_send(message):
+            nonlocal start_message
+
+            if message["type"] == "http.response.start":
+                # hold the start until the body is known, to set the encoding headers
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                return await send(message)
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(body_parts)
+            headers = [
+                (k, v)
+                for k, v in start_message.get("headers", [])
+                if k.lower() != b"content-length"
+            ]
+            headers.append((ACCEPT_REQUEST_ENCODING_HEADER.encode(), self.advertised))
+
+            already_encoded = any(k.lower() == b"content-encoding" for k, _ in headers)
+            if encoding is not None and not already_encoded and len(body) >= self.min_size:
+                body = compress(body, encoding)
+                headers.append((b"content-encoding", encoding.encode()))
+                headers.append((b"vary", b"accept-encoding"))
+
+            headers.append((b"content-length", str(len(body)).encode()))
+
+            await send({**start_message, "headers": headers})
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        return wrapped_send
+
+    async def _send_error(self, send, status: int, message: str):
+        body = json.dumps({"message": message}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (ACCEPT_REQUEST_ENCODING_HEADER.encode(), self.advertised),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,106 @@
+from typing import Mapping
+
+import bittensor as bt
+
+from chunking.protocol import chunkSynapse
+
+try:
+    import orjson
+
+    def loads(content: bytes):
+        return orjson.loads(content)
+
+except ImportError:
+    import json
+
+    def loads(content: bytes):
+        return json.loads(content)
+
+
+AXON_HEADER_PREFIX = "bt_header_axon_"
+DENDRITE_HEADER_PREFIX = "bt_header_dendrite_"
+
+
+class ResponseTooLargeError(Exception):
+    """
+    Raised when a response body is larger than the allowed maximum.
+    """
+
+    def __init__(self, size: int, max_size: int):
+        super().__init__(f"Response too large: {size} > {max_size} bytes")
+        self.size = size
+        self.max_size = max_size
+
+
+def parse_terminal_headers(
+    headers: Mapping[str, str],
+) -> tuple[bt.TerminalInfo, bt.TerminalInfo]:
+    """
+    Parses the axon and dendrite terminal info from response headers, skipping every other header (unlike
+    `bt.Synapse.from_headers`, which also decodes the input object headers and builds a whole synapse).
+    """
+    axon, dendrite = {}, {}
+    for key, value in headers.items():
+        if key.startswith(AXON_HEADER_PREFIX):
+            axon[key[len(AXON_HEADER_PREFIX) :]] = value
+        elif key.startswith(DENDRITE_HEADER_PREFIX):
+            dendrite[key[len(DENDRITE_HEADER_PREFIX) :]] = value
+    return bt.TerminalInfo(**axon), bt.TerminalInfo(**dendrite)
+
+
+def _validate_chunks(chunks) -> list[str] | None:
+    if chunks is None:
+        return None
+    if not isinstance(chunks, list) or not all(isinstance(c, str) for c in chunks):
+        raise ValueError("Invalid response: chunks must be a list of strings")
+    return chunks
+
+
+def _validate_miner_signature(miner_signature) -> str | None:
+    if miner_signature is not None and not isinstance(miner_signature, str):
+        raise ValueError("Invalid response: miner_signature must be a string")
+    return miner_signature
+
+
+def decode_chunk_response(
+    synapse: chunkSynapse,
+    status_code: int,
+    headers: Mapping[str, str],
+    content: bytes,
+):
+    """
+    Fills the request synapse with an axon's response, in place.
+
+    The body is parsed once. On success (200) only the response fields (`chunks` and `miner_signature`) are validated
+    and set; the request fields the miner echoes back are ignored. Otherwise the axon's status code and message are set.
+    The terminal info from the response headers is then merged into the synapse's axon/dendrite, and the dendrite
+    status is set to match the axon's.
+
+    Raises:
+        ValueError: If the body is not valid JSON or the response fields are invalid.
+    """
+    body = loads(content) if content else {}
+    if not isinstance(body, dict):
+        raise ValueError("Invalid response: body must be a JSON object")
+
+    if synapse.axon is None:
+        synapse.axon = bt.TerminalInfo()
+
+    if status_code == 200:
+        synapse.chunks = _validate_chunks(body.get("chunks"))
+        synapse.miner_signature = _validate_miner_signature(body.get("miner_signature"))
+    else:
+        synapse.axon.status_code = status_code
+        synapse.axon.status_message = body.get("message")
+
+    server_axon, server_dendrite = parse_terminal_headers(headers)
+
+    # Merge dendrite headers
+    synapse.dendrite.__dict__.update(server_dendrite.model_dump(exclude_none=True))
+
+    # Merge axon headers
+    synapse.axon.__dict__.update(server_axon.model_dump(exclude_none=True))
+
+    # Update the status code and status message of the dendrite to match the axon
+    synapse.dendrite.status_code = synapse.axon.status_code
+    synapse.dendrite.status_message = synapse.axon.status_message
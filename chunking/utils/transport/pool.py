@@ -0,0 +1,225 @@
+import asyncio
+import importlib.util
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import bittensor as bt
+import httpx
+from pydantic import BaseModel
+
+from chunking.utils.transport.compression import ByteCounts
+from chunking.utils.transport.decode import ResponseTooLargeError
+
+
+class AxonPoolStats(BaseModel):
+    """
+    Connection statistics of an `AxonClientPool`.
+    """
+
+    # requests sent through the pool
+    requests: int
+    # new connections opened (TCP connects)
+    connections_opened: int
+    # share of requests that reused an already open connection
+    reuse_ratio: float
+    # connections currently held by the pool (idle or in use), None if unknown
+    open_connections: int | None
+    # requests currently waiting for a per-host slot
+    waiting_for_host: int
+    # requests that timed out waiting for a per-host slot
+    host_slot_timeouts: int
+    # responses dropped for being larger than the max response size
+    responses_too_large: int
+    # raw vs. transferred bytes of all queries (see `record_bytes`)
+    byte_counts: ByteCounts
+    http2: bool
+
+
+class AxonClientPool:
+    """
+    A long-lived, pooled HTTP client for querying miner axons.
+
+    Connections are kept alive and reused across rounds. On top of httpx's total limit, the number of concurrent
+    requests to a single host (ip:port) is limited, so one miner can't take up the whole pool.
+
+    HTTP/2 is used if requested and the optional `h2` package is installed.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 256,
+        max_connections_per_host: int = 4,
+        connect_timeout: float = 5.0,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False,
+    ):
+        if http2 and importlib.util.find_spec("h2") is None:
+            bt.logging.warning(
+                "HTTP/2 requested for axon queries but the `h2` package is not installed, using HTTP/1.1"
+            )
+            http2 = False
+
+        self.max_connections_per_host = max_connections_per_host
+        self.connect_timeout = connect_timeout
+        self.http2 = http2
+
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+        )
+
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+        self._requests = 0
+        self._connections_opened = 0
+        self._waiting_for_host = 0
+        self._host_slot_timeouts = 0
+        self._responses_too_large = 0
+        self._byte_counts = ByteCounts()
+
+    def get_timeout(self, timeout: float) -> httpx.Timeout:
+        """
+        Gets the timeouts for a query with the given (synapse) timeout: connecting is capped at `connect_timeout`,
+        while reading the response and waiting for a pooled connection may take the whole timeout.
+        """
+        return httpx.Timeout(timeout, connect=min(self.connect_timeout, timeout))
+
+    async def _trace(self, event_name: str, info: dict):
+        # httpcore emits this event only when it opens a new connection
+        if event_name == "connection.connect_tcp.complete":
+            self._connections_opened += 1
+
+    @asynccontextmanager
+    async def host_slot(self, host: str, timeout: float) -> AsyncIterator[None]:
+        """
+        Waits (up to `timeout` seconds) for one of the host's `max_connections_per_host` slots.
+
+        Raises:
+            asyncio.TimeoutError: If no slot became free in time.
+        """
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_semaphores[host] = semaphore
+
+        self._waiting_for_host += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self._host_slot_timeouts += 1
+            raise
+        finally:
+            self._waiting_for_host -= 1
+
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    async def post(
+        self,
+        url: str,
+        host: str,
+        timeout: float,
+        max_response_bytes: int | None = None,
+        **kwargs,
+    ) -> tuple[httpx.Response, bytes]:
+        """
+        Sends a POST request through the pool, holding one of the host's slots while it is in flight.
+
+        `timeout` covers the whole call: waiting for a slot, then sending the request and reading the response in the
+        time left.
+
+        The response body is streamed, so a response larger than `max_response_bytes` is dropped as soon as the limit
+        is reached instead of being read into memory.
+
+        Returns:
+            tuple: The response (already closed) and its (decoded) body.
+
+        Raises:
+            asyncio.TimeoutError: If no slot became free in time, or the response wasn't read before the deadline.
+            ResponseTooLargeError: If the response body is larger than `max_response_bytes`.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        async with self.host_slot(host, timeout):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+
+            self._requests += 1
+            request = self.client.build_request(
+                "POST",
+                url,
+                timeout=self.get_timeout(remaining),
+                extensions={"trace": self._trace},
+                **kwargs,
+            )
+            # httpx's timeouts apply to each read, so the deadline of the whole exchange is enforced here
+            return await asyncio.wait_for(
+                self._send(request, max_response_bytes), remaining
+            )
+
+    async def _send(
+        self, request: httpx.Request, max_response_bytes: int | None
+    ) -> tuple[httpx.Response, bytes]:
+        response = await self.client.send(request, stream=True)
+        try:
+            return response, await self._read(response, max_response_bytes)
+        finally:
+            await response.aclose()
+
+    async def _read(
+        self, response: httpx.Response, max_response_bytes: int | None
+    ) -> bytes:
+        if max_response_bytes is None:
+            return await response.aread()
+
+        content_length = response.headers.get("content-length")
+        if content_length is not None and int(content_length) > max_response_bytes:
+            self._responses_too_large += 1
+            raise ResponseTooLargeError(int(content_length), max_response_bytes)
+
+        size = 0
+        parts = []
+        async for part in response.aiter_bytes():
+            size += len(part)
+            if size > max_response_bytes:
+                self._responses_too_large += 1
+                raise ResponseTooLargeError(size, max_response_bytes)
+            parts.append(part)
+        return b"".join(parts)
+
+    def record_bytes(self, byte_counts: ByteCounts):
+        self._byte_counts.add(byte_counts)
+
+    def _open_connections(self) -> int | None:
+        # httpx doesn't expose its connection pool publicly
+        pool = getattr(getattr(self.client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        return len(connections) if connections is not None else None
+
+    def stats(self) -> AxonPoolStats:
+        return AxonPoolStats(
+            requests=self._requests,
+            connections_opened=self._connections_opened,
+            reuse_ratio=(
+                max(0.0, 1 - self._connections_opened / self._requests)
+                if self._requests
+                else 0.0
+            ),
+            open_connections=self._open_connections(),
+            waiting_for_host=self._waiting_for_host,
+            host_slot_timeouts=self._host_slot_timeouts,
+            responses_too_large=self._responses_too_large,
+            byte_counts=self._byte_counts.model_copy(),
+            http2=self.http2,
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
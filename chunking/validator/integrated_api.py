@@ -1,6 +1,8 @@
+import os
 import time
 from typing import List, Optional
 from fastapi import Body, HTTPException
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 import bittensor as bt
 import traceback
@@ -10,6 +12,9 @@ from chunking.utils.integrated_api.chunk.chunk import (
     chunk_handler,
 )
 from chunking.utils.integrated_api.log import api_log
+from chunking.utils.metrics import CONTENT_TYPE, REGISTRY
+from chunking.utils.transport.pool import AxonPoolStats
+from chunking.validator.telemetry import MinerTelemetryInfo
 from chunking.validator.tournament import get_miner_groups
 
 
@@ -35,6 +40,13 @@ class GroupsResponse(BaseModel):
     )
 
 
+class ProfileResponse(BaseModel):
+    profiles: List[str] = Field(
+        ...,
+        description="File names of the captured round profiles in the validator's `profiles` directory, oldest first.",
+    )
+
+
 def setup_routes(self):
 
     @self.app.get("/rankings")
@@ -61,6 +73,37 @@ def setup_routes(self):
         api_log(f"By UID: {by_uid}")
         return GroupsResponse(groups=groups, by_uid=by_uid)
 
+    @self.app.get("/pool")
+    async def pool() -> AxonPoolStats:
+        return self.axon_pool.stats()
+
+    @self.app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+    @self.app.post("/profile")
+    async def profile() -> ProfileResponse:
+        self.round_profiler.request_next()
+        return ProfileResponse(
+            profiles=[os.path.basename(p) for p in self.round_profiler.profiles()]
+        )
+
+    @self.app.get("/profile")
+    async def profiles() -> ProfileResponse:
+        return ProfileResponse(
+            profiles=[os.path.basename(p) for p in self.round_profiler.profiles()]
+        )
+
+    @self.app.get("/telemetry")
+    async def telemetry() -> List[MinerTelemetryInfo]:
+        return self.telemetry.info()
+
+    @self.app.get("/telemetry/{uid}")
+    async def telemetry_uid(uid: int) -> MinerTelemetryInfo:
+        if uid < 0 or uid >= len(self.telemetry):
+            raise HTTPException(status_code=404, detail=f"Unknown uid {uid}")
+        return self.telemetry.info([uid])[0]
+
     @self.app.post("/chunk")
     async def chunk(request: ChunkRequest) -> ChunkResponse:
         try:
@@ -0,0 +1,254 @@
+import asyncio
+import time
+import traceback
+from contextlib import nullcontext
+
+import bittensor as bt
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from chunking.protocol import chunkSynapse
+from chunking.utils.integrated_api.chunk.types import ChunkRequestType, RewardOptions
+from chunking.utils.metrics import QUEUE_SIZE, ROUND_SECONDS
+from chunking.validator.task_api import Task
+from chunking.validator.tournament import (
+    query_miner_groups,
+    score_miner_group_responses,
+)
+from chunking.validator.types import EndTournamentRoundInfo
+
+# max time (seconds) the commit stage waits for a scored round before committing anyway (saving state, syncing)
+COMMIT_IDLE_TIMEOUT = 60
+# time (seconds) to wait before retrying after failing to get a task
+TASK_RETRY_SECONDS = 5
+
+
+class QueriedRound(BaseModel):
+    """
+    A tournament round whose miner group has been queried, waiting to be scored.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    task: Task
+    responses: list[chunkSynapse]
+    miner_group_uids: np.ndarray
+    miner_group_index: int | None
+    group_rank_values: np.ndarray
+    # unix times at which the query started and finished
+    started_at: float
+    queried_at: float
+    # whether the query was profiled, so the scoring of the round is profiled as well
+    profiled: bool = False
+
+
+async def task_producer(self, task_queue: asyncio.Queue[Task]):
+    """
+    Gets new (organic or synthetic) tasks and puts them in the task queue, blocking while the queue is full.
+    """
+    while not self.should_exit:
+        try:
+            task = await Task.get_new_task(validator=self)
+        except Exception as e:
+            bt.logging.error(f"Error getting new task: {e}")
+            bt.logging.error(traceback.format_exc())
+            await asyncio.sleep(TASK_RETRY_SECONDS)
+            continue
+
+        await task_queue.put(task)
+        bt.logging.debug(f"Queued task, task queue size: {task_queue.qsize()}")
+
+
+async def query_stage(
+    self,
+    task_queue: asyncio.Queue[Task],
+    query_queue: asyncio.Queue[QueriedRound],
+):
+    """
+    Queries a miner group (chosen from the current rankings) for each task and passes the responses on to be scored.
+    """
+    interval_seconds = self.config.neuron.synthetic_query_interval_seconds
+
+    while not self.should_exit:
+        task = await task_queue.get()
+        started_at = time.time()
+
+        try:
+            async with self.round_profiler.profile(
+                f"query-{task.task_type}-{task.task_id}"
+            ) as profile_path:
+                (
+                    group_responses,
+                    miner_group_indices,
+                    miner_uids_per_group,
+                    rank_values_per_group,
+                ) = await query_miner_groups(
+                    self, task.synapse, num_miner_groups_to_query=1
+                )
+        except Exception as e:
+            bt.logging.error(f"Error querying miner group: {e}")
+            bt.logging.error(traceback.format_exc())
+            continue
+
+        for responses, miner_group_index, miner_uids, rank_values in zip(
+            group_responses,
+            miner_group_indices,
+            miner_uids_per_group,
+            rank_values_per_group,
+        ):
+            await query_queue.put(
+                QueriedRound(
+                    task=task,
+                    responses=responses,
+                    miner_group_uids=np.array(miner_uids),
+                    miner_group_index=miner_group_index,
+                    group_rank_values=np.array(rank_values),
+                    started_at=started_at,
+                    queried_at=time.time(),
+                    profiled=profile_path is not None,
+                )
+            )
+
+        bt.logging.debug(f"Queued queried round, query queue size: {query_queue.qsize()}")
+
+        await asyncio.sleep(interval_seconds)
+
+
+async def scoring_stage(
+    self,
+    query_queue: asyncio.Queue[QueriedRound],
+    scored_queue: asyncio.Queue[EndTournamentRoundInfo],
+):
+    """
+    Scores and ranks the responses of queried rounds and passes the results on to be committed.
+    """
+    while not self.should_exit:
+        queried_round = await query_queue.get()
+
+        bt.logging.debug(
+            f"Scoring round for group {queried_round.miner_group_index}, waited {time.time() - queried_round.queried_at:.2f} seconds"
+        )
+
+        task = queried_round.task
+        profiler = (
+            self.round_profiler.profile(
+                f"score-{task.task_type}-{task.task_id}", force=True, count=False
+            )
+            if queried_round.profiled
+            else nullcontext()
+        )
+        async with profiler:
+            info = await score_miner_group_responses(
+                self,
+                task=task,
+                responses=queried_round.responses,
+                miner_group_uids=queried_round.miner_group_uids,
+                group_rank_values=queried_round.group_rank_values,
+                miner_group_index=queried_round.miner_group_index,
+                do_wandb_log=True,
+                request_type=ChunkRequestType.normal,
+                reward_options=RewardOptions(),
+            )
+        ROUND_SECONDS.observe(time.time() - queried_round.started_at)
+
+        if info is None:
+            continue
+
+        await scored_queue.put(info)
+
+
+async def commit_stage(self, scored_queue: asyncio.Queue[EndTournamentRoundInfo]):
+    """
+    The only stage that writes the tournament state: applies score updates (from scored rounds and from the integrated
+    API), saves the state and syncs with the chain (metagraph + weights) in a worker thread.
+
+    Waits at most `COMMIT_IDLE_TIMEOUT` seconds for a scored round, so the state is still saved and synced when no
+    rounds complete.
+    """
+    while not self.should_exit:
+        try:
+            info = await asyncio.wait_for(scored_queue.get(), COMMIT_IDLE_TIMEOUT)
+        except asyncio.TimeoutError:
+            info = None
+            bt.logging.warning(
+                f"No scored rounds in {COMMIT_IDLE_TIMEOUT} seconds, committing anyway"
+            )
+
+        if info is not None:
+            bt.logging.debug(
+                f"Committing score update for group {info.miner_group_index}, uids: {info.miner_group_uids}"
+            )
+            await self.update_scores(info)
+
+        # score updates queued by the integrated API
+        await self.process_score_updates()
+
+        await self.save_state()
+
+        bt.logging.debug(f"Axon pool stats: {self.axon_pool.stats()}")
+        bt.logging.success(f"step({self.step}) committed!")
+        self.step += 1
+
+        # chain calls run on the chain thread so querying and scoring continue meanwhile, and the state is not
+        # written concurrently as this stage is the only writer.
+        try:
+            await self.async_sync()
+        except Exception as e:
+            bt.logging.error(f"Error syncing with chain: {e}")
+            bt.logging.error(traceback.format_exc())
+
+
+async def run_pipeline(self):
+    """
+    Runs the validator's tournament as a pipeline of stages connected by bounded queues:
+
+    task producer -> query stage -> scoring stage -> commit stage
+
+    Each queue holds at most `--neuron.pipeline_queue_size` items, so a slow stage blocks the stages before it
+    (backpressure) instead of piling up work. `--neuron.num_concurrent_forwards` query and scoring workers run
+    concurrently, so a round can be queried while previous rounds are being scored and committed.
+
+    Returns when `should_exit` is set, or raises the first error of a stage.
+    """
+    queue_size = self.config.neuron.pipeline_queue_size
+    num_workers = self.config.neuron.num_concurrent_forwards
+
+    task_queue = asyncio.Queue[Task](queue_size)
+    query_queue = asyncio.Queue[QueriedRound](queue_size)
+    scored_queue = asyncio.Queue[EndTournamentRoundInfo](queue_size)
+
+    QUEUE_SIZE.set_function(task_queue.qsize, queue="pipeline_task")
+    QUEUE_SIZE.set_function(query_queue.qsize, queue="pipeline_query")
+    QUEUE_SIZE.set_function(scored_queue.qsize, queue="pipeline_scored")
+
+    bt.logging.info(
+        f"Starting validator pipeline with {num_workers} query/scoring workers and queue size {queue_size}"
+    )
+
+    tasks = [asyncio.create_task(commit_stage(self, scored_queue))]
+
+    if not self.config.no_forward:  # useful for debugging
+        tasks.append(asyncio.create_task(task_producer(self, task_queue)))
+        for _ in range(num_workers):
+            tasks.append(asyncio.create_task(query_stage(self, task_queue, query_queue)))
+            tasks.append(
+                asyncio.create_task(scoring_stage(self, query_queue, scored_queue))
+            )
+
+    async def wait_for_exit():
+        while not self.should_exit:
+            await asyncio.sleep(1)
+
+    exit_task = asyncio.create_task(wait_for_exit())
+
+    try:
+        done, _ = await asyncio.wait(
+            [*tasks, exit_task], return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in done:
+            if task is not exit_task and task.exception() is not None:
+                raise task.exception()
+    finally:
+        for task in [*tasks, exit_task]:
+            task.cancel()
+        await asyncio.gather(*tasks, exit_task, return_exceptions=True)
@@ -26,6 +26,11 @@ from typing import List, Tuple
 from openai import AsyncOpenAI, OpenAI
 from termcolor import colored
 from chunking.protocol import chunkSynapse
+from chunking.utils.metrics import (
+    EMBEDDING_REQUEST_SECONDS,
+    EMBEDDING_TOKENS,
+    REWARD_STAGE_SECONDS,
+)
 from random import sample
 from nltk.tokenize import sent_tokenize, wordpunct_tokenize
 import numpy as np
@@ -37,6 +42,9 @@ import bittensor as bt
 import regex as re
 import nltk
 
+# number of adjacent sentences of a chunk in each test segment
+SENTENCES_PER_SEGMENT = 3
+
 PUNCTUATION_REGEX = r'([.,!?"\'])'
 
 
@@ -54,7 +62,12 @@ def custom_word_tokenize(text: str) -> List[str]:
     return words_str.split()
 
 
-def check_chunk_words_in_document(chunk: str, document: str, verbose: bool = False):
+def check_chunk_words_in_document(
+    chunk: str,
+    document: str,
+    verbose: bool = False,
+    document_words: List[str] | None = None,
+):
     def _verbose(msg: str):
         if verbose:
             print(msg)
@@ -62,7 +75,9 @@ def check_chunk_words_in_document(chunk: str, document: str, verbose: bool = Fal
     start_time = time.time()
     chunk_words = custom_word_tokenize(chunk)
 
-    document_words = custom_word_tokenize(document)
+    # the document's words can be passed in when checking many chunks of the same document
+    if document_words is None:
+        document_words = custom_word_tokenize(document)
 
     chunk_words_str = " ".join(chunk_words).strip()
     document_words_str = " ".join(document_words).strip()
@@ -198,6 +213,108 @@ def apply_time_penalty(reward: float, time_penalty: float) -> float:
     return reward * time_penalty
 
 
+def run_checks(
+    document: str,
+    chunks: List[str],
+    chunk_size: int,
+    document_sentences: List[str] | None = None,
+    verbose: bool = False,
+) -> str | None:
+    """
+    Runs the validity checks of the reward function on the chunks (see `reward`).
+
+    Returns:
+    - str | None: Why the chunks failed the checks, or None if they passed.
+    """
+    if document_sentences is None:
+        document_sentences = sent_tokenize(document)
+
+    # check that every set of 3 adjacent words from the document appears in the chunks
+    if not check_document_words_in_chunks(document, chunks, chunk_size):
+        return "Every set of 3 adjacent words from the document does not appear in the chunks"
+
+    # check that each chunk ends on sentence boundary (determined by nltk.sent_tokenize)
+    if not check_chunks_end_on_sentence_boundaries(chunks, document_sentences):
+        return "Chunks do not end on sentence boundaries"
+
+    if not check_word_count(document, chunks):
+        return "Chunks do not contain the same number of words as the document"
+
+    # check that every word in chunk exists and is in the same order as the source document
+    document_words = custom_word_tokenize(document)
+    for i, chunk in enumerate(chunks):
+        if not check_chunk_words_in_document(chunk, document, verbose, document_words):
+            return f"Chunk {i} does not contain all words from the document"
+
+    return None
+
+
+def get_size_penalty(chunks: List[str], chunk_size: int) -> float:
+    """Penalty for chunks longer than `chunk_size` characters."""
+    size_penalty = 0
+    for chunk in chunks:
+        if len(chunk) > chunk_size:
+            size_penalty += ((len(chunk) / chunk_size) - 1) * 10
+    return size_penalty
+
+
+def get_qty_penalty(num_chunks: int, chunk_qty: int) -> float:
+    """Penalty for more than `chunk_qty` chunks."""
+    if num_chunks > chunk_qty:
+        return 10 * ((num_chunks / chunk_qty) - 1) * 10
+    return 0
+
+
+def apply_size_and_qty_penalties(
+    embedding_reward: float, size_penalty: float, qty_penalty: float
+) -> float:
+    return embedding_reward * (2 / 3) ** (size_penalty + qty_penalty)
+
+
+def group_segment_sentences(sentences: List[str]) -> List[List[str]]:
+    """Groups the sentences of a chunk into test segments of (up to) `SENTENCES_PER_SEGMENT` adjacent sentences."""
+    return [
+        sentences[j : j + SENTENCES_PER_SEGMENT]
+        for j in range(0, len(sentences), SENTENCES_PER_SEGMENT)
+    ]
+
+
+def make_test_segments(chunks: List[str]) -> List["smallChunk"]:
+    """Splits the chunks into the test segments the reward is computed from."""
+    segments = []
+    for i, chunk in enumerate(chunks):
+        for sentences in group_segment_sentences(sent_tokenize(chunk)):
+            segments.append(smallChunk(i, " ".join(sentences)))
+    return segments
+
+
+def get_similarities(
+    embeddings: np.ndarray, source_chunks: List[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The dot products of every pair of segment embeddings, split into pairs from the same chunk (intrachunk) and from
+    different chunks (interchunk). Pairs are ordered like `for i in range(n): for j in range(i + 1, n)`.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    if len(embeddings) == 0:
+        return np.empty(0), np.empty(0)
+    source_chunks = np.asarray(source_chunks)
+    rows, cols = np.triu_indices(len(embeddings), k=1)
+    similarities = (embeddings @ embeddings.T)[rows, cols]
+    same_chunk = source_chunks[rows] == source_chunks[cols]
+    return similarities[same_chunk], similarities[~same_chunk]
+
+
+def calculate_embedding_reward(
+    intrachunk_similarities: np.ndarray, interchunk_similarities: np.ndarray
+) -> float:
+    """Mean intrachunk similarity minus mean interchunk similarity."""
+    return float(
+        (np.mean(intrachunk_similarities) if len(intrachunk_similarities) > 0 else 0)
+        - (np.mean(interchunk_similarities) if len(interchunk_similarities) > 0 else 0)
+    )
+
+
 async def reward(
     document: str,
     chunk_size: int,
@@ -273,78 +390,32 @@ async def reward(
         f"Rewarding {len(chunks)} chunks, do_checks: {do_checks}, do_penalties: {do_penalties}"
     )
 
-    smallChunks = []
     size_penalty = 0
     qty_penalty = 0
 
     start_time = time.time()
 
-    document_sentences = sent_tokenize(document)
-
     if do_checks:
-        # check that every set of 3 adjacent words from the document appears in the chunks
-        if not check_document_words_in_chunks(document, chunks, chunk_size):
-            return _get_early_return_stuff(
-                f"Every set of 3 adjacent words from the document does not appear in the chunks"
-            )
-
-        _verbose(
-            f"Passed: Every set of 3 adjacent words from the document appears in the chunks"
-        )
-
-        # check that each chunk ends on sentence boundary (determined by nltk.sent_tokenize)
-        if not check_chunks_end_on_sentence_boundaries(chunks, document_sentences):
-            return _get_early_return_stuff(
-                f"Chunks do not end on sentence boundaries"
-            )
-
-        _verbose(
-            f"Passed: Chunks end on sentence boundaries"
+        failure = run_checks(
+            document, chunks, chunk_size, sent_tokenize(document), verbose
         )
+        if failure is not None:
+            return _get_early_return_stuff(failure)
 
-        if not check_word_count(document, chunks):
-            return _get_early_return_stuff(
-                f"Chunks do not contain the same number of words as the document"
-            )
-
-        _verbose(
-            f"Passed: Chunks contain the same number of words as the document"
-        )
-
-    for i in range(len(chunks)):
-        if do_checks:
-            # check that every word in chunk exists and is in the same order as the source document
-            if not check_chunk_words_in_document(chunks[i], document, verbose):
-                return _get_early_return_stuff(
-                    f"Chunk {i} does not contain all words from the document"
-                )
-
-        if do_penalties:
-            # add up size penalty to be applied later
-            chunk_length = len(chunks[i])
-            if chunk_length > chunk_size:
-                size_penalty += ((chunk_length / chunk_size) - 1) * 10
-                _verbose(
-                    f"Chunk {i} is too long: {chunk_length} characters, new size penalty: {size_penalty}"
-                )
-
-        # create test segments
-        sentences = sent_tokenize(chunks[i])
-        for j in range(0, len(sentences), 3):
-            text = " ".join(sentences[j : j + 3])
-            smallChunks.append(smallChunk(i, text))
-
-        _verbose(
-            f"Chunk {i} has {len(sentences)} sentences. Added {ceil(len(sentences) / 3)} test segments"
-        )
-
-    if do_checks:
-        _verbose(
-            f"Passed: Every word in chunk exists and is in the same order as the source document"
-        )
+        _verbose(f"Passed: all checks")
 
         end_time = time.time()
         print(f"Time to run checks: {end_time - start_time} seconds")
+        REWARD_STAGE_SECONDS.observe(end_time - start_time, stage="checks")
+
+    if do_penalties:
+        # add up size penalty to be applied later
+        size_penalty = get_size_penalty(chunks, chunk_size)
+        _verbose(f"Size penalty: {size_penalty}")
+
+    # create test segments
+    smallChunks = make_test_segments(chunks)
+    _verbose(f"{len(chunks)} chunks have {len(smallChunks)} test segments")
 
     testChunks: list[smallChunk]
 
@@ -366,47 +437,37 @@ async def reward(
     start_time = time.time()
 
     # calculate rewards using embeddings of test chunks
-    res = await client.embeddings.create(
-        input=[testChunk.text for testChunk in testChunks],
-        model="text-embedding-ada-002",
-    )
+    with EMBEDDING_REQUEST_SECONDS.time():
+        res = await client.embeddings.create(
+            input=[testChunk.text for testChunk in testChunks],
+            model="text-embedding-ada-002",
+        )
     data = res.data
     embeddings = [item.embedding for item in data]
 
     end_time = time.time()
     print(f"Time to get embeddings: {end_time - start_time} seconds")
+    EMBEDDING_TOKENS.inc(num_tokens)
+    REWARD_STAGE_SECONDS.observe(end_time - start_time, stage="embeddings")
 
     start_time = time.time()
 
-    intrachunk_similarities = []
-    interchunk_similarities = []
-
     # calculate intrachunk and interchunk similarities
-    for i in range(len(testChunks) - 1):
-        j = i + 1
-        while j < len(testChunks):
-            if testChunks[i].sourceChunk == testChunks[j].sourceChunk:
-                intrachunk_similarities.append(
-                    np.dot(np.asarray(embeddings[i]), np.asarray(embeddings[j]))
-                )
-            else:
-                interchunk_similarities.append(
-                    np.dot(np.asarray(embeddings[i]), np.asarray(embeddings[j]))
-                )
-            j += 1
+    intrachunk_similarities, interchunk_similarities = get_similarities(
+        np.array(embeddings), [testChunk.sourceChunk for testChunk in testChunks]
+    )
 
     # calculate the embedding reward
-    reward = (
-        np.mean(intrachunk_similarities) if len(intrachunk_similarities) > 0 else 0
-    ) - (np.mean(interchunk_similarities) if len(interchunk_similarities) > 0 else 0)
+    reward = calculate_embedding_reward(intrachunk_similarities, interchunk_similarities)
 
     end_time = time.time()
     print(f"Time to calculate embedding reward: {end_time - start_time} seconds")
+    REWARD_STAGE_SECONDS.observe(end_time - start_time, stage="similarity")
 
     # store extra info for wandb logging/printing
     extra_info_dict["embeddings"] = embeddings
-    extra_info_dict["intrachunk_similarities"] = intrachunk_similarities
-    extra_info_dict["interchunk_similarities"] = interchunk_similarities
+    extra_info_dict["intrachunk_similarities"] = intrachunk_similarities.tolist()
+    extra_info_dict["interchunk_similarities"] = interchunk_similarities.tolist()
     extra_info_dict["embedding_reward"] = reward
     extra_info_dict["num_embed_tokens"] = num_tokens
 
@@ -414,15 +475,10 @@ async def reward(
         # size penalty created earlier
 
         # create quantity penalty; penalize an excessive number of chunks
-        num_chunks = len(chunks)
-        if num_chunks > chunk_qty:
-            qty_penalty += 10 * ((num_chunks / chunk_qty) - 1) * 10
-            _verbose(
-                f"Too many chunks: {num_chunks} chunks, new quantity penalty: {qty_penalty}"
-            )
+        qty_penalty = get_qty_penalty(len(chunks), chunk_qty)
 
         # apply size and quantity penalties
-        reward *= (2 / 3) ** (size_penalty + qty_penalty)
+        reward = apply_size_and_qty_penalties(reward, size_penalty, qty_penalty)
 
     extra_info_dict["qty_penalty"] = qty_penalty
     extra_info_dict["size_penalty"] = size_penalty
@@ -643,10 +699,11 @@ def rank_responses_global(
 
     ranked_responses = ranked_responses.astype(int)
 
+    bt.logging.debug(f"ranked responses: {ranked_responses.tolist()}")
+
     # loop through the ranked responses and assign a global rank to each response
     for i, rank in enumerate(ranked_responses):
         if rank != -1:
-            bt.logging.debug(f"rank: {rank}, group_rank_values: {group_rank_values}")
             rank_value = group_rank_values[rank]
             ranked_responses_global[i] = rank_value
         elif not np.isinf(scores[miner_group_uids[i]]):
@@ -0,0 +1,212 @@
+import time
+
+import numpy as np
+from pydantic import BaseModel
+
+# weight of the newest latency in the moving average
+LATENCY_EWMA_ALPHA = 0.1
+# upper edges (seconds) of the latency histogram buckets, the last bucket is unbounded
+LATENCY_BUCKET_EDGES = np.geomspace(0.01, 300, 48)
+
+# arrays of a `MinerTelemetry`, as persisted in the validator state (prefixed with `telemetry_`)
+TELEMETRY_FIELDS = [
+    "queries",
+    "successes",
+    "timeouts",
+    "errors",
+    "over_soft_max",
+    "latency_ewma",
+    "latency_histogram",
+    "bytes_sent",
+    "bytes_received",
+    "last_status_code",
+    "last_query_at",
+]
+
+
+class MinerTelemetryInfo(BaseModel):
+    """
+    Latency and reliability telemetry of a single miner.
+    """
+
+    uid: int
+    queries: int
+    successes: int
+    # queries that timed out (status 408)
+    timeouts: int
+    # queries that failed otherwise (non-200 status)
+    errors: int
+    # successful responses that took longer than the synapse's `time_soft_max`
+    over_soft_max: int
+    # latencies (seconds) of successful responses, None if there were none
+    latency_ewma: float | None
+    latency_p50: float | None
+    latency_p95: float | None
+    bytes_sent: int
+    bytes_received: int
+    last_status_code: int | None
+    # unix time of the last query, None if never queried
+    last_query_at: float | None
+
+
+class MinerTelemetry:
+    """
+    Per-miner latency and reliability telemetry, stored in arrays indexed by uid.
+
+    Latency percentiles are estimated from a histogram with log-spaced buckets (`LATENCY_BUCKET_EDGES`), so the store
+    has a fixed size per uid no matter how many queries are recorded.
+    """
+
+    def __init__(self, n: int):
+        self.queries = np.zeros(n, dtype=np.int64)
+        self.successes = np.zeros(n, dtype=np.int64)
+        self.timeouts = np.zeros(n, dtype=np.int64)
+        self.errors = np.zeros(n, dtype=np.int64)
+        self.over_soft_max = np.zeros(n, dtype=np.int64)
+        self.latency_ewma = np.full(n, np.nan, dtype=np.float64)
+        self.latency_histogram = np.zeros(
+            (n, len(LATENCY_BUCKET_EDGES) + 1), dtype=np.int64
+        )
+        self.bytes_sent = np.zeros(n, dtype=np.int64)
+        self.bytes_received = np.zeros(n, dtype=np.int64)
+        self.last_status_code = np.zeros(n, dtype=np.int32)
+        self.last_query_at = np.zeros(n, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def record(
+        self,
+        uid: int,
+        status_code: int | None,
+        latency: float | None,
+        time_soft_max: float | None = None,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ):
+        """
+        Records the result of a query to a miner.
+
+        Args:
+            uid (int): The miner's uid.
+            status_code (int | None): The response status code (408 for timeouts).
+            latency (float | None): The time in seconds the query took, only recorded for successful responses.
+            time_soft_max (float | None): The synapse's `time_soft_max`, to count slow responses.
+            bytes_sent (int): The size of the request body sent.
+            bytes_received (int): The size of the response body received.
+        """
+        if uid >= len(self):
+            self.resize(uid + 1)
+
+        self.queries[uid] += 1
+        self.bytes_sent[uid] += bytes_sent
+        self.bytes_received[uid] += bytes_received
+        self.last_status_code[uid] = status_code or 0
+        self.last_query_at[uid] = time.time()
+
+        if status_code == 408:
+            self.timeouts[uid] += 1
+            return
+        if status_code != 200:
+            self.errors[uid] += 1
+            return
+
+        self.successes[uid] += 1
+        if latency is None:
+            return
+
+        if np.isnan(self.latency_ewma[uid]):
+            self.latency_ewma[uid] = latency
+        else:
+            self.latency_ewma[uid] += LATENCY_EWMA_ALPHA * (
+                latency - self.latency_ewma[uid]
+            )
+        self.latency_histogram[uid, np.searchsorted(LATENCY_BUCKET_EDGES, latency)] += 1
+
+        if time_soft_max is not None and latency > time_soft_max:
+            self.over_soft_max[uid] += 1
+
+    def latency_quantile(self, q: float) -> np.ndarray:
+        """
+        Estimates the `q` latency quantile of every miner from the histogram, as the upper edge of the bucket the
+        quantile falls in (the last bucket's lower edge for the unbounded bucket). NaN for miners without latencies.
+        """
+        counts = np.cumsum(self.latency_histogram, axis=1)
+        totals = counts[:, -1]
+        buckets = np.argmax(counts >= np.maximum(q * totals, 1)[:, None], axis=1)
+        edges = LATENCY_BUCKET_EDGES[
+            np.minimum(buckets, len(LATENCY_BUCKET_EDGES) - 1)
+        ]
+        return np.where(totals > 0, edges, np.nan)
+
+    def reset(self, uid: int):
+        """Resets the telemetry of a uid, e.g. when its hotkey was replaced."""
+        for name in TELEMETRY_FIELDS:
+            array = getattr(self, name)
+            array[uid] = np.nan if name == "latency_ewma" else 0
+
+    def resize(self, n: int):
+        """Grows the arrays to `n` uids (new uids start empty)."""
+        current_n = len(self)
+        if n <= current_n:
+            return
+        empty = MinerTelemetry(n)
+        for name in TELEMETRY_FIELDS:
+            array = getattr(empty, name)
+            array[:current_n] = getattr(self, name)
+            setattr(self, name, array)
+
+    def info(self, uids: list[int] | None = None) -> list[MinerTelemetryInfo]:
+        """Gets the telemetry of the given uids (all uids if None)."""
+        if uids is None:
+            uids = list(range(len(self)))
+
+        p50 = self.latency_quantile(0.5)
+        p95 = self.latency_quantile(0.95)
+
+        def optional(value: float) -> float | None:
+            return None if np.isnan(value) else float(value)
+
+        return [
+            MinerTelemetryInfo(
+                uid=uid,
+                queries=self.queries[uid],
+                successes=self.successes[uid],
+                timeouts=self.timeouts[uid],
+                errors=self.errors[uid],
+                over_soft_max=self.over_soft_max[uid],
+                latency_ewma=optional(self.latency_ewma[uid]),
+                latency_p50=optional(p50[uid]),
+                latency_p95=optional(p95[uid]),
+                bytes_sent=self.bytes_sent[uid],
+                bytes_received=self.bytes_received[uid],
+                last_status_code=self.last_status_code[uid] or None,
+                last_query_at=self.last_query_at[uid] or None,
+            )
+            for uid in uids
+        ]
+
+    def to_state(self) -> dict[str, np.ndarray]:
+        """Gets copies of the arrays, to persist with the validator state."""
+        return {name: getattr(self, name).copy() for name in TELEMETRY_FIELDS}
+
+    @classmethod
+    def from_state(cls, state, n: int) -> "MinerTelemetry":
+        """
+        Loads the telemetry from the validator state (see `save_tournament_state`), grown to `n` uids. Starts empty if
+        the state has no (or incompatible) telemetry.
+        """
+        telemetry = cls(n)
+        if not all(f"telemetry_{name}" in state for name in TELEMETRY_FIELDS):
+            return telemetry
+        if (
+            state["telemetry_latency_histogram"].shape[1]
+            != telemetry.latency_histogram.shape[1]
+        ):
+            return telemetry
+
+        saved_n = len(state["telemetry_queries"])
+        telemetry.resize(saved_n)
+        for name in TELEMETRY_FIELDS:
+            getattr(telemetry, name)[:saved_n] = state[f"telemetry_{name}"]
+        return telemetry
@@ -7,6 +7,7 @@ import multiprocessing
 import random
 import sys
 import threading
+import time
 import traceback
 import bittensor as bt
 import numpy as np
@@ -15,6 +16,7 @@ from random import choice
 from openai import AsyncOpenAI
 from chunking.utils.integrated_api.chunk.types import ChunkRequestType, RewardOptions
 from chunking.utils.log import PrefixStream
+from chunking.utils.metrics import ROUND_PHASE_SECONDS, ROUND_SECONDS, ROUNDS
 from chunking.utils.score import get_alpha
 from chunking.utils.tournament import make_wandb_data, pretty_print_rewards
 from chunking.validator.reward import get_rewards, rank_responses, rank_responses_global
@@ -58,7 +60,10 @@ def create_groups(
         ranks_in_group = range(start, start + step * 2)
         # bt.logging.debug(f"ranks_in_group: {ranks_in_group}")
         group_ranks.append(ranks_in_group)
-        miner_groups.append(np.array(rankings[ranks_in_group], dtype=int))
+        # slice instead of indexing with the range, which numpy would first convert to a list
+        miner_groups.append(
+            np.array(rankings[ranks_in_group.start : ranks_in_group.stop], dtype=int)
+        )
 
         # bt.logging.debug(
         #     f"start: {start}, step: {step}, added ranks: {group_ranks[-1]}, miners: {miner_groups[-1]}"
@@ -70,13 +75,13 @@ def create_groups(
     # if there are any miners left, add them to a group, handling edge case where no groups were created
     if start < len(rankings):
         if len(group_ranks) > 0:
-            group_ranks[-1] = range(list(group_ranks[-1])[0], len(rankings))
+            group_ranks[-1] = range(group_ranks[-1].start, len(rankings))
         else:
             group_ranks.append(range(0, len(rankings)))
         if len(miner_groups) > 0:
-            miner_groups[-1] = np.array(rankings[group_ranks[-1]], dtype=int)
+            miner_groups[-1] = np.array(rankings[group_ranks[-1].start :], dtype=int)
         else:
-            miner_groups.append(np.array(rankings[group_ranks[-1]], dtype=int))
+            miner_groups.append(np.array(rankings[group_ranks[-1].start :], dtype=int))
 
     # bt.logging.debug(f"group_ranks: {group_ranks}")
     # bt.logging.debug(f"miner_groups: {miner_groups}")
@@ -104,9 +109,7 @@ def create_groups(
             rank_start = (
                 last_group_overlap_rank_value + last_rank_of_second_most_recent_group
             ) / 2
-            rank_values_for_group = []
-            for i in range(group_size):
-                rank_values_for_group.append(rank_start + i)
+            rank_values_for_group = rank_start + np.arange(group_size)
 
         group_rank_values.append(np.array(rank_values_for_group, dtype=np.float64))
 
@@ -157,6 +160,7 @@ async def query_miner_group(
         axons=axons,
         synapse=input_synapse,
         timeout=input_synapse.timeout,
+        uids=[int(uid) for uid in miner_group_uids],
     )
 
     bt.logging.debug(
@@ -209,7 +213,8 @@ async def query_miner_groups(
             )
         )
 
-    group_responses = await asyncio.gather(*coros)
+    with ROUND_PHASE_SECONDS.time(phase="query"):
+        group_responses = await asyncio.gather(*coros)
 
     return (
         group_responses,
@@ -235,6 +240,7 @@ async def score_miner_group_responses(
     """
     Calculating rewards + ranking, making wandb data, making tournament round info for use in update_scores()
     """
+    start_time = time.time()
     try:
         input_synapse = task.synapse
 
@@ -286,7 +292,7 @@ async def score_miner_group_responses(
         rankings: np.ndarray[np.int32] = self.rankings
 
         wandb_data = make_wandb_data(
-            block_number=self.block,
+            block_number=self.last_known_block,
             miner_group_uids=miner_group_uids.astype(int).tolist(),
             miner_group_index=miner_group_index or -1,
             task=task,
@@ -318,13 +324,18 @@ async def score_miner_group_responses(
         )
 
         # bt.logging.debug(f"End tournament round info: {end_tournament_round_info}")
+        ROUNDS.inc(result="scored")
         return end_tournament_round_info
 
     except Exception as e:
         bt.logging.error(f"Error querying miner group: {e}")
         bt.logging.error(traceback.format_exc())
+        ROUNDS.inc(result="failed")
         return None
 
+    finally:
+        ROUND_PHASE_SECONDS.observe(time.time() - start_time, phase="score")
+
 
 async def run_tournament_round(
     self,
@@ -338,11 +349,42 @@ async def run_tournament_round(
     reward_options: RewardOptions = RewardOptions(),
     benchmark_id: str | None = None,
     doc_name: str | None = None,
+    profile: bool = False,
     # TODO: do not score responses if the task is not do_scoring
 ) -> list[EndTournamentRoundInfo | None]:
     """
     Run a tournament round for the validator's tournament.
+
+    Args:
+        profile (bool): Profiles this round regardless of `--profiling.every_n_rounds`.
     """
+    async with self.round_profiler.profile(
+        f"round-{task.task_type}-{task.task_id}", force=profile
+    ), ROUND_SECONDS.time():
+        return await _run_tournament_round(
+            self,
+            task=task,
+            do_wandb_log=do_wandb_log,
+            choose_miner_group_index=choose_miner_group_index,
+            custom_miner_uids=custom_miner_uids,
+            request_type=request_type,
+            reward_options=reward_options,
+            benchmark_id=benchmark_id,
+            doc_name=doc_name,
+        )
+
+
+async def _run_tournament_round(
+    self,
+    task: Task,
+    do_wandb_log: bool,
+    choose_miner_group_index: int | None,
+    custom_miner_uids: list[int] | None,
+    request_type: ChunkRequestType,
+    reward_options: RewardOptions,
+    benchmark_id: str | None,
+    doc_name: str | None,
+) -> list[EndTournamentRoundInfo | None]:
 
     (
         group_responses,
@@ -17,10 +17,11 @@
 # DEALINGS IN THE SOFTWARE.
 
 
+import functools
 import random
 import time
 import traceback
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Tuple
 
 import bittensor as bt
 from openai import AsyncOpenAI
@@ -28,15 +29,29 @@ from openai import AsyncOpenAI
 import chunking
 from chunking.base.miner import BaseMinerNeuron
 
-from nltk.tokenize import sent_tokenize, word_tokenize
+from nltk.tokenize import word_tokenize
 import json
 from sr25519 import sign
 from substrateinterface import Keypair
 
 
 from chunking.utils.ipfs.ipfs import get_from_ipfs, get_pinned_cids
+from chunking.utils.chunks import sentence_chunker
+from chunking.utils.executor import (
+    DeadlineExceeded,
+    ExecutorUnavailable,
+    Overloaded,
+)
+from chunking.utils.semantic_chunker import (
+    HashingEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    SemanticChunker,
+)
 from chunking.utils.maths import calc_cosine_similarity
 from chunking.utils.signature import verify_signature
+from chunking.utils.relay.embedding_cache import EmbeddingCache
+from chunking.utils.relay.embedding_index import RelayEmbeddingIndex
+from chunking.utils.relay.pin_cache import RelayPinCache
 from chunking.utils.relay.relay import (
     RelayPayload,
     get_recent_relay_pins,
@@ -63,6 +78,43 @@ class Miner(BaseMinerNeuron):
         ):
             self.aclient = AsyncOpenAI()
 
+        # recent relay pins for the duplicate checks, refreshed in the background on the axon's event loop
+        self.relay_pin_cache = None
+        if (
+            self.config.neuron.check_ipfs
+            and not self.config.neuron.no_check_duplicate_ipfs
+            and self.config.neuron.relay_pin_refresh_interval > 0
+        ):
+            self.relay_pin_cache = RelayPinCache(
+                refresh_interval=self.config.neuron.relay_pin_refresh_interval
+            )
+            self.axon.app.add_event_handler("startup", self.relay_pin_cache.start)
+            self.axon.app.add_event_handler("shutdown", self.relay_pin_cache.stop)
+
+        # embeddings of request documents by document hash, so repeated documents aren't embedded again
+        self.embedding_cache = None
+        if self.config.neuron.embedding_cache_mb > 0:
+            self.embedding_cache = EmbeddingCache(
+                max_bytes=int(self.config.neuron.embedding_cache_mb * 1024 * 1024)
+            )
+
+        # built-in semantic chunker (`--neuron.chunker semantic`), the greedy sentence chunker is used otherwise
+        self.semantic_chunker = None
+        if self.config.neuron.chunker == "semantic":
+            if self.config.neuron.chunk_executor == "process":
+                # the process pool runs the greedy chunker, see `chunk_fn`
+                raise ValueError(
+                    "--neuron.chunker semantic can't run in a process pool, use --neuron.chunk_executor thread"
+                )
+            provider = (
+                OpenAIEmbeddingProvider()
+                if self.config.neuron.embedding_provider == "openai"
+                else HashingEmbeddingProvider()
+            )
+            self.semantic_chunker = SemanticChunker(
+                provider, window=self.config.neuron.semantic_window
+            )
+
     def get_similarities(
         self,
         req_embeddings: list[list[float]],
@@ -83,25 +135,6 @@ class Miner(BaseMinerNeuron):
 
         return similarities
 
-    def check_fuzzy_duplicate(
-        self,
-        embed_threshold: float,
-        req_embeddings: list[list[float]],
-        pin_embeddings: list[list[float]],
-    ) -> bool:
-        similarities = self.get_similarities(req_embeddings, pin_embeddings)
-
-        bt.logging.debug(f"Similarities: {similarities}")
-
-        for similarity in similarities:
-            if similarity > embed_threshold:
-                bt.logging.info(
-                    f"Found fuzzy duplicate with similarity: {similarity}, threshold: {embed_threshold}, similarities: {similarities}"
-                )
-                return True
-
-        return False
-
     async def check_duplicate(
         self,
         req_document: str,
@@ -115,7 +148,11 @@ class Miner(BaseMinerNeuron):
 
         A fuzzy duplicate is defined as a document with a cosine similarity greater than the
         provided embedding threshold (`--neuron.relay_embed_threshold`). Similarities are calculated
-        pairwise for the embeddings of the incoming document and the existing document.
+        pairwise for the embeddings of the incoming document and the existing document, for all
+        recent documents at once with a `RelayEmbeddingIndex`.
+
+        Recent pins are looked up in the relay pin cache (refreshed every `--neuron.relay_pin_refresh_interval`
+        seconds) once it has been refreshed, or fetched from IPFS otherwise.
 
         Args:
             req_document (str): The incoming document to check for duplicates.
@@ -125,21 +162,43 @@ class Miner(BaseMinerNeuron):
             bool: True if a duplicate is found, False otherwise.
         """
 
-        recent_pins = await get_recent_relay_pins()
+        req_doc_hash = sha256_hash(req_document)
 
-        bt.logging.info(
-            f"Checking for fuzzy duplicate in {len(recent_pins)} recent pins"
-        )
+        # the cache is used once it has been refreshed, before that the pins are fetched for the request
+        use_cache = self.relay_pin_cache is not None and self.relay_pin_cache.ready
+
+        if use_cache:
+            pin_cid = self.relay_pin_cache.find_exact_duplicate(
+                req_doc_hash, exclude_cid=req_cid
+            )
+            if pin_cid is not None:
+                bt.logging.info(
+                    f"Found exact duplicate document with CID: {pin_cid}, hash: {req_doc_hash}"
+                )
+                return True
+
+            bt.logging.info(
+                f"Checking for fuzzy duplicate in {len(self.relay_pin_cache)} cached recent pins"
+            )
+        else:
+            recent_pins = await get_recent_relay_pins()
+
+            bt.logging.info(
+                f"Checking for fuzzy duplicate in {len(recent_pins)} recent pins"
+            )
 
         embed_threshold = self.config.neuron.relay_embed_threshold
         bt.logging.debug(
             f"Using embedding threshold: {embed_threshold} to check for fuzzy duplicates"
         )
 
-        req_doc_hash = sha256_hash(req_document)
-
         try:
-            req_embeddings = await make_embeddings(req_document, self.aclient)
+            if self.embedding_cache is not None:
+                req_embeddings = await self.embedding_cache.get_or_make(
+                    req_doc_hash, lambda: make_embeddings(req_document, self.aclient)
+                )
+            else:
+                req_embeddings = await make_embeddings(req_document, self.aclient)
             bt.logging.debug(f"Made embeddings for request document")
         except Exception as e:
             bt.logging.error(
@@ -162,29 +221,35 @@ class Miner(BaseMinerNeuron):
             f"Provided request document embeddings are valid, similarities: {similarities}"
         )
 
-        for pin in recent_pins:
-            if pin.cid == req_cid:
-                # Skip the incoming document itself.
-                continue
-
-            pin_doc_hash = pin.payload.message.document_hash
-
-            if req_doc_hash == pin_doc_hash:
-                bt.logging.info(
-                    f"Found exact duplicate document with CID: {pin.cid}, hash: {req_doc_hash}"
-                )
-                return True
+        if use_cache:
+            index = self.relay_pin_cache.index
+        else:
+            index = RelayEmbeddingIndex()
+            for pin in recent_pins:
+                if pin.cid == req_cid:
+                    # Skip the incoming document itself.
+                    continue
 
-            pin_embeddings = pin.payload.message.embeddings
+                pin_doc_hash = pin.payload.message.document_hash
 
-            is_fuzzy_duplicate = self.check_fuzzy_duplicate(
-                embed_threshold, req_embeddings, pin_embeddings
+                if req_doc_hash == pin_doc_hash:
+                    bt.logging.info(
+                        f"Found exact duplicate document with CID: {pin.cid}, hash: {req_doc_hash}"
+                    )
+                    return True
+
+                try:
+                    index.add(pin.cid, pin.payload.message.embeddings)
+                except ValueError as e:
+                    bt.logging.debug(f"Skipping pin {pin.cid}: {e}")
+
+        duplicate = index.query(req_embeddings, embed_threshold, exclude_id=req_cid)
+        if duplicate is not None:
+            pin_cid, similarity = duplicate
+            bt.logging.info(
+                f"Found fuzzy duplicate document with CID: {pin_cid}, hash: {req_doc_hash}, similarity: {similarity}, threshold: {embed_threshold}"
             )
-            if is_fuzzy_duplicate:
-                bt.logging.info(
-                    f"Found fuzzy duplicate document with CID: {pin.cid}, hash: {req_doc_hash}, threshold: {embed_threshold}"
-                )
-                return True
+            return True
 
         bt.logging.info(
             f"No fuzzy duplicate found for request document with hash: {req_doc_hash}"
@@ -292,23 +357,31 @@ class Miner(BaseMinerNeuron):
         - It does not factor in the maximum number of chunks.
         """
 
-        sentences = sent_tokenize(document)
-
-        chunks = []
-        while len(sentences) > 0:
-            chunks.append(sentences[0])
-            del sentences[0]
-            while len(sentences) > 0:
-                if len(chunks[-1] + " " + sentences[0]) > chunk_size:
-                    break
-                chunks[-1] += " " + sentences.pop(0)
+        chunks = sentence_chunker(document, chunk_size, max_num_chunks)
 
         bt.logging.debug(f"Created {len(chunks)} chunks")
 
         return chunks
 
+    def chunk_fn(self, deadline: float) -> Callable[[str, int, int], List[str]]:
+        """
+        The function the chunking executor runs for each request, which should be done by `deadline`
+        (`time.monotonic()` based, the request's `time_soft_max`).
+
+        With a thread pool (`--neuron.chunk_executor thread`, the default) this is `chunk_document`. A process pool
+        can't run methods of the miner (it isn't picklable), so it runs the default chunker: override this to return a
+        module-level function when using a custom chunker with a process pool.
+        """
+        if self.chunk_executor.kind == "process":
+            return sentence_chunker
+        return functools.partial(self.chunk_document, deadline=deadline)
+
     def chunk_document(
-        self, document: str, chunk_size: int, max_num_chunks: int
+        self,
+        document: str,
+        chunk_size: int,
+        max_num_chunks: int,
+        deadline: float | None = None,
     ) -> List[str]:
         """
         Entrypoint for chunking the document into chunks of the specified chunk size.
@@ -316,6 +389,11 @@ class Miner(BaseMinerNeuron):
         After making your custom implementation of a chunker, you can call it here.
         """
 
+        if self.semantic_chunker is not None:
+            return self.semantic_chunker.chunk(
+                document, chunk_size, max_num_chunks, deadline
+            )
+
         return self.default_chunker(document, chunk_size, max_num_chunks)
 
     async def forward(
@@ -332,6 +410,8 @@ class Miner(BaseMinerNeuron):
 
         """
 
+        start_time = time.monotonic()
+
         # default miner logic, see docs/miner_guide.md for help writing your own miner logic
         bt.logging.debug(
             "\n"
@@ -357,9 +437,27 @@ class Miner(BaseMinerNeuron):
                 )
                 traceback.print_exc()
 
-        chunks = self.chunk_document(
-            synapse.document, synapse.chunk_size, synapse.chunk_qty
-        )
+        # chunking is CPU bound, it runs in the chunking executor so the axon keeps serving other requests. requests
+        # are admitted by priority (stake), and dropped if they can't be done before the validator stops waiting.
+        try:
+            priority = await self.priority(synapse)
+        except Exception:
+            priority = 0.0
+        deadline = start_time + synapse.timeout - self.config.neuron.chunk_deadline_margin
+        try:
+            chunks = await self.chunk_executor.submit(
+                self.chunk_fn(start_time + synapse.time_soft_max),
+                synapse.document,
+                synapse.chunk_size,
+                synapse.chunk_qty,
+                priority=priority,
+                deadline=deadline,
+            )
+        except (Overloaded, DeadlineExceeded, ExecutorUnavailable) as e:
+            bt.logging.warning(
+                f"Dropping request from hotkey {synapse.dendrite.hotkey}: {e}"
+            )
+            return synapse
 
         synapse.chunks = chunks
 
@@ -409,16 +507,13 @@ class Miner(BaseMinerNeuron):
         - Consider blacklisting entities that are not validators or have insufficient stake.
 
         In practice it would be wise to blacklist requests from entities that are not validators, or do not have
-        enough stake. This can be checked via metagraph.S and metagraph.validator_permit. You can always attain
-        the uid of the sender via a metagraph.hotkeys.index( synapse.dendrite.hotkey ) call.
+        enough stake. This can be checked via metagraph.S and metagraph.validator_permit. The uid, stake and validator
+        permit of the sender are looked up in `self.hotkey_index`, rebuilt from the metagraph on each sync.
 
         Otherwise, allow the request to be processed further.
         """
-        uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
-        if (
-            not synapse.dendrite.hotkey
-            or not synapse.dendrite.hotkey in self.metagraph.hotkeys
-        ):
+        neuron = self.hotkey_index.get(synapse.dendrite.hotkey)
+        if neuron is None:
             if self.config.blacklist.allow_non_registered:
                 bt.logging.warning(
                     f"Accepting request from un-registered hotkey {synapse.dendrite.hotkey}"
@@ -431,7 +526,7 @@ class Miner(BaseMinerNeuron):
                 )
                 return True, "Unrecognized hotkey"
 
-        if not self.metagraph.validator_permit[uid]:
+        if not neuron.validator_permit:
             if self.config.blacklist.force_validator_permit:
                 # Ignore request from non-validator
                 bt.logging.warning(
@@ -444,7 +539,7 @@ class Miner(BaseMinerNeuron):
                 )
                 return False, "Validator permit not required"
 
-        stake = self.metagraph.S[uid].item()
+        stake = neuron.stake
 
         if stake < self.config.blacklist.minimum_stake:
             # Ignore request from entity with insufficient stake.
@@ -478,12 +573,9 @@ class Miner(BaseMinerNeuron):
         Example priority logic:
         - A higher stake results in a higher priority value.
         """
-        caller_uid = self.metagraph.hotkeys.index(
-            synapse.dendrite.hotkey
-        )  # Get the caller index.
-        priority = float(
-            self.metagraph.S[caller_uid]
-        )  # Return the stake as the priority.
+        neuron = self.hotkey_index.get(synapse.dendrite.hotkey)
+        # Return the stake as the priority, un-registered callers (if allowed) come last.
+        priority = neuron.stake if neuron is not None else 0.0
         bt.logging.debug(
             f"Prioritizing {synapse.dendrite.hotkey} with value: ", priority
         )
@@ -503,6 +595,15 @@ class Miner(BaseMinerNeuron):
 
         # Build the keypair from the dendrite_hotkey
         if synapse.dendrite is not None:
+            # reject un-registered hotkeys before the (more expensive) signature check
+            if (
+                not self.config.blacklist.allow_non_registered
+                and synapse.dendrite.hotkey not in self.hotkey_index
+            ):
+                raise Exception(
+                    f"Unrecognized hotkey {synapse.dendrite.hotkey}, not registered in the metagraph"
+                )
+
             keypair = Keypair(ss58_address=synapse.dendrite.hotkey)
 
             # Build the signature messages.
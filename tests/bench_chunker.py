@@ -0,0 +1,63 @@
+"""
+Benchmarks the default miner chunker (`iter_chunks`) against the original quadratic implementation on large documents.
+
+Documents are built from generated sentences, so the benchmark times the chunking itself (sentence tokenization is
+the same for both implementations).
+
+Usage: python -m tests.bench_chunker --doc_mb 1 --chunk_sizes 2000 3000 4000
+"""
+
+import argparse
+import random
+import time
+
+from chunking.utils.chunks import iter_chunks
+from tests.test_iter_chunks import random_sentences, reference_chunker
+
+argparser = argparse.ArgumentParser()
+
+argparser.add_argument("--doc_mb", type=float, default=1.0)
+argparser.add_argument("--chunk_sizes", nargs="+", type=int, default=[2000, 3000, 4000])
+argparser.add_argument("--repeats", "-r", type=int, default=3)
+argparser.add_argument("--seed", type=int, default=0)
+
+
+def best_time(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def main():
+    args = argparser.parse_args()
+    rng = random.Random(args.seed)
+
+    target_size = int(args.doc_mb * 1024 * 1024)
+    sentences = []
+    size = 0
+    while size < target_size:
+        batch = random_sentences(rng, 1000)
+        sentences.extend(batch)
+        size += sum(len(sentence) + 1 for sentence in batch)
+
+    print(f"document: {size / 1024 / 1024:.2f} MB, {len(sentences)} sentences")
+    for chunk_size in args.chunk_sizes:
+        chunks = list(iter_chunks(sentences, chunk_size))
+        assert chunks == reference_chunker(sentences, chunk_size)
+
+        reference_time = best_time(
+            lambda: reference_chunker(sentences, chunk_size), args.repeats
+        )
+        linear_time = best_time(
+            lambda: list(iter_chunks(sentences, chunk_size)), args.repeats
+        )
+        print(
+            f"chunk_size {chunk_size}: {len(chunks)} chunks, reference {reference_time * 1000:.1f}ms, iter_chunks {linear_time * 1000:.1f}ms ({reference_time / linear_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
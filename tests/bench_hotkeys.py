@@ -0,0 +1,58 @@
+"""
+Benchmarks hotkey lookups of the miner's `blacklist`/`priority`: the `HotkeyIndex` table against scanning
+`metagraph.hotkeys`, for registered and unknown hotkeys.
+
+Usage: python -m tests.bench_hotkeys --neurons 4096
+"""
+
+import argparse
+import random
+import time
+
+from chunking.utils.hotkeys import HotkeyIndex
+from tests.test_hotkey_index import make_metagraph
+
+argparser = argparse.ArgumentParser()
+
+argparser.add_argument("--neurons", type=int, default=4096)
+argparser.add_argument("--lookups", type=int, default=10000)
+argparser.add_argument("--seed", type=int, default=0)
+
+
+def scan_lookup(metagraph, hotkey: str):
+    # what `blacklist` did: a membership check and `index`, both linear scans
+    if hotkey not in metagraph.hotkeys:
+        return None
+    uid = metagraph.hotkeys.index(hotkey)
+    return uid, float(metagraph.S[uid]), bool(metagraph.validator_permit[uid])
+
+
+def per_lookup_us(fn, hotkeys) -> float:
+    start_time = time.perf_counter()
+    for hotkey in hotkeys:
+        fn(hotkey)
+    return (time.perf_counter() - start_time) / len(hotkeys) * 1e6
+
+
+def main():
+    args = argparser.parse_args()
+    rng = random.Random(args.seed)
+    metagraph = make_metagraph(args.neurons, args.seed)
+
+    start_time = time.perf_counter()
+    index = HotkeyIndex(metagraph)
+    rebuild_ms = (time.perf_counter() - start_time) * 1000
+    print(f"{args.neurons} neurons, rebuild {rebuild_ms:.2f}ms")
+
+    registered = [rng.choice(metagraph.hotkeys) for _ in range(args.lookups)]
+    unknown = [f"unknown-{i}" for i in range(args.lookups)]
+    for name, hotkeys in [("registered", registered), ("unknown", unknown)]:
+        scan = per_lookup_us(lambda hotkey: scan_lookup(metagraph, hotkey), hotkeys)
+        table = per_lookup_us(index.get, hotkeys)
+        print(
+            f"{name} hotkeys: scan {scan:.2f}us, index {table:.3f}us per lookup ({scan / table:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
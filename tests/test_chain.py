@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+import pytest
+
+from chunking.base.chain import ChainClient
+
+
+class FakeSubtensor:
+    def __init__(self):
+        self.block = 100
+        self.calls = 0
+
+    def get_current_block(self):
+        self.calls += 1
+        return self.block
+
+
+def test_chain_calls_run_on_one_thread():
+    chain = ChainClient()
+    threads = set()
+
+    def record_thread():
+        threads.add(threading.get_ident())
+        # nested calls from the chain thread run directly instead of deadlocking
+        return chain.call("nested", threading.get_ident)
+
+    async def main():
+        results = await asyncio.gather(
+            *[chain.run("record_thread", record_thread) for _ in range(5)]
+        )
+        assert set(results) == threads
+
+    asyncio.run(main())
+    chain.call("record_thread", record_thread)
+
+    assert len(threads) == 1
+    assert threading.get_ident() not in threads
+    assert chain.stats["record_thread"].count == 6
+    assert chain.stats["nested"].count == 6
+    assert "record_thread: 6 calls (0 errors)" in chain.summary()
+    chain.shutdown()
+
+
+def test_chain_block_cache():
+    chain = ChainClient(block_ttl=60)
+    subtensor = FakeSubtensor()
+
+    assert chain.cached_block is None
+    assert chain.get_block(subtensor) == 100
+
+    subtensor.block = 101
+    assert chain.get_block(subtensor) == 100
+    assert asyncio.run(chain.get_block_async(subtensor)) == 100
+    assert subtensor.calls == 1
+
+    chain.block_ttl = 0
+    assert asyncio.run(chain.get_block_async(subtensor)) == 101
+    assert chain.cached_block == 101
+    assert chain.stats["get_current_block"].count == 2
+    chain.shutdown()
+
+
+def test_chain_call_errors_are_recorded():
+    chain = ChainClient()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        chain.call("fail", fail)
+
+    assert chain.stats["fail"].errors == 1
+    chain.shutdown()
@@ -0,0 +1,88 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from chunking.utils.relay.embedding_cache import EmbeddingCache
+
+
+def test_lru_eviction_by_bytes():
+    # 4 float32 values per entry = 16 bytes
+    cache = EmbeddingCache(max_bytes=40)
+    cache.put("a", [[1, 2, 3, 4]])
+    cache.put("b", [[1, 2, 3, 4]])
+    assert cache.size == 32
+
+    # "a" was used last, so "b" is evicted
+    assert cache.get("a") is not None
+    cache.put("c", [[1, 2, 3, 4]])
+    assert "a" in cache and "b" not in cache and "c" in cache
+    assert cache.size == 32
+
+    # replacing an entry doesn't count it twice
+    cache.put("c", [[5, 6, 7, 8]])
+    assert cache.size == 32 and cache.get("c")[0, 0] == 5
+
+    # too large to cache at all
+    cache.put("big", np.zeros((10, 4)))
+    assert "big" not in cache and len(cache) == 2
+
+
+def test_get_or_make_makes_once():
+    async def main():
+        cache = EmbeddingCache()
+        calls = 0
+
+        async def make():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return [[1.0, 0.0]]
+
+        # concurrent requests for the same document share one call
+        results = await asyncio.gather(*(cache.get_or_make("doc", make) for _ in range(5)))
+        assert calls == 1
+        assert all(np.array_equal(result, [[1.0, 0.0]]) for result in results)
+
+        await cache.get_or_make("doc", make)
+        assert calls == 1
+        assert cache.misses == 1 and cache.hits == 5
+
+    asyncio.run(main())
+
+
+def test_get_or_make_failures_are_not_cached():
+    async def main():
+        cache = EmbeddingCache()
+
+        async def fail():
+            raise RuntimeError("rate limited")
+
+        async def empty():
+            return []
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_make("doc", fail)
+        assert len(await cache.get_or_make("doc", empty)) == 0
+        assert "doc" not in cache
+
+    asyncio.run(main())
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    async def main():
+        cache = EmbeddingCache()
+
+        async def make():
+            await asyncio.sleep(0.02)
+            return [[1.0]]
+
+        first = asyncio.create_task(cache.get_or_make("doc", make))
+        second = asyncio.create_task(cache.get_or_make("doc", make))
+        await asyncio.sleep(0.005)
+        first.cancel()
+
+        assert np.array_equal(await second, [[1.0]])
+        assert "doc" in cache
+
+    asyncio.run(main())
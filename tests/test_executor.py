@@ -0,0 +1,136 @@
+import asyncio
+import math
+import os
+import threading
+import time
+
+import pytest
+
+from chunking.utils.executor import (
+    DeadlineExceeded,
+    ExecutorUnavailable,
+    Overloaded,
+    PriorityExecutor,
+)
+
+
+def test_priority_executor_orders_and_sheds_requests():
+    async def main():
+        executor = PriorityExecutor(kind="thread", max_workers=1, max_queue=2)
+        release = threading.Event()
+        order = []
+
+        def work(name: str):
+            if name == "blocker":
+                release.wait()
+            order.append(name)
+            return name
+
+        deadline = time.monotonic() + 5
+        blocker = asyncio.create_task(executor.submit(work, "blocker", deadline=deadline))
+        await asyncio.sleep(0.05)
+
+        low = asyncio.create_task(executor.submit(work, "low", priority=1, deadline=deadline))
+        mid = asyncio.create_task(executor.submit(work, "mid", priority=5, deadline=deadline))
+        await asyncio.sleep(0)
+        # the queue is full: a higher priority request sheds the lowest one, a lower priority one is rejected
+        high = asyncio.create_task(executor.submit(work, "high", priority=10, deadline=deadline))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await executor.submit(work, "lowest", priority=0, deadline=deadline)
+
+        release.set()
+        assert await blocker == "blocker"
+        assert await high == "high" and await mid == "mid"
+        with pytest.raises(Overloaded):
+            await low
+
+        assert order == ["blocker", "high", "mid"]
+        assert (executor.completed, executor.shed) == (3, 2)
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_priority_executor_drops_late_requests():
+    async def main():
+        executor = PriorityExecutor(kind="thread", max_workers=1, max_queue=4)
+        ran = []
+
+        def work(seconds: float, name: str):
+            time.sleep(seconds)
+            ran.append(name)
+
+        slow = asyncio.create_task(
+            executor.submit(work, 0.3, "slow", deadline=time.monotonic() + 5)
+        )
+        await asyncio.sleep(0.01)
+        # waits behind the slow request past its deadline, so it never runs
+        with pytest.raises(DeadlineExceeded):
+            await executor.submit(work, 0, "late", deadline=time.monotonic() + 0.1)
+        with pytest.raises(DeadlineExceeded):
+            await executor.submit(work, 0, "expired", deadline=time.monotonic() - 1)
+
+        await slow
+        await executor.submit(work, 0, "next", deadline=time.monotonic() + 5)
+        assert ran == ["slow", "next"]
+        assert executor.expired == 2 and executor.queued == 0
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_priority_executor_process_pool():
+    async def main():
+        executor = PriorityExecutor(kind="process", max_workers=2)
+        results = await asyncio.gather(
+            *(
+                executor.submit(math.factorial, n, deadline=time.monotonic() + 30)
+                for n in range(5)
+            )
+        )
+        executor.shutdown()
+        return results
+
+    assert asyncio.run(main()) == [1, 1, 2, 6, 24]
+
+
+def crash():
+    os._exit(1)
+
+
+def test_priority_executor_restarts_a_broken_pool():
+    async def main():
+        executor = PriorityExecutor(kind="process", max_workers=1)
+        with pytest.raises(ExecutorUnavailable):
+            await executor.submit(crash, deadline=time.monotonic() + 30)
+        # the next request runs in a new pool
+        result = await executor.submit(math.factorial, 5, deadline=time.monotonic() + 30)
+        executor.shutdown()
+        return result, executor.restarts
+
+    assert asyncio.run(main()) == (120, 1)
+
+
+def test_priority_executor_fails_waiting_requests_on_shutdown():
+    async def main():
+        executor = PriorityExecutor(kind="thread", max_workers=1)
+        release = threading.Event()
+        deadline = time.monotonic() + 5
+
+        running = asyncio.create_task(executor.submit(release.wait, deadline=deadline))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.create_task(executor.submit(time.sleep, 0, deadline=deadline))
+        await asyncio.sleep(0)
+
+        # from another thread, like the miner's main thread
+        await asyncio.to_thread(executor.shutdown)
+        release.set()
+        assert await running is True
+        # failed right away, not at its deadline
+        with pytest.raises(ExecutorUnavailable):
+            await asyncio.wait_for(waiting, 1)
+        with pytest.raises(ExecutorUnavailable):
+            await executor.submit(time.sleep, 0, deadline=deadline)
+
+    asyncio.run(main())
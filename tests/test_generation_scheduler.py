@@ -0,0 +1,260 @@
+import asyncio
+from types import SimpleNamespace
+
+from chunking.utils.synthetic.scheduler import (
+    GenerationJob,
+    GenerationScheduler,
+    RateLimiter,
+    TokenBucket,
+)
+
+
+class FakeCompletions:
+    def __init__(self, fail_on: set[str] = set()):
+        self.calls: list[str] = []
+        self.fail_on = fail_on
+
+    async def create(self, model, temperature, messages):
+        # the article names / previous section identify the document being generated
+        prompt = messages[-1]["content"]
+        document = next(name for name in ["A", "B", "C"] if f"doc-{name}" in prompt)
+        self.calls.append(document)
+        await asyncio.sleep(0.01)
+        if document in self.fail_on and "Continue the article" in prompt:
+            raise RuntimeError("rate limited")
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"section of  doc-{document}"))],
+            usage=SimpleNamespace(total_tokens=100),
+        )
+
+
+def make_scheduler(tmp_path, completions, documents, jobs):
+    async def on_document(document: str, pageid: int):
+        documents.append(document)
+
+    async def get_sources(pageids):
+        name = f"doc-{'ABC'[pageids[0]]}"
+        return [name] * 3, [name] * 3
+
+    return GenerationScheduler(
+        SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        str(tmp_path),
+        new_job=lambda: jobs.pop(0) if jobs else GenerationJob(gen_type="new", pageids=[2], num_sections=10**6),
+        on_document=on_document,
+        get_sources=get_sources,
+        concurrency=2,
+        max_active=3,
+        step_timeout=5,
+        max_step_failures=2,
+    )
+
+
+async def run_until(scheduler: GenerationScheduler, condition):
+    task = asyncio.create_task(scheduler.run())
+    while not condition():
+        await asyncio.sleep(0.01)
+    task.cancel()
+
+
+def test_scheduler_interleaves_documents(tmp_path):
+    completions = FakeCompletions()
+    documents = []
+    jobs = [
+        GenerationJob(gen_type=gen_type, pageids=[i], num_sections=3)
+        for i, gen_type in enumerate(["new", "old", "new"])
+    ]
+    scheduler = make_scheduler(tmp_path, completions, documents, jobs)
+
+    asyncio.run(run_until(scheduler, lambda: len(documents) == 3))
+
+    assert sorted(documents) == [
+        " ".join([f"section of doc-{name}"] * 3) for name in ["A", "B", "C"]
+    ]
+    # sections of different documents are generated in between each other
+    assert completions.calls[:3] == ["A", "B", "C"]
+    # the reported usage is counted (filler jobs may have generated sections too)
+    assert scheduler.tokens_used >= 9 * 100
+    assert scheduler.documents_completed == 3
+
+
+def test_scheduler_checkpoints_and_emits_partial_documents(tmp_path):
+    # the continuation of document B keeps failing: it's emitted with the section generated so far
+    completions = FakeCompletions(fail_on={"B"})
+    documents = []
+    jobs = [GenerationJob(gen_type="new", pageids=[1], num_sections=3)]
+    scheduler = make_scheduler(tmp_path, completions, documents, jobs)
+
+    asyncio.run(run_until(scheduler, lambda: len(documents) == 1))
+    assert documents == ["section of doc-B"]
+    assert scheduler.documents_partial == 1
+
+    # the endless filler jobs were checkpointed and are resumed, without fetching their sources again
+    checkpoints = scheduler.load_checkpoints()
+    assert len(checkpoints) >= 1
+    assert all(len(job.sections) > 0 and job.source_articles == [] for job in checkpoints)
+
+    completions = FakeCompletions()
+    resumed = make_scheduler(tmp_path, completions, [], [])
+    asyncio.run(run_until(resumed, lambda: resumed.sections_generated >= 1))
+    assert len(resumed.load_checkpoints()) >= 1
+
+
+def test_rate_limiter():
+    bucket = TokenBucket(60)
+    bucket.take(60)
+    assert 0.9 < bucket.delay(1) <= 1
+    # larger than the bucket: waits for a full bucket
+    assert 59 < bucket.delay(1000) <= 60
+    assert TokenBucket(0).delay(10**9) == 0
+
+    async def main():
+        limiter = RateLimiter(rpm=0, tpm=600)
+        await limiter.acquire(590)
+        # the actual usage was lower than estimated, the difference is returned to the budget
+        limiter.settle(590, 100)
+        await asyncio.wait_for(limiter.acquire(500), timeout=1)
+
+    asyncio.run(main())
+
+
+class FakeStream:
+    def __init__(self, pieces: list[str]):
+        self.pieces = pieces
+        self.closed = False
+        self.consumed = 0
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for piece in self.pieces:
+            self.consumed += 1
+            await asyncio.sleep(0)
+            yield SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))], usage=None
+            )
+        yield SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=50))
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeStreamingCompletions:
+    def __init__(self):
+        self.streams: list[FakeStream] = []
+
+    async def create(self, model, temperature, messages, stream, stream_options):
+        self.streams.append(FakeStream(["One sentence", ". Two", " sentences. Three"] * 10))
+        return self.streams[-1]
+
+
+def test_streamed_documents_are_handed_off_early(monkeypatch):
+    import chunking.utils.synthetic.synthetic as synthetic
+
+    completions = FakeStreamingCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    validator = SimpleNamespace(wiki_cache=None, aclient=client)
+
+    async def get_wiki_content_for_page(pageid, cache=None):
+        return "content", f"page {pageid}"
+
+    monkeypatch.setattr(synthetic, "get_wiki_content_for_page", get_wiki_content_for_page)
+
+    async def main():
+        return await synthetic.generate_doc_with_llm(
+            validator, pageids=[1, 2, 3], handoff=lambda length: length > 100
+        )
+
+    document, article_names = asyncio.run(main())
+    assert article_names == ["page 1", "page 2", "page 3"]
+    # handed off during the first section, truncated to the last complete sentence
+    assert len(completions.streams) == 1 and completions.streams[0].closed
+    assert completions.streams[0].consumed < 30
+    assert document.endswith(".") and 80 < len(document) <= 110
+
+
+def test_scheduler_hands_off_streamed_documents(tmp_path):
+    completions = FakeStreamingCompletions()
+    documents = []
+    jobs = [GenerationJob(gen_type="new", pageids=[0], num_sections=5)]
+    scheduler = make_scheduler(tmp_path, completions, documents, jobs)
+    scheduler.stream = True
+    # hand off the first document as soon as it's long enough, later ones are generated fully
+    scheduler.handoff = lambda length: length > 200 and not documents
+
+    asyncio.run(run_until(scheduler, lambda: len(documents) >= 1))
+
+    # both workers may be streaming a document when the first one is handed off
+    assert scheduler.documents_handed_off >= 1
+    assert all(document.endswith(".") and len(document) <= 220 for document in documents)
+    assert all(stream.closed for stream in completions.streams)
+
+
+def test_waiting_for_budget_does_not_time_out_sections(tmp_path):
+    class SlowLimiter:
+        async def acquire(self, tokens: int):
+            # longer than the step timeout
+            await asyncio.sleep(0.1)
+
+        def settle(self, estimated_tokens: int, actual_tokens: int):
+            pass
+
+    completions = FakeCompletions()
+    documents = []
+    jobs = [GenerationJob(gen_type="new", pageids=[0], num_sections=2)]
+    scheduler = make_scheduler(tmp_path, completions, documents, jobs)
+    scheduler.step_timeout = 0.05
+    scheduler.limiter = SlowLimiter()
+
+    asyncio.run(run_until(scheduler, lambda: len(documents) == 1))
+
+    assert documents == [" ".join(["section of doc-A"] * 2)]
+    assert scheduler.documents_partial == 0
+
+
+def test_finished_documents_survive_a_restart_while_waiting_for_the_pool(tmp_path):
+    async def main():
+        blocked = asyncio.Event()
+
+        async def full_pool(document: str, pageid: int):
+            blocked.set()
+            await asyncio.Event().wait()
+
+        jobs = [GenerationJob(gen_type="new", pageids=[0], num_sections=1)]
+        scheduler = make_scheduler(tmp_path, FakeCompletions(), [], jobs)
+        scheduler.concurrency = 1
+        scheduler.max_active = 1
+        scheduler.on_document = full_pool
+        task = asyncio.create_task(scheduler.run())
+        await blocked.wait()
+        # no new job is started before the finished one is handed to the pool
+        assert scheduler.active == 1
+        task.cancel()
+
+        documents = []
+        resumed = make_scheduler(tmp_path, FakeCompletions(), documents, [])
+        await run_until(resumed, lambda: len(documents) >= 1)
+        return documents
+
+    assert asyncio.run(main())[0] == "section of doc-A"
+
+
+def test_scheduler_survives_a_failing_on_document(tmp_path):
+    documents = []
+    jobs = [GenerationJob(gen_type="new", pageids=[0], num_sections=1)]
+    scheduler = make_scheduler(tmp_path, FakeCompletions(), documents, jobs)
+    failures = []
+
+    async def on_document(document: str, pageid: int):
+        if not failures:
+            failures.append(document)
+            raise OSError("No space left on device")
+        documents.append(document)
+
+    scheduler.on_document = on_document
+
+    asyncio.run(run_until(scheduler, lambda: len(documents) >= 1))
+
+    # the failed document is emitted again, and counted once
+    assert failures == ["section of doc-A"] and documents[0] == "section of doc-A"
+    assert scheduler.documents_completed == 1
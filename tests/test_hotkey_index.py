@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from chunking.utils.hotkeys import HotkeyIndex, NeuronInfo
+
+
+def make_metagraph(n: int, seed: int = 0) -> SimpleNamespace:
+    rng = np.random.default_rng(seed)
+    return SimpleNamespace(
+        hotkeys=[f"hotkey-{uid}" for uid in range(n)],
+        S=rng.uniform(0, 1000, size=n).astype(np.float32),
+        validator_permit=rng.random(n) < 0.25,
+    )
+
+
+def test_lookup_matches_metagraph():
+    metagraph = make_metagraph(256)
+    index = HotkeyIndex(metagraph)
+    assert len(index) == 256
+
+    for hotkey in metagraph.hotkeys:
+        uid = metagraph.hotkeys.index(hotkey)
+        neuron = index.get(hotkey)
+        assert neuron == NeuronInfo(
+            uid, float(metagraph.S[uid]), bool(metagraph.validator_permit[uid])
+        )
+        assert hotkey in index
+
+    assert index.get("unknown") is None and "unknown" not in index
+    assert index.get(None) is None and None not in index
+
+
+def test_rebuild_after_sync():
+    metagraph = make_metagraph(8)
+    index = HotkeyIndex(metagraph)
+
+    # uid 3 is deregistered and taken by a new hotkey
+    metagraph.hotkeys[3] = "new-hotkey"
+    metagraph.S[3] = 5.0
+    assert index.get("hotkey-3").uid == 3
+
+    index.rebuild(metagraph)
+    assert index.get("hotkey-3") is None
+    assert index.get("new-hotkey") == NeuronInfo(
+        3, 5.0, bool(metagraph.validator_permit[3])
+    )
+
+
+def test_duplicate_hotkey_takes_first_uid():
+    metagraph = SimpleNamespace(
+        hotkeys=["a", "b", "a"], S=[1.0, 2.0, 3.0], validator_permit=[True, False, False]
+    )
+    assert HotkeyIndex(metagraph).get("a") == NeuronInfo(0, 1.0, True)
@@ -0,0 +1,43 @@
+import random
+
+from chunking.utils.chunks import iter_chunks
+
+
+def reference_chunker(sentences: list[str], chunk_size: int) -> list[str]:
+    # the original (quadratic) default miner chunker, after sentence tokenization
+    sentences = list(sentences)
+    chunks = []
+    while len(sentences) > 0:
+        chunks.append(sentences[0])
+        del sentences[0]
+        while len(sentences) > 0:
+            if len(chunks[-1] + " " + sentences[0]) > chunk_size:
+                break
+            chunks[-1] += " " + sentences.pop(0)
+    return chunks
+
+
+def random_sentences(rng: random.Random, n: int) -> list[str]:
+    words = ["alpha", "beta", "gamma", "δέλτα", "epsilon", "zeta", "eta", "théta", "iota", "kappa"]
+    return [
+        " ".join(rng.choice(words) for _ in range(rng.randint(1, 60))) + "."
+        for _ in range(n)
+    ]
+
+
+def test_iter_chunks_matches_reference_chunker():
+    rng = random.Random(0)
+    for chunk_size in [1, 10, 50, 100, 500, 2000, 4000]:
+        for n in [0, 1, 2, 50, 500]:
+            sentences = random_sentences(rng, n)
+            assert list(iter_chunks(sentences, chunk_size)) == reference_chunker(
+                sentences, chunk_size
+            )
+
+
+def test_iter_chunks_edge_cases():
+    # sentences longer than the chunk size are chunks of their own, exact fits are packed together
+    assert list(iter_chunks(["a" * 10, "b", "c"], 3)) == ["a" * 10, "b c"]
+    assert list(iter_chunks(["ab", "cd", "e"], 5)) == ["ab cd", "e"]
+    assert list(iter_chunks(["", "", "x"], 2)) == [" ", "x"] == reference_chunker(["", "", "x"], 2)
+    assert list(iter_chunks(iter(["a", "b"]), 10)) == ["a b"]
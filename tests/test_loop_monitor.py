@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+from chunking.utils.loop_monitor import LoopMonitor
+from chunking.utils.metrics import Histogram
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+def test_loop_monitor_records_blocking_site():
+    async def main():
+        monitor = LoopMonitor("test", threshold=0.1, interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.05)
+        monitor.stop()
+        return monitor.report()
+
+    report = asyncio.run(main())
+    assert report.samples > 0
+    assert report.stalls == 1
+    assert report.max_lag > 0.2
+    assert len(report.sites) == 1
+    assert report.sites[0].count == 1
+    assert "blocking_call" in report.sites[0].stack
+
+
+def test_loop_monitor_observes_lag_histogram():
+    histogram = Histogram("test_event_loop_lag_seconds", "Event loop lag.")
+
+    async def main():
+        monitor = LoopMonitor("test", interval=0.01, lag_histogram=histogram)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        monitor.stop()
+        return monitor.report()
+
+    report = asyncio.run(main())
+    assert report.samples > 0
+    assert histogram.count() == report.samples
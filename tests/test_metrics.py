@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from chunking.utils.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+)
+
+
+def test_metrics_render():
+    registry = MetricsRegistry()
+    queries = Counter(
+        "test_queries", "Queries.", ("status_code",), registry=registry
+    )
+    queue_size = Gauge("test_queue_size", "Queue size.", ("queue",), registry=registry)
+    latency = Histogram(
+        "test_latency_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry
+    )
+
+    queries.inc(status_code=200)
+    queries.inc(status_code=200)
+    queries.inc(status_code=408)
+    queue = asyncio.Queue()
+    queue.put_nowait(1)
+    queue_size.set_function(queue.qsize, queue="scores")
+    for value in [0.05, 0.5, 5.0]:
+        latency.observe(value)
+
+    with pytest.raises(ValueError):
+        queries.inc()
+    with pytest.raises(ValueError):
+        Counter("test_queries", "Duplicate.", registry=registry)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE test_queries counter" in lines
+    assert 'test_queries_total{status_code="200"} 2.0' in lines
+    assert 'test_queries_total{status_code="408"} 1.0' in lines
+    assert 'test_queue_size{queue="scores"} 1.0' in lines
+    assert 'test_latency_seconds_bucket{le="0.1"} 1.0' in lines
+    assert 'test_latency_seconds_bucket{le="1.0"} 2.0' in lines
+    assert 'test_latency_seconds_bucket{le="+Inf"} 3.0' in lines
+    assert "test_latency_seconds_count 3.0" in lines
+    assert "test_latency_seconds_sum 5.55" in lines
+
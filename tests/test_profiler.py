@@ -0,0 +1,61 @@
+import asyncio
+import pstats
+import time
+
+from chunking.utils.profiler import RoundProfiler
+
+
+def busy_round():
+    end = time.perf_counter() + 0.05
+    while time.perf_counter() < end:
+        pass
+
+
+def test_round_profiler(tmp_path):
+    async def run_rounds(profiler: RoundProfiler, n: int, force: bool = False):
+        paths = []
+        for i in range(n):
+            async with profiler.profile(f"round{i}", force=force) as path:
+                busy_round()
+                await asyncio.sleep(0)
+            paths.append(path)
+        return paths
+
+    profiler = RoundProfiler(str(tmp_path / "sampling"), every_n=2, max_files=2)
+    paths = asyncio.run(run_rounds(profiler, 6))
+    assert [path is not None for path in paths] == [False, True] * 3
+    # only the newest profiles are kept
+    assert profiler.profiles() == paths[3::2]
+    with open(paths[-1]) as f:
+        assert "busy_round" in f.read()
+
+    profiler = RoundProfiler(str(tmp_path / "cprofile"), mode="cprofile")
+    assert asyncio.run(run_rounds(profiler, 1)) == [None]
+    profiler.request_next()
+    paths = asyncio.run(run_rounds(profiler, 2))
+    assert paths[0] is not None and paths[1] is None
+    stats = pstats.Stats(paths[0])
+    assert any(func[2] == "busy_round" for func in stats.stats)
+
+    assert asyncio.run(run_rounds(profiler, 1, force=True))[0] is not None
+
+
+def test_round_profiled_in_stages(tmp_path):
+    async def run_round(profiler: RoundProfiler, i: int):
+        # like the validator pipeline: the scoring stage is profiled if the query stage was
+        async with profiler.profile(f"query{i}") as query_path:
+            busy_round()
+        scored_path = None
+        if query_path is not None:
+            async with profiler.profile(f"score{i}", force=True, count=False) as scored_path:
+                busy_round()
+        return query_path, scored_path
+
+    async def run_rounds(profiler: RoundProfiler, n: int):
+        return [await run_round(profiler, i) for i in range(n)]
+
+    profiler = RoundProfiler(str(tmp_path), every_n=2)
+    paths = asyncio.run(run_rounds(profiler, 4))
+    # each round is counted once
+    assert [query is not None for query, _ in paths] == [False, True] * 2
+    assert all((query is None) == (scored is None) for query, scored in paths)
@@ -0,0 +1,85 @@
+import numpy as np
+
+from chunking.utils.maths import calc_cosine_similarity
+from chunking.utils.relay.embedding_index import RelayEmbeddingIndex
+
+
+def reference_query(pins: dict, request, threshold):
+    # the miner's per pin check: similarities of the embeddings at the same positions
+    best = None
+    for pin_id, embeddings in pins.items():
+        for req_embedding, pin_embedding in zip(request, embeddings):
+            similarity = calc_cosine_similarity(req_embedding, pin_embedding)
+            if similarity > threshold and (best is None or similarity > best[1]):
+                best = (pin_id, similarity)
+    return best
+
+
+def random_pins(rng, n, dim=8):
+    return {
+        f"pin-{i}": rng.normal(size=(rng.integers(1, 4), dim)).tolist()
+        for i in range(n)
+    }
+
+
+def test_query_matches_reference():
+    rng = np.random.default_rng(0)
+    pins = random_pins(rng, 50)
+    index = RelayEmbeddingIndex(capacity=4)
+    for pin_id, embeddings in pins.items():
+        index.add(pin_id, embeddings)
+    assert len(index) == 50
+
+    for _ in range(50):
+        # requests near a random pin's embeddings
+        target = pins[f"pin-{rng.integers(50)}"]
+        request = (np.array(target) + rng.normal(scale=0.5, size=np.shape(target))).tolist()
+        for threshold in [0.5, 0.9]:
+            expected = reference_query(pins, request, threshold)
+            result = index.query(request, threshold)
+            if expected is None:
+                assert result is None
+            else:
+                assert result[0] == expected[0]
+                assert np.isclose(result[1], expected[1], atol=1e-5)
+
+
+def test_remove_and_compact():
+    rng = np.random.default_rng(1)
+    pins = random_pins(rng, 20)
+    index = RelayEmbeddingIndex()
+    for pin_id, embeddings in pins.items():
+        index.add(pin_id, embeddings)
+
+    for i in range(15):
+        index.remove(f"pin-{i}")
+        del pins[f"pin-{i}"]
+    # removing twice is a no-op
+    index.remove("pin-0")
+    assert len(index) == 5 and "pin-0" not in index
+
+    for pin_id, embeddings in pins.items():
+        assert index.query(embeddings, 0.999)[0] == pin_id
+
+    # replacing a pin's embeddings drops the old ones
+    embeddings = pins["pin-15"]
+    index.add("pin-15", [[1.0] * 8])
+    result = index.query(embeddings, 0.999)
+    assert result is None or result[0] != "pin-15"
+    assert len(index) == 5
+
+
+def test_exclude_and_positions():
+    index = RelayEmbeddingIndex()
+    index.add("self", [[1, 0, 0]])
+    index.add("other", [[0, 0, 1], [1, 0, 0]])
+
+    assert index.query([[1, 0, 0]], 0.9)[0] == "self"
+    # "other" only matches at its second position
+    assert index.query([[1, 0, 0]], 0.9, exclude_id="self") is None
+    assert index.query([[0, 1, 0], [1, 0, 0]], 0.9, exclude_id="self")[0] == "other"
+
+    # empty requests and requests of another dimension match nothing
+    assert index.query([], 0.9) is None
+    assert index.query([[1, 0]], 0.9) is None
+    assert RelayEmbeddingIndex().query([[1, 0, 0]], 0.9) is None
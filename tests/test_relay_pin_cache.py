@@ -0,0 +1,135 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytz
+
+from chunking.utils.ipfs.types import IPFSPin
+from chunking.utils.relay.pin_cache import RelayPinCache
+from chunking.utils.relay.types import RelayMessage, RelayPayload
+
+
+def make_payload(document_hash: str, embeddings: list[list[float]]) -> str:
+    message = RelayMessage(document_hash=document_hash, embeddings=embeddings)
+    return json.dumps(RelayPayload(message=message, signature="sig").model_dump())
+
+
+class FakeCluster:
+    def __init__(self):
+        self.pins: list[IPFSPin] = []
+        self.contents: dict[str, str] = {}
+        self.fetches: list[str] = []
+
+    def add(self, cid: str, content: str, age: timedelta = timedelta(0)):
+        created_at = datetime.now(pytz.utc) - age
+        self.pins.append(IPFSPin(cid=cid, created_at=created_at))
+        self.contents[cid] = content
+
+    async def list_pins(self, delta: timedelta) -> list[IPFSPin]:
+        # the cluster listing is filtered by created_at, like `list_recent_pins`
+        cutoff = datetime.now(pytz.utc) - delta
+        return [pin for pin in self.pins if pin.created_at >= cutoff]
+
+    async def fetch(self, cid: str) -> str:
+        self.fetches.append(cid)
+        return self.contents[cid]
+
+
+def make_cache(cluster: FakeCluster, **kwargs) -> RelayPinCache:
+    return RelayPinCache(list_pins=cluster.list_pins, fetch=cluster.fetch, **kwargs)
+
+
+def test_refresh_fetches_new_pins_once():
+    async def main():
+        cluster = FakeCluster()
+        cluster.add("a", make_payload("hash-a", [[1, 0, 0]]))
+        cluster.add("bad", "not json")
+        cache = make_cache(cluster)
+        assert not cache.ready
+
+        await cache.refresh()
+        assert cache.ready
+        assert "a" in cache and "bad" not in cache
+        assert sorted(cluster.fetches) == ["a", "bad"]
+
+        cluster.add("b", make_payload("hash-b", [[0, 1, 0]]))
+        await cache.refresh()
+        # only the new pin is fetched, the invalid one isn't retried
+        assert sorted(cluster.fetches) == ["a", "b", "bad"]
+        assert len(cache) == 2
+
+    asyncio.run(main())
+
+
+def test_exact_duplicate():
+    async def main():
+        cluster = FakeCluster()
+        cluster.add("request", make_payload("hash-a", [[1, 0]]))
+        cache = make_cache(cluster)
+        await cache.refresh()
+
+        # the request's own pin isn't a duplicate
+        assert cache.find_exact_duplicate("hash-a", exclude_cid="request") is None
+
+        cluster.add("earlier", make_payload("hash-a", [[1, 0]]))
+        await cache.refresh()
+        assert cache.find_exact_duplicate("hash-a", exclude_cid="request") == "earlier"
+        assert cache.find_exact_duplicate("hash-b") is None
+
+    asyncio.run(main())
+
+
+def test_fuzzy_duplicate_compares_same_positions():
+    async def main():
+        cluster = FakeCluster()
+        cluster.add("one", make_payload("hash-1", [[1, 0, 0]]))
+        cluster.add("two", make_payload("hash-2", [[0, 0, 1], [0, 2, 0]]))
+        cache = make_cache(cluster)
+        await cache.refresh()
+
+        # similar to the second embedding of "two", but at the first position
+        assert cache.find_fuzzy_duplicate([[0, 1, 0]], 0.9) is None
+
+        cid, similarity = cache.find_fuzzy_duplicate([[0.1, 0, 1], [0, 1, 0]], 0.9)
+        # the most similar position is reported
+        assert cid == "two" and np.isclose(similarity, 1)
+
+        cid, _ = cache.find_fuzzy_duplicate([[1, 0.1, 0]], 0.9)
+        assert cid == "one"
+        assert cache.find_fuzzy_duplicate([[1, 0.1, 0]], 0.9, exclude_cid="one") is None
+        assert cache.find_fuzzy_duplicate([], 0.9) is None
+
+    asyncio.run(main())
+
+
+def test_pins_expire_by_created_at():
+    async def main():
+        cluster = FakeCluster()
+        cluster.add("old", make_payload("hash-old", [[1, 0]]), age=timedelta(seconds=55))
+        cluster.add("new", make_payload("hash-new", [[0, 1]]))
+        cache = make_cache(cluster, delta=timedelta(minutes=1))
+        await cache.refresh()
+        assert len(cache) == 2
+
+        cache.delta = timedelta(seconds=30)
+        await cache.refresh()
+        assert "old" not in cache and "new" in cache
+        assert cache.find_exact_duplicate("hash-old") is None
+        assert cache.find_fuzzy_duplicate([[1, 0]], 0.9) is None
+
+    asyncio.run(main())
+
+
+def test_run_in_background():
+    async def main():
+        cluster = FakeCluster()
+        cache = make_cache(cluster, refresh_interval=0.01)
+        cache.start()
+        await asyncio.sleep(0.02)
+        cluster.add("a", make_payload("hash-a", [[1, 0]]))
+        await asyncio.sleep(0.05)
+        cache.stop()
+        assert cache.find_exact_duplicate("hash-a") == "a"
+
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+import re
+
+import numpy as np
+
+from chunking.utils.reward_estimator import RewardEstimator
+from chunking.utils.semantic_chunker import HashingEmbeddingProvider
+from chunking.validator.reward import (
+    calculate_embedding_reward,
+    get_qty_penalty,
+    get_similarities,
+    get_size_penalty,
+)
+
+
+def split_sentences(text: str) -> list[str]:
+    # stand-in for nltk's sent_tokenize, which needs the punkt data
+    return [s for s in re.split(r"(?<=[.!?])\s+", text.strip()) if s]
+
+
+def pairwise_embedding_reward(embeddings, source_chunks) -> float:
+    # the validator's original loop
+    intra, inter = [], []
+    for i in range(len(embeddings) - 1):
+        for j in range(i + 1, len(embeddings)):
+            similarity = np.dot(embeddings[i], embeddings[j])
+            if source_chunks[i] == source_chunks[j]:
+                intra.append(similarity)
+            else:
+                inter.append(similarity)
+    return (np.mean(intra) if intra else 0) - (np.mean(inter) if inter else 0)
+
+
+def test_similarities_match_pairwise_loop():
+    rng = np.random.default_rng(0)
+    for n in [1, 2, 7, 40]:
+        embeddings = rng.normal(size=(n, 16))
+        source_chunks = sorted(rng.integers(0, 4, size=n).tolist())
+        intra, inter = get_similarities(embeddings, source_chunks)
+        assert len(intra) + len(inter) == n * (n - 1) // 2
+        assert np.isclose(
+            calculate_embedding_reward(intra, inter),
+            pairwise_embedding_reward(embeddings, source_chunks),
+        )
+
+
+def test_similarities_of_no_embeddings():
+    intra, inter = get_similarities(np.array([]), [])
+    assert len(intra) == 0 and len(inter) == 0
+    assert calculate_embedding_reward(intra, inter) == 0
+
+
+def test_penalties():
+    assert get_size_penalty(["a" * 10, "b" * 20], 10) == 10
+    assert get_size_penalty(["a" * 10], 10) == 0
+    assert get_qty_penalty(3, 3) == 0
+    assert np.isclose(get_qty_penalty(6, 3), 100)
+
+
+TOPICS = [
+    "The ship sailed across the ocean. Its sails caught the ocean wind. The crew watched the ocean waves.",
+    "The bakery sold fresh bread. Its ovens baked bread all night. The baker kneaded bread dough.",
+    "The volcano erupted with lava. Hot lava flowed down the volcano. Ash from the volcano covered the town.",
+]
+DOCUMENT = " ".join(TOPICS)
+
+
+def mixed_chunks() -> list[str]:
+    # every chunk but the last mixes topics
+    sentences = split_sentences(DOCUMENT)
+    bounds = [0, 2, 4, 7, 9]
+    return [" ".join(sentences[a:b]) for a, b in zip(bounds, bounds[1:])]
+
+
+def make_estimator() -> RewardEstimator:
+    return RewardEstimator(HashingEmbeddingProvider(dim=256), tokenize=split_sentences)
+
+
+def test_estimate_prefers_topic_chunks():
+    estimator = make_estimator()
+
+    by_topic = estimator.estimate(DOCUMENT, TOPICS, chunk_size=200, chunk_qty=5)
+    mixed = estimator.estimate(DOCUMENT, mixed_chunks(), chunk_size=200, chunk_qty=5)
+
+    assert by_topic.failure is None and mixed.failure is None
+    assert by_topic.embedding_reward > mixed.embedding_reward
+    assert by_topic.reward > mixed.reward
+
+
+def test_estimate_fails_checks():
+    estimator = make_estimator()
+    # the last topic is missing
+    estimate = estimator.estimate(DOCUMENT, TOPICS[:2], chunk_size=200, chunk_qty=5)
+    assert estimate.reward == 0 and estimate.failure is not None
+
+    # chunk ending mid sentence
+    words = TOPICS[0].split()
+    chunks = [" ".join(words[:3]), " ".join(words[3:])] + TOPICS[1:]
+    estimate = estimator.estimate(DOCUMENT, chunks, chunk_size=200, chunk_qty=5)
+    assert estimate.reward == 0 and estimate.failure is not None
+
+
+def test_estimate_penalties():
+    estimator = make_estimator()
+    unpenalized = estimator.estimate(DOCUMENT, TOPICS, chunk_size=200, chunk_qty=5)
+    too_many = estimator.estimate(DOCUMENT, TOPICS, chunk_size=200, chunk_qty=2)
+    too_long = estimator.estimate(DOCUMENT, TOPICS, chunk_size=50, chunk_qty=5)
+
+    assert too_many.qty_penalty > 0 and too_long.size_penalty > 0
+    assert np.isclose(too_many.embedding_reward, unpenalized.embedding_reward)
+    assert abs(np.log(too_many.reward)) < abs(np.log(unpenalized.reward))
+
+
+def test_choose_and_cache():
+    estimator = make_estimator()
+    invalid = TOPICS[:2]
+    best, estimates = estimator.choose(
+        DOCUMENT, [invalid, mixed_chunks(), TOPICS], chunk_size=200, chunk_qty=5
+    )
+    assert best == 2
+    assert len(estimates) == 3 and estimates[0].failure is not None
+
+    # all sentences were embedded once
+    assert len(estimator._cache) == len(split_sentences(DOCUMENT))
+
+    # past the deadline only the first candidate is estimated
+    best, estimates = estimator.choose(
+        DOCUMENT, [mixed_chunks(), TOPICS], chunk_size=200, chunk_qty=5, deadline=0
+    )
+    assert best == 0 and len(estimates) == 1
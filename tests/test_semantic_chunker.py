@@ -0,0 +1,86 @@
+import time
+
+import numpy as np
+import pytest
+
+from chunking.utils.chunks import iter_chunks
+from chunking.utils.semantic_chunker import (
+    EmbeddingProvider,
+    HashingEmbeddingProvider,
+    SemanticChunker,
+    optimal_splits,
+    window_similarities,
+)
+
+CATS = [
+    "Cats are small domestic felines that purr.",
+    "A cat sleeps most of the day and hunts mice at night.",
+    "Felines groom their fur and purr when cats are content.",
+    "Domestic cats hunt mice and sleep in the sun.",
+    "The cat purrs while it grooms its fur.",
+    "Many cats sleep in boxes and hunt small mice.",
+]
+ROCKETS = [
+    "Rockets burn fuel to launch satellites into orbit.",
+    "A rocket engine needs fuel and oxygen to launch.",
+    "Orbit is reached when the rocket launches fast enough.",
+    "Satellites are launched into orbit by rockets burning fuel.",
+    "The launch of a rocket needs a lot of fuel.",
+    "Rockets carry satellites to orbit after launch.",
+]
+
+
+def test_semantic_chunker_splits_at_topic_change():
+    sentences = CATS + ROCKETS
+    chunker = SemanticChunker(HashingEmbeddingProvider(), window=3)
+    embeddings = chunker.provider.embed(sentences)
+
+    similarities = window_similarities(embeddings, 3)
+    assert len(similarities) == len(sentences) - 1
+    assert int(np.argmin(similarities)) == len(CATS) - 1
+
+    assert chunker.split(sentences, embeddings, chunk_size=10_000, max_num_chunks=2) == [len(CATS)]
+
+    # chunks stay within the chunk size
+    splits = chunker.split(sentences, embeddings, chunk_size=120, max_num_chunks=100)
+    bounds = [0, *splits, len(sentences)]
+    chunks = [" ".join(sentences[a:b]) for a, b in zip(bounds, bounds[1:])]
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert " ".join(chunks) == " ".join(sentences)
+
+
+def test_optimal_splits():
+    lengths = np.array([10, 10, 10, 10, 30])
+    # the cheapest splits that keep chunks within 21 characters (two sentences of 10 + a space)
+    assert optimal_splits(lengths, np.array([1.0, 0.0, 1.0, 1.0]), 21) == [2, 4]
+    assert optimal_splits(lengths, np.array([0.0, 1.0, 0.0, 1.0]), 21) == [1, 3, 4]
+    # negative costs (very dissimilar boundaries) are split at even when not needed
+    assert optimal_splits(lengths, np.array([-1.0, 0.5, 0.5, 0.5]), 100) == [1]
+    assert optimal_splits(lengths, np.array([-1.0, 0.5, 0.5, 0.5]), 100, penalty=2) == []
+
+
+def test_semantic_chunker_respects_max_num_chunks():
+    sentences = (CATS + ROCKETS) * 3
+    chunker = SemanticChunker(HashingEmbeddingProvider(), split_percentile=50)
+    embeddings = chunker.provider.embed(sentences)
+
+    greedy = list(iter_chunks(sentences, 400))
+    splits = chunker.split(sentences, embeddings, chunk_size=400, max_num_chunks=len(greedy))
+    assert splits is not None and len(splits) + 1 <= len(greedy)
+    # fewer chunks than the greedy (minimal) number isn't possible
+    assert chunker.split(sentences, embeddings, chunk_size=400, max_num_chunks=len(greedy) - 1) is None
+
+
+class SlowProvider(EmbeddingProvider):
+    batch_size = 2
+
+    def embed(self, texts, timeout=None):
+        time.sleep(0.05)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+def test_semantic_chunker_embeds_within_deadline():
+    chunker = SemanticChunker(SlowProvider())
+    with pytest.raises(TimeoutError):
+        chunker._embed(CATS + ROCKETS, deadline=time.monotonic() + 0.08)
+    assert chunker._embed(CATS, deadline=None).shape == (len(CATS), 4)
@@ -0,0 +1,41 @@
+import numpy as np
+
+from chunking.simulator import MinerPopulation, SimulationConfig, run_simulation
+
+
+def test_population_rewards():
+    population = MinerPopulation(8, np.random.default_rng(0), dropout=0.0)
+
+    rewards = population.sample_rewards(np.array([0, 3, 5]))
+    assert rewards.shape == (3,)
+    assert np.all(rewards > 0)
+
+    population.replace(3, population.quality.max() + 1)
+    assert population.best_uid() == 3
+    assert population.true_rankings()[0] == 3
+
+
+def test_simulation_converges_and_promotes():
+    config = SimulationConfig(
+        num_miners=32,
+        rounds=3000,
+        inject_top_miner_at=1000,
+        inject_margin=0.2,
+        eval_interval=500,
+        seed=1,
+    )
+    result = run_simulation(config)
+
+    assert result.eval_rounds[-1] == config.rounds
+    assert result.spearman[-1] > 0.8
+    assert result.top_1_correct[-1]
+    assert len(result.rounds_to_promote) == 1
+    assert result.pending_promotions == 0
+
+
+def test_simulation_is_deterministic():
+    config = SimulationConfig(num_miners=16, rounds=500, churn_rate=0.01, seed=3)
+    a = run_simulation(config)
+    b = run_simulation(config)
+    assert a.spearman == b.spearman
+    assert a.rounds_to_promote == b.rounds_to_promote
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import httpx
+import numpy as np
+import pytest
+
+from chunking.utils.articles import (
+    fetch_articles,
+    get_articles_path,
+    hash_articles,
+    load_articles,
+    load_articles_synced_at,
+    sample_articles,
+    save_articles,
+    save_articles_synced_at,
+)
+from chunking.utils.state import save_tournament_state
+
+
+def test_save_tournament_state(tmp_path):
+    path = str(tmp_path / "state.npz")
+
+    scores = np.array([0.5, np.inf, 1.5])
+    rankings = np.argsort(scores)
+    hotkeys = ["a", "b", "c"]
+
+    save_tournament_state(
+        path, step=3, scores=scores, rankings=rankings, hotkeys=hotkeys
+    )
+
+    # no temp file should be left behind
+    assert os.listdir(tmp_path) == ["state.npz"]
+
+    state = np.load(path)
+    assert state["step"] == 3
+    assert np.array_equal(state["scores"], scores)
+    assert np.array_equal(state["rankings"], rankings)
+    assert state["hotkeys"].tolist() == hotkeys
+    assert "articles" not in state
+
+
+def test_articles_roundtrip(tmp_path):
+    path = get_articles_path(str(tmp_path))
+
+    assert load_articles(path) is None
+
+    articles = list(range(1000, 6000))
+    save_articles(path, articles)
+
+    loaded = load_articles(path)
+    assert isinstance(loaded, np.memmap)
+    assert loaded.tolist() == articles
+    assert hash_articles(loaded) == hash_articles(articles)
+    assert hash_articles(articles[:-1]) != hash_articles(articles)
+
+    sampled = sample_articles(loaded, 3)
+    assert len(set(sampled)) == 3
+    assert all(isinstance(pageid, int) and pageid in articles for pageid in sampled)
+
+
+def test_articles_synced_at_roundtrip(tmp_path):
+    assert load_articles_synced_at(str(tmp_path)) is None
+    save_articles_synced_at(str(tmp_path), 1234.5)
+    assert load_articles_synced_at(str(tmp_path)) == 1234.5
+
+
+def test_fetch_articles_paging():
+    pages = {
+        None: {
+            "continue": {"cmcontinue": "b"},
+            "query": {"categorymembers": [{"pageid": 1}, {"pageid": 2}]},
+        },
+        "b": {
+            "continue": {"cmcontinue": "c"},
+            "query": {"categorymembers": [{"pageid": 3}]},
+        },
+        "c": {"query": {"categorymembers": [{"pageid": 4}]}},
+    }
+    requested = []
+
+    def handler(request: httpx.Request):
+        cmcontinue = request.url.params.get("cmcontinue")
+        requested.append(cmcontinue)
+        if cmcontinue == "fail":
+            return httpx.Response(500)
+        return httpx.Response(200, json=pages[cmcontinue])
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            assert await fetch_articles(client) == [1, 2, 3, 4]
+            assert requested == [None, "b", "c"]
+
+            # a failed page fails the whole fetch instead of returning a partial catalog
+            pages["b"]["continue"]["cmcontinue"] = "fail"
+            with pytest.raises(httpx.HTTPStatusError):
+                await fetch_articles(client)
+
+    asyncio.run(main())
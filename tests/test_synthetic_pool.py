@@ -0,0 +1,63 @@
+import asyncio
+import os
+
+import pytest
+
+from chunking.utils.synthetic.pool import SyntheticDocumentPool
+
+
+def test_synthetic_document_pool(tmp_path):
+    async def main():
+        pool = SyntheticDocumentPool(str(tmp_path), max_fresh=2)
+        await pool.put("first " * 1000, 1)
+        await pool.put("second " * 1000, -1)
+
+        # the pool is full, so the producer waits until a document is used
+        put_task = asyncio.create_task(pool.put("third " * 1000, 3))
+        await asyncio.sleep(0.05)
+        assert not put_task.done()
+
+        assert await pool.get() == ("first " * 1000, 1)
+        await asyncio.wait_for(put_task, 1)
+        assert len(pool) == 2
+
+    asyncio.run(main())
+
+    async def reload():
+        # documents survive a restart, used documents are gone
+        pool = SyntheticDocumentPool(str(tmp_path), max_fresh=2)
+        assert len(pool) == 2
+        assert await pool.get() == ("second " * 1000, -1)
+        assert await pool.get() == ("third " * 1000, 3)
+        assert len(pool) == 0
+
+    asyncio.run(reload())
+    assert [f for f in os.listdir(tmp_path) if f.endswith(".gz")] == []
+
+
+def test_synthetic_document_pool_reuse_and_eviction(tmp_path):
+    async def main():
+        pool = SyntheticDocumentPool(str(tmp_path), max_fresh=5, max_uses=2)
+        await pool.put("a", 1)
+        await pool.put("b", 2)
+
+        # fresh documents first, then the least used one is reused
+        assert [await pool.get() for _ in range(4)] == [
+            ("a", 1),
+            ("b", 2),
+            ("a", 1),
+            ("b", 2),
+        ]
+        assert len(pool) == 0
+
+        pool = SyntheticDocumentPool(
+            str(tmp_path / "small"), max_fresh=5, max_bytes=2500
+        )
+        for i in range(4):
+            await pool.put(os.urandom(1000).hex(), i)
+        # the oldest documents are evicted to stay under max_bytes
+        assert pool.size <= 2500
+        assert len(pool) == 2
+        assert (await pool.get())[1] == 2
+
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from chunking.utils.state import save_tournament_state
+from chunking.validator.telemetry import MinerTelemetry
+
+
+def test_miner_telemetry(tmp_path):
+    telemetry = MinerTelemetry(4)
+
+    for latency in [1.0] * 90 + [10.0] * 10:
+        telemetry.record(
+            0,
+            status_code=200,
+            latency=latency,
+            time_soft_max=5.0,
+            bytes_sent=100,
+            bytes_received=10,
+        )
+    telemetry.record(1, status_code=408, latency=None)
+    telemetry.record(1, status_code=500, latency=None)
+
+    info = telemetry.info([0, 1, 2])
+    assert info[0].queries == 100
+    assert info[0].successes == 100
+    assert info[0].over_soft_max == 10
+    assert info[0].bytes_sent == 10_000
+    assert info[0].latency_p50 == pytest.approx(1.0, rel=0.3)
+    assert info[0].latency_p95 == pytest.approx(10.0, rel=0.3)
+    assert 1.0 < info[0].latency_ewma < 10.0
+    assert info[1].timeouts == 1
+    assert info[1].errors == 1
+    assert info[1].last_status_code == 500
+    assert info[1].latency_p50 is None
+    assert info[2].queries == 0
+    assert info[2].last_query_at is None
+
+    # uids beyond the current size grow the store
+    telemetry.record(5, status_code=200, latency=0.5)
+    assert len(telemetry) == 6
+
+    path = str(tmp_path / "state.npz")
+    save_tournament_state(
+        path,
+        step=1,
+        scores=np.zeros(6),
+        rankings=np.arange(6),
+        hotkeys=[str(i) for i in range(6)],
+        telemetry=telemetry.to_state(),
+    )
+    loaded = MinerTelemetry.from_state(np.load(path), 8)
+    assert len(loaded) == 8
+    assert loaded.info([0, 1, 5]) == telemetry.info([0, 1, 5])
+
+    loaded.reset(0)
+    assert loaded.info([0])[0].queries == 0
+
+    # states saved before telemetry existed start empty
+    save_tournament_state(
+        path, step=1, scores=np.zeros(2), rankings=np.arange(2), hotkeys=["a", "b"]
+    )
+    assert MinerTelemetry.from_state(np.load(path), 2).info()[0].queries == 0
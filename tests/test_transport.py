@@ -0,0 +1,348 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import bittensor as bt
+import pytest
+
+from chunking.protocol import chunkSynapse
+from chunking.utils.transport.broadcast import PreparedBroadcast
+from chunking.utils.transport.compression import (
+    ACCEPT_REQUEST_ENCODING_HEADER,
+    CompressionCapabilities,
+    CompressionMiddleware,
+    choose_encoding,
+    compress,
+    decompress,
+)
+from chunking.utils.transport.decode import (
+    ResponseTooLargeError,
+    decode_chunk_response,
+)
+from chunking.utils.transport.pool import AxonClientPool
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_pool_reuses_connections(server_url):
+    async def main():
+        pool = AxonClientPool(max_connections_per_host=1)
+        host = server_url.removeprefix("http://")
+
+        for i in range(5):
+            response, content = await pool.post(
+                server_url, host=host, timeout=5, json={"i": i}
+            )
+            assert response.status_code == 200
+            assert json.loads(content) == {"i": i}
+            # set once the streamed response is read and closed
+            assert response.elapsed.total_seconds() > 0
+
+        with pytest.raises(ResponseTooLargeError):
+            await pool.post(
+                server_url,
+                host=host,
+                timeout=5,
+                max_response_bytes=10,
+                json={"document": "x" * 100},
+            )
+
+        stats = pool.stats()
+        await pool.aclose()
+        return stats
+
+    stats = asyncio.run(main())
+    assert stats.requests == 6
+    # the connection of the dropped response is closed
+    assert stats.connections_opened == 1
+    assert stats.reuse_ratio == pytest.approx(5 / 6)
+    assert stats.open_connections == 0
+    assert stats.responses_too_large == 1
+    assert not stats.http2
+
+
+def test_pool_per_host_limit():
+    async def main():
+        pool = AxonClientPool(max_connections_per_host=1)
+
+        async with pool.host_slot("1.2.3.4:8091", timeout=1):
+            # the only slot of the host is taken
+            with pytest.raises(asyncio.TimeoutError):
+                async with pool.host_slot("1.2.3.4:8091", timeout=0.05):
+                    pass
+            # other hosts are not affected
+            async with pool.host_slot("5.6.7.8:8091", timeout=0.05):
+                pass
+
+        async with pool.host_slot("1.2.3.4:8091", timeout=0.05):
+            pass
+
+        stats = pool.stats()
+        await pool.aclose()
+        return stats
+
+    stats = asyncio.run(main())
+    assert stats.host_slot_timeouts == 1
+    assert stats.waiting_for_host == 0
+
+
+class SlowEchoHandler(EchoHandler):
+    def do_POST(self):
+        time.sleep(0.2)
+        super().do_POST()
+
+
+def test_pool_timeout_covers_waiting_for_a_slot():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowEchoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    host = url.removeprefix("http://")
+
+    async def main():
+        pool = AxonClientPool(max_connections_per_host=1)
+
+        async def hold_slot():
+            async with pool.host_slot(host, timeout=1):
+                await asyncio.sleep(0.2)
+
+        holder = asyncio.create_task(hold_slot())
+        await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        # 0.2s waiting for the slot + 0.2s for the response doesn't fit in the 0.3s timeout
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.post(url, host=host, timeout=0.3, json={})
+        elapsed = time.perf_counter() - start
+
+        await holder
+        await pool.aclose()
+        return elapsed
+
+    try:
+        elapsed = asyncio.run(main())
+    finally:
+        server.shutdown()
+    assert elapsed < 0.35
+
+
+def make_dendrite():
+    return SimpleNamespace(
+        external_ip="1.1.1.1",
+        uuid="dendrite-uuid",
+        keypair=bt.Keypair.create_from_uri("//Alice"),
+    )
+
+
+def test_prepared_broadcast():
+    synapse = chunkSynapse(
+        document="Hello world. " * 1000,
+        chunk_size=100,
+        chunk_qty=10,
+        time_soft_max=15.0,
+        CID="cid",
+    )
+    broadcast = PreparedBroadcast(synapse, timeout=12.0)
+    # the caller's synapse is left untouched
+    assert synapse.timeout != 12.0 and synapse.dendrite.ip is None
+    dendrite = make_dendrite()
+
+    axon_infos = [
+        bt.AxonInfo(
+            version=1,
+            ip=f"10.0.0.{i}",
+            port=8091,
+            ip_type=4,
+            hotkey=f"hotkey{i}",
+            coldkey="coldkey",
+        )
+        for i in range(3)
+    ]
+
+    for axon_info in axon_infos:
+        prepared, headers, body = broadcast.prepare(dendrite, axon_info)
+
+        # the body parses into the same synapse, with this axon's terminal info
+        received = chunkSynapse(**json.loads(body))
+        assert received.document == synapse.document
+        assert received.chunk_size == 100
+        assert received.CID == "cid"
+        assert received.timeout == 12.0
+        assert received.chunks is None
+        assert received.dendrite == prepared.dendrite
+        assert received.axon.ip == axon_info.ip
+        assert received.axon.hotkey == axon_info.hotkey
+
+        # the headers match what `bt.Synapse.to_headers` would produce
+        assert headers == prepared.to_headers() | {
+            "header_size": headers["header_size"],
+            "total_size": headers["total_size"],
+        }
+
+        # the signature verifies like on the axon
+        message = f"{prepared.dendrite.nonce}.{prepared.dendrite.hotkey}.{axon_info.hotkey}.{prepared.dendrite.uuid}.{headers['computed_body_hash']}"
+        assert dendrite.keypair.verify(message, prepared.dendrite.signature)
+
+    # the original synapse is not modified
+    assert synapse.dendrite.hotkey is None
+
+
+def test_decode_chunk_response():
+    prepared, _, _ = PreparedBroadcast(
+        chunkSynapse(document="doc", chunk_size=1, chunk_qty=1, time_soft_max=1.0),
+        timeout=12.0,
+    ).prepare(
+        make_dendrite(),
+        bt.AxonInfo(
+            version=1, ip="10.0.0.1", port=8091, ip_type=4, hotkey="h", coldkey="c"
+        ),
+    )
+    headers = {
+        "bt_header_axon_status_code": "200",
+        "bt_header_axon_status_message": "Success",
+        "bt_header_axon_process_time": "1.5",
+        "bt_header_input_obj_document": "IiI=",
+    }
+
+    synapse = prepared.model_copy(deep=True)
+    content = json.dumps(
+        {"document": "echoed", "chunks": ["a", "b"], "miner_signature": "sig"}
+    ).encode()
+    decode_chunk_response(synapse, 200, headers, content)
+    assert synapse.chunks == ["a", "b"]
+    assert synapse.miner_signature == "sig"
+    # echoed request fields are ignored
+    assert synapse.document == "doc"
+    assert synapse.axon.status_code == 200
+    assert synapse.axon.process_time == 1.5
+    assert synapse.dendrite.status_code == 200
+    assert synapse.dendrite.status_message == "Success"
+    assert synapse.dendrite.hotkey == prepared.dendrite.hotkey
+
+    synapse = prepared.model_copy(deep=True)
+    decode_chunk_response(synapse, 401, {}, b'{"message": "blacklisted"}')
+    assert synapse.chunks is None
+    assert synapse.dendrite.status_code == 401
+    assert synapse.dendrite.status_message == "blacklisted"
+
+    with pytest.raises(ValueError):
+        decode_chunk_response(
+            prepared.model_copy(deep=True), 200, headers, b'{"chunks": [1, 2]}'
+        )
+
+
+def test_compressed_broadcast():
+    synapse = chunkSynapse(
+        document="Hello world. " * 2000,
+        chunk_size=100,
+        chunk_qty=10,
+        time_soft_max=15.0,
+    )
+    broadcast = PreparedBroadcast(synapse, timeout=12.0, compression_min_bytes=1024)
+    axon_info = bt.AxonInfo(
+        version=1, ip="10.0.0.1", port=8091, ip_type=4, hotkey="h", coldkey="c"
+    )
+
+    assert choose_encoding(["gzip"]) == "gzip"
+    assert choose_encoding(["br"]) is None
+    assert choose_encoding(["gzip"], "none") is None
+
+    prepared, headers, body = broadcast.prepare(make_dendrite(), axon_info, "gzip")
+    assert headers["Content-Encoding"] == "gzip"
+    # the shared prefix and the per-axon suffix are separate gzip members
+    received = chunkSynapse(**json.loads(decompress(body, "gzip")))
+    assert received.document == synapse.document
+    assert received.dendrite == prepared.dendrite
+
+    _, headers, raw_body = broadcast.prepare(make_dendrite(), axon_info)
+    assert "Content-Encoding" not in headers
+
+    counts = broadcast.byte_counts
+    assert counts.requests_raw == 2 * len(raw_body)
+    assert counts.requests_sent == len(body) + len(raw_body)
+    assert len(body) < len(raw_body) / 10
+
+    with pytest.raises(ValueError):
+        decompress(body, "gzip", max_size=1000)
+    with pytest.raises(ValueError):
+        decompress(body[:-4], "gzip")
+
+    capabilities = CompressionCapabilities()
+    capabilities.update("h", "zstd, gzip")
+    assert capabilities.get("h") == ["zstd", "gzip"]
+    capabilities.update("h", None)
+    assert capabilities.get("h") == []
+
+
+def test_compression_middleware():
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+
+    async def echo(request: Request):
+        body = await request.body()
+        return JSONResponse({"size": len(body), "text": body.decode()})
+
+    app = Starlette(routes=[Route("/echo", echo, methods=["POST"])])
+    app.add_middleware(CompressionMiddleware, min_size=100)
+    client = TestClient(app)
+
+    text = "chunk " * 1000
+    response = client.post(
+        "/echo",
+        content=compress(text.encode(), "gzip") + compress(b"!", "gzip"),
+        headers={"Content-Encoding": "gzip", "Accept-Encoding": "gzip"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"size": len(text) + 1, "text": text + "!"}
+    assert response.headers["content-encoding"] == "gzip"
+    assert "gzip" in response.headers[ACCEPT_REQUEST_ENCODING_HEADER]
+
+    # small responses and clients that don't accept an encoding get plain responses
+    response = client.post(
+        "/echo", content=b"hi", headers={"Accept-Encoding": "identity"}
+    )
+    assert response.json() == {"size": 2, "text": "hi"}
+    assert "content-encoding" not in response.headers
+
+    response = client.post(
+        "/echo", content=b"hi", headers={"Content-Encoding": "br"}
+    )
+    assert response.status_code == 415
+
+    # bodies larger than the limit are rejected, compressed or once decompressed
+    small_app = Starlette(routes=[Route("/echo", echo, methods=["POST"])])
+    small_app.add_middleware(CompressionMiddleware, max_request_bytes=1000)
+    small_client = TestClient(small_app)
+    for content in [compress(text.encode(), "gzip"), compress(os.urandom(2000), "gzip")]:
+        response = small_client.post(
+            "/echo", content=content, headers={"Content-Encoding": "gzip"}
+        )
+        assert response.status_code == 413
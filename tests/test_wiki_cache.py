@@ -0,0 +1,106 @@
+import asyncio
+import os
+
+from aiohttp import web
+
+from chunking.utils.synthetic.wiki_cache import WikiPageCache
+
+
+def make_wiki_app(requests: list[dict], revisions: dict[int, int]):
+    async def handler(request: web.Request):
+        params = dict(request.query)
+        requests.append(params)
+        pageids = [int(pageid) for pageid in params["pageids"].split("|")]
+        pages = {}
+        for pageid in pageids:
+            page = {"pageid": pageid, "title": f"Page {pageid}", "lastrevid": revisions[pageid]}
+            if "extracts" in params["prop"]:
+                page["extract"] = f"Content of page {pageid}. " * 100
+            pages[str(pageid)] = page
+        return web.json_response({"query": {"pages": pages}})
+
+    app = web.Application()
+    app.router.add_get("/api.php", handler)
+    return app
+
+
+def test_wiki_page_cache(tmp_path):
+    requests = []
+    revisions = {i: 1 for i in range(10)}
+
+    async def main():
+        runner = web.AppRunner(make_wiki_app(requests, revisions))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        api_url = f"http://127.0.0.1:{port}/api.php"
+
+        try:
+            cache = WikiPageCache(str(tmp_path), api_url=api_url, prefetch_count=3)
+            content, title = await cache.get(1)
+            assert title == "Page 1"
+            assert content.startswith("Content of page 1.")
+            assert await cache.get(1) == (content, title)
+            assert (cache.hits, cache.misses) == (1, 1)
+            assert len(requests) == 1
+
+            # prefetched pages are handed out once
+            await cache.prefetch_random(list(range(10)))
+            prefetched = cache.take_prefetched(3)
+            assert len(prefetched) == 3 and all(pageid in cache for pageid in prefetched)
+            assert cache.take_prefetched(1) is None
+            await cache.close()
+
+            # the cache survives a restart, and pages that changed are dropped when revalidated
+            cache = WikiPageCache(
+                str(tmp_path), api_url=api_url, revalidate_seconds=0
+            )
+            assert 1 in cache
+            revisions[1] = 2
+            num_requests = len(requests)
+            await cache.revalidate()
+            assert len(requests) == num_requests + 1
+            assert 1 not in cache
+            assert len(cache) == len(set(prefetched) - {1})
+
+            # least recently used pages are evicted to stay under max_bytes
+            size = cache.size / len(cache) if len(cache) else 200
+            cache.max_bytes = int(size * 2.5)
+            for pageid in [7, 8, 9]:
+                await cache.get(pageid)
+            assert len(cache) == 2
+            assert 8 in cache and 9 in cache
+            await cache.close()
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(main())
+    assert len([f for f in os.listdir(tmp_path) if f.endswith(".gz")]) == 2
+
+
+def test_concurrent_misses_fetch_once(tmp_path):
+    requests = []
+    revisions = {i: 1 for i in range(10)}
+
+    async def main():
+        runner = web.AppRunner(make_wiki_app(requests, revisions))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        try:
+            cache = WikiPageCache(
+                str(tmp_path), api_url=f"http://127.0.0.1:{port}/api.php"
+            )
+            results = await asyncio.gather(*(cache.get(1) for _ in range(5)))
+            assert all(result == results[0] for result in results)
+            assert len(requests) == 1
+            assert (cache.hits, cache.misses) == (4, 1)
+            await cache.close()
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(main())
+    assert os.listdir(tmp_path).count("1.txt.gz") == 1